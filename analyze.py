@@ -1,9 +1,25 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
 import numpy as np
 from collections import Counter
 import os
+from background import BackgroundRunner
+from ingest import files_task, merge_summaries
+import export
+from lotto_core import get_combo_probabilities, get_cooccurrence_stats, get_draw_database
+from table_view import VirtualTable
+from tickets import COMBINATIONS, unrank
+
+
+def probabilities_task(task, weights):
+    """BackgroundRunner 작업 함수: weights로 추첨할 때의 (번호별 포함 확률, 가장 확률이 큰 조합, 그 확률)"""
+    def on_chunk(done, total):
+        task.check()
+        task.report(done, total)
+
+    table = get_combo_probabilities(weights, on_chunk)
+    ranks, probabilities = table.most_likely(1)
+    return table.inclusion, unrank(ranks)[0].tolist(), float(probabilities[0])
 
 
 class LottoAnalyzer:
@@ -14,6 +30,9 @@ class LottoAnalyzer:
         
         self.files = []
         self.analysis_results = None
+        self.shown_text = {}
+        # 오래 걸리는 작업은 작업 스레드에서 실행하고 결과만 root.after로 받는다
+        self.runner = BackgroundRunner(root)
         
         self.setup_ui()
     
@@ -33,13 +52,28 @@ class LottoAnalyzer:
         self.file_listbox = tk.Listbox(file_frame, height=5)
         self.file_listbox.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
         
-        # 분석 버튼
-        ttk.Button(main_frame, text="분석 시작", command=self.analyze_files, 
-                  style="Accent.TButton").grid(row=1, column=0, columnspan=2, pady=10)
+        # 분석 버튼 및 진행 상황
+        action_frame = ttk.Frame(main_frame)
+        action_frame.grid(row=1, column=0, columnspan=2, pady=10)
+        
+        self.analyze_button = ttk.Button(action_frame, text="분석 시작", command=self.analyze_files, 
+                                         style="Accent.TButton")
+        self.analyze_button.grid(row=0, column=0, padx=(0, 10))
         
-        # 결과 표시 섹션
-        result_frame = ttk.LabelFrame(main_frame, text="분석 결과", padding="10")
-        result_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.progress = ttk.Progressbar(action_frame, length=200, mode="determinate")
+        self.progress.grid(row=0, column=1)
+        self.progress_label = ttk.Label(action_frame, text="")
+        self.progress_label.grid(row=0, column=2, padx=(10, 0))
+        self.cancel_button = ttk.Button(action_frame, text="취소", state=tk.DISABLED,
+                                        command=lambda: self.runner.cancel("analyze"))
+        self.cancel_button.grid(row=0, column=3, padx=(10, 0))
+        
+        # 결과 표시 섹션 (탭: 빈도 분석 / 번호 조합 통계)
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        
+        result_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(result_frame, text="분석 결과")
 
         ttk.Label(result_frame, text="빈도수 배열 (1~45번):").grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
         self.frequency_text = tk.Text(result_frame, height=3, wrap=tk.WORD)
@@ -57,22 +91,16 @@ class LottoAnalyzer:
         # 상세 분석 결과 트리뷰
         ttk.Label(result_frame, text="상세 분석 결과:").grid(row=6, column=0, sticky=tk.W, pady=(0, 5))
         
-        columns = ("번호", "일반 빈도", "보너스 빈도", "총 빈도")
-        self.tree = ttk.Treeview(result_frame, columns=columns, show="headings", height=10)
-        
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, anchor=tk.CENTER)
-        
-        # 스크롤바 추가
-        scrollbar = ttk.Scrollbar(result_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.tree.grid(row=7, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=7, column=1, sticky=(tk.N, tk.S))
+        # 보이는 행만 만드는 표 (열 제목을 누르면 정렬, 필터 입력 가능)
+        columns = ("번호", "일반 빈도", "보너스 빈도", "총 빈도", "포함 확률(%)")
+        self.tree = VirtualTable(result_frame, columns, height=10, widths=(100, 100, 100, 100, 100))
+        self.tree.grid(row=7, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # 내보내기 버튼
         ttk.Button(result_frame, text="결과 저장", command=self.save_results).grid(row=8, column=0, pady=(10, 0))
+        # 총 빈도로 추첨할 때의 정확한 확률 (작업 스레드에서 계산)
+        self.probability_label = ttk.Label(result_frame, text="")
+        self.probability_label.grid(row=8, column=1, sticky=tk.W, pady=(10, 0))
         
         # 그리드 가중치 설정
         main_frame.columnconfigure(0, weight=1)
@@ -80,6 +108,50 @@ class LottoAnalyzer:
         result_frame.columnconfigure(0, weight=1)
         result_frame.rowconfigure(7, weight=1)
         file_frame.columnconfigure(0, weight=1)
+        
+        self.setup_cooccur_tab()
+    
+    def setup_cooccur_tab(self):
+        """번호 조합 통계 탭 (저장된 회차 DB 기준)"""
+        cooccur_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(cooccur_frame, text="번호 조합 통계")
+        self.cooccur_loaded = False
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+        top_frame = ttk.Frame(cooccur_frame)
+        top_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Button(top_frame, text="통계 새로고침", command=self.display_cooccurrence).grid(row=0, column=0, padx=(0, 10))
+        ttk.Button(top_frame, text="번호 쌍 저장", command=lambda: self.export_stats_table(
+            export.PAIR_COLUMNS, lambda: export.pair_chunks(get_cooccurrence_stats().pairs), "pairs.csv")
+        ).grid(row=0, column=1, padx=(0, 5))
+        ttk.Button(top_frame, text="회차 기록 저장", command=lambda: self.export_stats_table(
+            export.ROUND_COLUMNS, lambda: export.round_chunks(get_draw_database()), "rounds.csv")
+        ).grid(row=0, column=2, padx=(0, 10))
+        self.cooccur_label = ttk.Label(top_frame, text="")
+        self.cooccur_label.grid(row=0, column=3, sticky=tk.W)
+        
+        # 번호별 간격/연속 출현 통계
+        columns = ("번호", "출현", "현재 미출현", "최장 미출현", "최장 연속 출현", "최다 동반 번호")
+        self.number_tree = VirtualTable(cooccur_frame, columns, height=8, widths=(90,) * 6, filterable=False)
+        self.number_tree.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 모든 번호 쌍 / 세 개 조합 (15,180행, 처음에는 횟수 많은 순)
+        columns = ("구분", "조합", "횟수")
+        self.combo_tree = VirtualTable(cooccur_frame, columns, height=8, widths=(120, 120, 120))
+        self.combo_tree.sort_by(2, descending=True)
+        self.combo_tree.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        
+        self.run_label = ttk.Label(cooccur_frame, text="")
+        self.run_label.grid(row=3, column=0, sticky=tk.W, pady=(5, 0))
+        
+        cooccur_frame.columnconfigure(0, weight=1)
+        cooccur_frame.rowconfigure(1, weight=1)
+        cooccur_frame.rowconfigure(2, weight=1)
+    
+    def on_tab_changed(self, event):
+        # 통계 탭을 처음 열 때 한 번 계산 (이후에는 새로고침 버튼)
+        if not self.cooccur_loaded and self.notebook.index("current") == 1:
+            self.display_cooccurrence()
     
     def select_files(self):
         files = filedialog.askopenfilenames(
@@ -106,86 +178,68 @@ class LottoAnalyzer:
             messagebox.showwarning("경고", "분석할 파일을 선택해주세요.")
             return
         
-        try:
-            # 모든 당첨번호와 보너스번호 수집
-            all_numbers = []
-            all_bonus = []
-            
-            for file_path in self.files:
-                numbers, bonus = self.extract_numbers_from_file(file_path)
-                all_numbers.extend(numbers)
-                all_bonus.extend(bonus)
-            
-            if not all_numbers:
-                messagebox.showerror("오류", "당첨번호 데이터를 찾을 수 없습니다.")
-                return
-            
-            # 빈도 분석
-            self.analysis_results = self.calculate_frequencies(all_numbers, all_bonus)
-            self.display_results()
-            
-            messagebox.showinfo("완료", f"총 {len(all_numbers)}개 회차의 데이터를 분석했습니다.")
-            
-        except Exception as e:
-            messagebox.showerror("오류", f"분석 중 오류가 발생했습니다:\n{str(e)}")
+        # 파일 파싱은 작업 스레드가 프로세스 풀로 처리하고 진행 상황은 root.after로 받는다
+        total = len(self.files)
+        self.analyze_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress.configure(maximum=total, value=0)
+        self.progress_label.config(text=f"0/{total}")
+        
+        summaries = []
+        errors = []
+        self.runner.submit("analyze", files_task, list(self.files), coalesce=False,
+                           on_progress=lambda done, total, result: self.on_file_analyzed(done, total, result, summaries, errors),
+                           on_done=lambda _: self.finish_analysis(summaries, errors),
+                           on_cancel=self.on_analysis_cancelled,
+                           on_error=self.on_analysis_error)
     
-    def extract_numbers_from_file(self, file_path):
-        """Excel 파일에서 당첨번호와 보너스번호 추출"""
-        numbers = []
-        bonus_numbers = []
+    def on_file_analyzed(self, done, total, result, summaries, errors):
+        """파일 하나의 분석 결과 (GUI 스레드에서 호출)"""
+        file_path, summary, error = result
+        if error is None:
+            summaries.append(summary)
+        else:
+            errors.append(f"{os.path.basename(file_path)}: {error}")
+        self.progress.configure(value=done)
+        self.progress_label.config(text=f"{done}/{total}")
+    
+    def reset_progress(self):
+        self.analyze_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress.configure(value=0)
+        self.progress_label.config(text="")
+    
+    def on_analysis_cancelled(self):
+        self.reset_progress()
+        self.progress_label.config(text="취소됨")
+    
+    def on_analysis_error(self, error):
+        self.reset_progress()
+        messagebox.showerror("오류", f"분석 중 오류가 발생했습니다:\n{error}")
+    
+    def finish_analysis(self, summaries, errors):
+        self.reset_progress()
+        if errors:
+            messagebox.showwarning("경고", "다음 파일은 처리하지 못했습니다:\n" + "\n".join(errors))
         
-        try:
-            # Excel 파일 읽기
-            df = pd.read_excel(file_path, header=None)
-            
-            # 데이터가 있는 행들 찾기 (숫자 데이터가 7개 이상 있는 행)
-            for idx, row in df.iterrows():
-                # 행의 마지막 부분에서 숫자 찾기
-                row_values = row.dropna().tolist()
-                
-                # 숫자만 필터링
-                numeric_values = []
-                for val in row_values:
-                    try:
-                        if isinstance(val, (int, float)) and 1 <= val <= 45:
-                            numeric_values.append(int(val))
-                    except:
-                        continue
-                
-                # 연속된 7개의 숫자가 있으면 당첨번호로 판단
-                if len(numeric_values) >= 7:
-                    # 마지막 7개를 당첨번호로 간주
-                    winning_nums = numeric_values[-7:]
-                    numbers.append(winning_nums[:6])  # 1~6번 번호
-                    bonus_numbers.append(winning_nums[6])  # 보너스 번호
+        # 파일별 빈도수를 더해서 합침
+        normal_freq, bonus_freq, _, total_draws = merge_summaries(summaries)
+        if not total_draws:
+            messagebox.showerror("오류", "당첨번호 데이터를 찾을 수 없습니다.")
+            return
         
-        except Exception as e:
-            print(f"파일 {file_path} 처리 중 오류: {e}")
+        self.analysis_results = self.build_results(normal_freq.tolist(), bonus_freq.tolist(), total_draws)
+        self.display_results()
         
-        return numbers, bonus_numbers
+        messagebox.showinfo("완료", f"총 {total_draws}개 회차의 데이터를 분석했습니다.")
     
-    def calculate_frequencies(self, all_numbers, all_bonus):
-        """빈도수 계산"""
-        # 1~45번까지 각 번호의 빈도수 초기화
-        normal_freq = [0] * 45
-        bonus_freq = [0] * 45
-        
-        # 일반 번호 빈도수 계산
-        for draw_numbers in all_numbers:
-            for num in draw_numbers:
-                if 1 <= num <= 45:
-                    normal_freq[num - 1] += 1
-        
-        # 보너스 번호 빈도수 계산
-        for bonus_num in all_bonus:
-            if 1 <= bonus_num <= 45:
-                bonus_freq[bonus_num - 1] += 1
-        
+    def build_results(self, normal_freq, bonus_freq, total_draws):
+        """빈도수 목록으로 분석 결과 구성"""
         return {
             'normal_freq': normal_freq,
             'bonus_freq': bonus_freq,
             'total_freq': [normal_freq[i] + bonus_freq[i] for i in range(45)],
-            'total_draws': len(all_numbers)
+            'total_draws': total_draws
         }
     
     def display_results(self):
@@ -197,78 +251,106 @@ class LottoAnalyzer:
         bonus_freq = self.analysis_results['bonus_freq']
         total_freq = self.analysis_results['total_freq']
 
-        self.frequency_text.delete(1.0, tk.END)
-        freq_str = str(normal_freq)
-        self.frequency_text.insert(tk.END, freq_str)
-
-        self.bonus_text.delete(1.0, tk.END)
-        bonus_str = str(bonus_freq)
-        self.bonus_text.insert(tk.END, bonus_str)
-        
-        # 전체 빈도수 배열 텍스트 표시
-        self.total_text.delete(1.0, tk.END)
-        total_str = str(total_freq)
-        self.total_text.insert(tk.END, total_str)
-        
-        # 트리뷰에 상세 결과 표시
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for i in range(45):
-            number = i + 1
-            normal_count = normal_freq[i]
-            bonus_count = bonus_freq[i]
-            total_count = normal_count + bonus_count
-            
-            self.tree.insert("", "end", values=(number, normal_count, bonus_count, total_count))
+        # 내용이 바뀐 텍스트 칸만 다시 쓴다
+        self.set_text(self.frequency_text, str(normal_freq))
+        self.set_text(self.bonus_text, str(bonus_freq))
+        self.set_text(self.total_text, str(total_freq))
+        
+        # 표는 배열만 바꾸고, 화면에 보이는 행 중 값이 달라진 칸만 갱신된다
+        self.tree.set_data(np.arange(1, 46), normal_freq, bonus_freq, total_freq, ["-"] * 45)
+        self.update_probabilities(total_freq)
+    
+    def update_probabilities(self, weights):
+        """총 빈도를 가중치로 추첨할 때의 번호별 포함 확률 계산 (표가 없으면 처음 한 번 수 초)"""
+        self.probability_label.config(text="조합 확률 계산 중...")
+        self.runner.submit("probabilities", probabilities_task, list(weights),
+                           on_progress=lambda done, total, _: self.probability_label.config(
+                               text=f"조합 확률 계산 중 {done * 100 // total}%"),
+                           on_done=self.show_probabilities,
+                           on_error=lambda e: self.probability_label.config(text=f"조합 확률 계산 실패: {e}"))
+    
+    def show_probabilities(self, result):
+        inclusion, numbers, probability = result
+        results = self.analysis_results
+        self.tree.set_data(np.arange(1, 46), results['normal_freq'], results['bonus_freq'],
+                           results['total_freq'], np.round(inclusion * 100, 3))
+        self.probability_label.config(
+            text=f"가장 확률이 큰 조합: {' '.join(map(str, numbers))} "
+                 f"({probability:.3e}, 균등 추첨 {1 / COMBINATIONS:.3e})")
+    
+    def set_text(self, widget, text):
+        """텍스트 칸 내용 교체 (같은 내용이면 건드리지 않음)"""
+        if self.shown_text.get(widget) == text:
+            return
+        widget.delete(1.0, tk.END)
+        widget.insert(tk.END, text)
+        self.shown_text[widget] = text
+    
+    def display_cooccurrence(self):
+        """저장된 회차로 번호 조합 통계 표시 (캐시에서 새 회차만 반영)"""
+        try:
+            stats = get_cooccurrence_stats()
+        except Exception as e:
+            messagebox.showerror("오류", f"통계를 계산하지 못했습니다:\n{str(e)}")
+            return
+        self.cooccur_loaded = True
+        
+        if not stats.count:
+            self.cooccur_label.config(text="저장된 회차가 없습니다. 추첨기(coll.py)에서 Excel 분석을 먼저 수행하세요.")
+        else:
+            self.cooccur_label.config(text=f"저장된 {stats.count}개 회차 기준 ({stats.first_round}~{stats.last_round}회)")
+        
+        gaps = stats.current_gaps()
+        partners, partner_counts = stats.best_partners()
+        partner_text = [f"{p} ({c}회)" if c else "-" for p, c in zip(partners, partner_counts)]
+        self.number_tree.set_data(np.arange(1, 46), stats.frequencies, gaps, stats.longest_gap,
+                                  stats.longest_streak, partner_text)
+        self.combo_tree.set_data(*stats.combo_counts())
+        
+        runs = ", ".join(f"{k}개 {stats.run_lengths[k]}회" for k in range(2, 7) if stats.run_lengths[k])
+        self.run_label.config(text=f"연속 번호가 있는 회차: {runs or '없음'}")
     
     def save_results(self):
-        """결과를 파일로 저장"""
+        """결과를 파일로 저장 (확장자에 따라 텍스트 보고서 / CSV / Parquet / npy)"""
         if not self.analysis_results:
             messagebox.showwarning("경고", "저장할 분석 결과가 없습니다.")
             return
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("Text files", "*.txt"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"),
+                       ("NumPy files", "*.npy"), ("All files", "*.*")]
         )
         
         if file_path:
             try:
-                normal_freq = self.analysis_results['normal_freq']
-                bonus_freq = self.analysis_results['bonus_freq']
-                total_freq = self.analysis_results['total_freq']
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("로또 번호 빈도 분석 결과\n")
-                    f.write("=" * 50 + "\n\n")
-                    f.write(f"총 분석 회차: {self.analysis_results['total_draws']}회\n\n")
-                    
-                    f.write("일반 번호 빈도수 배열 (1~45번):\n")
-                    f.write(str(normal_freq) + "\n\n")
-                    
-                    f.write("보너스 번호 빈도수 배열 (1~45번):\n")
-                    f.write(str(bonus_freq) + "\n\n")
-                    
-                    f.write("전체 번호 빈도수 배열 (일반+보너스, 1~45번):\n")
-                    f.write(str(total_freq) + "\n\n")
-                    
-                    f.write("상세 분석 결과:\n")
-                    f.write("번호\t일반빈도\t보너스빈도\t총빈도\n")
-                    f.write("-" * 40 + "\n")
-                    
-                    for i in range(45):
-                        number = i + 1
-                        normal_count = normal_freq[i]
-                        bonus_count = bonus_freq[i]
-                        total_count = normal_count + bonus_count
-                        f.write(f"{number}\t{normal_count}\t\t{bonus_count}\t\t{total_count}\n")
-                
+                fmt = export.format_for_path(file_path, default=export.FORMAT_TEXT)
+                if fmt == export.FORMAT_TEXT:
+                    export.write_report(file_path, self.analysis_results)
+                else:
+                    chunks = export.frequency_chunks(self.analysis_results['normal_freq'],
+                                                     self.analysis_results['bonus_freq'])
+                    export.export_table(file_path, fmt, export.FREQUENCY_COLUMNS, chunks)
                 messagebox.showinfo("완료", f"결과가 저장되었습니다:\n{file_path}")
                 
             except Exception as e:
                 messagebox.showerror("오류", f"저장 중 오류가 발생했습니다:\n{str(e)}")
-
+    
+    def export_stats_table(self, columns, make_chunks, default_name):
+        """번호 조합 통계 탭의 표를 CSV / Parquet / npy로 저장"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv", initialfile=default_name,
+            filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet"), ("NumPy files", "*.npy")]
+        )
+        if not file_path:
+            return
+        try:
+            # 회차 DB(SQLite) 연결은 만든 스레드에서만 쓸 수 있으므로 GUI 스레드에서 바로 저장한다
+            rows, seconds = export.export_table(file_path, export.format_for_path(file_path),
+                                                columns, make_chunks())
+            self.cooccur_label.config(text=f"저장 완료: {export.format_throughput(rows, seconds)}")
+        except Exception as e:
+            messagebox.showerror("오류", f"저장 중 오류가 발생했습니다:\n{str(e)}")
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+
+
+class TaskCancelled(Exception):
+    """작업이 취소되었을 때 작업 함수 안에서 발생"""
+
+
+class Task:
+    """작업 스레드에서 실행되는 함수에 넘겨지는 핸들 (진행 상황 보고, 취소 확인)"""
+
+    def __init__(self, key, messages):
+        self.key = key
+        self._messages = messages
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        """취소되었으면 TaskCancelled를 발생 (작업 함수가 중간중간 호출)"""
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def report(self, done, total, data=None):
+        """진행 상황을 GUI 스레드로 보낸다. data는 on_progress에 그대로 전달된다."""
+        self._messages.put((self, "progress", (done, total, data)))
+
+
+class BackgroundRunner:
+    """Tk 창을 멈추지 않고 오래 걸리는 작업을 실행
+
+    작업 함수는 별도 스레드에서 func(task, *args)로 실행되고, 결과와 진행
+    상황은 큐를 거쳐 root.after로 GUI 스레드에서 콜백된다. 한 번 확인할 때
+    budget_ms 이상 콜백을 처리하지 않으므로 이벤트 루프가 오래 막히지 않는다.
+
+    같은 key의 작업이 실행 중일 때 다시 요청하면 새 스레드를 만들지 않고
+    마지막 요청 하나만 기억했다가 앞 작업이 끝나면 실행한다 (연타 합치기).
+    """
+
+    def __init__(self, root, poll_ms=15, budget_ms=8):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.budget = budget_ms / 1000
+        self._messages = queue.Queue()
+        self._running = {}
+        self._pending = {}
+        self._polling = False
+
+    def is_running(self, key):
+        return key in self._running
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, on_progress=None,
+               on_cancel=None, coalesce=True):
+        """작업 시작. 같은 key가 실행 중이면 coalesce=True일 때 끝난 뒤 한 번 더 실행, 아니면 무시."""
+        if key in self._running:
+            if coalesce:
+                self._pending[key] = (func, args, on_done, on_error, on_progress, on_cancel)
+            return self._running[key][0]
+
+        task = Task(key, self._messages)
+        self._running[key] = (task, on_done, on_error, on_progress, on_cancel)
+        thread = threading.Thread(target=self._run, args=(task, func, args), daemon=True)
+        thread.start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return task
+
+    def cancel(self, key):
+        """실행 중인 작업에 취소를 요청하고 대기 중인 재실행도 버린다."""
+        self._pending.pop(key, None)
+        entry = self._running.get(key)
+        if entry is not None:
+            entry[0].cancel()
+
+    def cancel_all(self):
+        for key in list(self._running):
+            self.cancel(key)
+
+    def _run(self, task, func, args):
+        try:
+            result = func(task, *args)
+        except TaskCancelled:
+            self._messages.put((task, "cancelled", None))
+        except Exception as e:
+            self._messages.put((task, "error", e))
+        else:
+            if task.cancelled:
+                self._messages.put((task, "cancelled", None))
+            else:
+                self._messages.put((task, "done", result))
+
+    def _poll(self):
+        deadline = time.perf_counter() + self.budget
+        while time.perf_counter() < deadline:
+            try:
+                task, kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch(task, kind, payload)
+
+        if self._running or not self._messages.empty():
+            # 처리할 메시지가 남아 있으면 바로 다시, 아니면 poll_ms 뒤에 확인
+            self.root.after(1 if not self._messages.empty() else self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _dispatch(self, task, kind, payload):
+        entry = self._running.get(task.key)
+        if entry is None or entry[0] is not task:
+            return
+        _, on_done, on_error, on_progress, on_cancel = entry
+        if kind == "progress":
+            # 취소 요청 뒤에 도착한 진행 상황은 버린다
+            if on_progress is not None and not task.cancelled:
+                on_progress(*payload)
+            return
+
+        del self._running[task.key]
+        if kind == "done" and on_done is not None:
+            on_done(payload)
+        elif kind == "error" and on_error is not None:
+            on_error(payload)
+        elif kind == "cancelled" and on_cancel is not None:
+            on_cancel()
+
+        pending = self._pending.pop(task.key, None)
+        if pending is not None:
+            func, args, on_done, on_error, on_progress, on_cancel = pending
+            self.submit(task.key, func, *args, on_done=on_done, on_error=on_error,
+                        on_progress=on_progress, on_cancel=on_cancel)
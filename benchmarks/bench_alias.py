@@ -0,0 +1,56 @@
+import bisect
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entropy import hardware_pool
+from sampler import get_alias_table
+
+# random_lotto.py의 가중치 데이터
+FREQUENCIES = [
+    192, 181, 191, 188, 172, 190, 192, 173, 151, 182,
+    184, 199, 197, 188, 182, 184, 195, 188, 182, 192,
+    183, 157, 159, 188, 165, 189, 198, 169, 163, 181,
+    185, 171, 197, 203, 184, 180, 188, 191, 185, 187,
+    158, 173, 194, 180, 187
+]
+
+
+# coll.py의 누적합 + bisect 경로 (generate_numbers가 매번 하던 작업)
+def build_weighted_table(weights):
+    cumulative = []
+    total = 0
+    for w in weights:
+        total += w
+        cumulative.append(total)
+    return cumulative, total
+
+
+def bisect_unique(frequencies, method):
+    cumulative_weights, total_weight = build_weighted_table(frequencies)
+    numbers = set()
+    while len(numbers) < 6:
+        if method == 'pseudo':
+            r = random.uniform(0, total_weight)
+        else:
+            r = hardware_pool.random_float() * total_weight
+        numbers.add(bisect.bisect_left(cumulative_weights, r) + 1)
+    return sorted(numbers)
+
+
+def alias_unique(frequencies, method):
+    return get_alias_table(frequencies, True).sample_unique(6, method)
+
+
+def main(number=20000):
+    for method in ('pseudo', 'hardware'):
+        for name, func in (("bisect", bisect_unique), ("alias", alias_unique)):
+            seconds = min(timeit.repeat(lambda: func(FREQUENCIES, method), number=number, repeat=5))
+            print(f"{method:8s} {name:6s} {seconds / number * 1e6:8.2f} us/추첨")
+
+
+if __name__ == "__main__":
+    main()
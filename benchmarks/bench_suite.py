@@ -0,0 +1,366 @@
+"""성능 측정 모음 (Excel 읽기, 빈도 집계, 빈도수 저장소, 번호 생성, 내보내기, 조합 색인, 휠, 분포 감시,
+폴더 감시 지연)
+
+    python benchmarks/bench_suite.py                       # 측정 후 표 출력
+    python benchmarks/bench_suite.py --save base.json      # 기준값 저장
+    python benchmarks/bench_suite.py --baseline base.json  # 기준보다 느려지면 종료 코드 1
+
+합성 Excel 파일은 매번 임시 폴더에 고정 시드로 만들므로 네트워크나 실제 데이터가
+필요 없고, 같은 크기면 항상 같은 내용이다. 데이터 폴더도 임시 폴더를 쓰므로
+/rand_a의 실제 빈도수 파일은 건드리지 않는다.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+# 합성 Excel 회차 수 (점점 크게)
+HISTORY_SIZES = (100, 1000, 10000)
+# 번호 생성 처리량을 잴 때 한 번에 만드는 조합 수
+TICKET_BATCH = 100000
+# 폴더 감시 지연을 잴 때 넣는 Excel 파일의 회차 수 (실제 전체 회차 내려받기 파일 크기)
+WATCH_ROUNDS = 1200
+# GUI 경로 1회 추첨 지연 시간 측정 횟수
+LATENCY_SAMPLES = 5000
+# 기준값 대비 이 배율보다 느려지면 실패
+DEFAULT_THRESHOLD = 1.25
+# 타이머 해상도 수준(초)의 차이는 무시
+NOISE_FLOOR = 1e-6
+
+
+def make_history(path, rounds, seed=0):
+    """동행복권 내려받기 형식과 같은 배치의 합성 Excel 파일을 만든다."""
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["로또 당첨번호"])
+    ws.append([])
+    ws.append(["년도", "회차", "추첨일", "1등 당첨자수", "1등 금액",
+               "번호1", "번호2", "번호3", "번호4", "번호5", "번호6", "보너스"])
+    first_day = datetime.date(2002, 12, 7)
+    for r in range(rounds, 0, -1):
+        numbers = rnd.sample(range(1, 46), 7)
+        ws.append([2002 + r // 52, r, first_day + datetime.timedelta(weeks=r - 1),
+                   rnd.randint(0, 20), f"{rnd.randint(1, 30) * 10**8:,}원"] + numbers)
+    wb.save(path)
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """한 번 호출에 걸리는 시간(초). 여러 번 반복해서 가장 빠른 값을 쓴다."""
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def latencies(func, samples):
+    """호출마다 걸린 시간(초) 배열"""
+    func()
+    result = np.empty(samples)
+    for i in range(samples):
+        start = time.perf_counter()
+        func()
+        result[i] = time.perf_counter() - start
+    return result
+
+
+def bench_ingest(files):
+    import lotto_core
+    import parse_cache
+    from ingest import extract_draws
+
+    results = {}
+    for rounds, path in files.items():
+        numbers, bonus, _ = lotto_core.extract_numbers_from_file(path)
+        assert len(numbers) == rounds
+        results[f"ingest.extract[{rounds}]"] = measure(
+            lambda: extract_draws(path, cache=False), repeat=3, min_time=0)
+
+        def cached():
+            # 프로세스 안 기억은 비우고 캐시 파일에서 읽는 경우를 잰다
+            parse_cache._memory.clear()
+            return extract_draws(path)
+
+        results[f"ingest.cached[{rounds}]"] = measure(cached)
+        results[f"ingest.frequencies[{rounds}]"] = measure(
+            lambda: lotto_core.calculate_frequencies(numbers, bonus))
+    return results
+
+
+def bench_store(normal_freq, bonus_freq, latest_round):
+    import lotto_core
+
+    lotto_core.save_frequencies(normal_freq, bonus_freq, latest_round)
+    return {
+        "store.save": measure(lambda: lotto_core.save_frequencies(normal_freq, bonus_freq, latest_round)),
+        "store.load": measure(lotto_core.load_frequencies),
+    }
+
+
+def bench_tickets(freqs):
+    """방식별 초당 조합 수 (값이 클수록 좋으므로 1조합당 시간으로 저장한다)"""
+    import lotto_core
+    from rng import METHODS, SEEDED_METHODS, RandomStream, make_generator
+    from sampler import generate_tickets, get_alias_table
+
+    results = {}
+    for method in METHODS:
+        # 시드 방식은 고정 시드 스트림 하나를 이어서 쓴다 (호출마다 새로 시드하지 않음)
+        stream = RandomStream(method, 0) if method in SEEDED_METHODS else None
+        generator = make_generator(method, 0) if method in SEEDED_METHODS else None
+        per_call = measure(lambda: lotto_core.get_weighted_unique_numbers(freqs, method, rng=stream))
+        results[f"tickets.bisect.{method}"] = per_call
+        per_call = measure(lambda: get_alias_table(freqs, True).sample_unique(6, method, rng=stream))
+        results[f"tickets.alias.{method}"] = per_call
+        per_batch = measure(lambda: generate_tickets(freqs, TICKET_BATCH, method, rng=generator), repeat=3)
+        results[f"tickets.batch.{method}"] = per_batch / TICKET_BATCH
+    return results
+
+
+def bench_export(data_dir):
+    """형식별 티켓 내보내기의 1행당 시간 (TICKET_BATCH행을 EXPORT_CHUNK씩 나눠 저장)"""
+    from export import EXPORT_CHUNK, FORMAT_CSV, FORMAT_NPY, TICKET_COLUMNS, export_table
+
+    tickets = np.random.default_rng(0).integers(1, 46, (TICKET_BATCH, 6), dtype=np.uint8)
+
+    def chunks():
+        return (tickets[i:i + EXPORT_CHUNK] for i in range(0, TICKET_BATCH, EXPORT_CHUNK))
+
+    results = {}
+    for fmt in (FORMAT_CSV, FORMAT_NPY):
+        path = os.path.join(data_dir, f"export.{fmt}")
+        per_batch = measure(lambda: export_table(path, fmt, TICKET_COLUMNS, chunks()), repeat=3)
+        results[f"export.{fmt}"] = per_batch / TICKET_BATCH
+    return results
+
+
+def bench_combo_index(freqs):
+    """조합 색인: 처음 만들기, 조건 적용 + TICKET_BATCH장 추첨 (새 조건 / 같은 조건 재사용),
+    정확한 조합 확률 표 만들기와 누적 확률로 TICKET_BATCH장 추첨"""
+    import lotto_core
+    from combo_index import build_index, get_index_filename
+    from combo_prob import ComboProbabilities, get_table_dir
+
+    constraints = {"sum": (100, 170), "odd": 3, "run": (1, 2), "exclude": (1, 2, 3)}
+    results = {"combo.build": measure(lambda: build_index(get_index_filename()), repeat=1, min_time=0)}
+    index = lotto_core.get_combo_index()
+    generator = np.random.default_rng(0)
+
+    def fresh():
+        index._subsets.clear()
+        return index.sample(freqs, TICKET_BATCH, rng=generator, **constraints)
+
+    results["combo.filtered_sample"] = measure(fresh, repeat=3)
+    results["combo.cached_sample"] = measure(lambda: index.sample(freqs, TICKET_BATCH, rng=generator, **constraints))
+    results["combo.exact_build"] = measure(
+        lambda: ComboProbabilities.build(get_table_dir(), freqs, index), repeat=1, min_time=0)
+    table = lotto_core.get_combo_probabilities(freqs)
+    results["combo.exact_sample"] = measure(lambda: table.sample(TICKET_BATCH, rng=generator))
+    return results
+
+
+def bench_wheel(freqs):
+    """20개 번호 풀에서 50장 휠 만들기 (번호 쌍 / 가중 세 개 조합 / 4개 중 3개 맞춤 보장)"""
+    from wheel import build_wheel
+
+    pool = range(1, 21)
+    return {
+        "wheel.pairs": measure(lambda: build_wheel(pool, 50, 2, seed=0), repeat=3),
+        "wheel.triples": measure(lambda: build_wheel(pool, 50, 3, weights=freqs, seed=0), repeat=3),
+        "wheel.guarantee": measure(lambda: build_wheel(pool, 50, 4, 3, seed=0), repeat=3),
+    }
+
+
+def bench_instrument():
+    """계측 span 하나가 더하는 호출 비용 (꺼짐/켜짐)"""
+    import instrument
+
+    def noop():
+        return None
+
+    wrapped = instrument.span("bench.noop")(noop)
+    base = measure(noop)
+    results = {"instrument.span_off": max(measure(wrapped) - base, 0.0)}
+    instrument.enable()
+    try:
+        results["instrument.span_on"] = max(measure(wrapped) - base, 0.0)
+    finally:
+        instrument.enable(False)
+        instrument.reset()
+    return results
+
+
+def bench_gof(freqs):
+    """분포 감시를 켜고 끈 묶음 생성 시간과 검정 한 번 (기대 확률 표는 bench_combo_index에서 만든 것)"""
+    import gof_monitor
+    from rng import make_generator
+    from sampler import generate_tickets
+
+    generator = make_generator("pcg64", 0)
+    monitor = gof_monitor.get_monitor(freqs)
+    monitor.expectation(wait=True)
+    results = {"gof.generate_off": float("inf"), "gof.generate_on": float("inf")}
+    try:
+        # 켜고 끈 측정을 번갈아 해서 기계 상태 변화가 한쪽에만 몰리지 않게 한다
+        for _ in range(3):
+            for name, on in (("gof.generate_off", False), ("gof.generate_on", True)):
+                gof_monitor.enable(on)
+                seconds = measure(lambda: generate_tickets(freqs, TICKET_BATCH, "pcg64", rng=generator), repeat=3)
+                results[name] = min(results[name], seconds)
+        results["gof.check"] = measure(monitor.check)
+    finally:
+        gof_monitor.enable(False)
+        gof_monitor.reset()
+    return results
+
+
+def bench_watch(data_dir, rounds=WATCH_ROUNDS, samples=3):
+    """감시 폴더에 회차가 하나 늘어난 Excel 파일을 넣은 뒤 저장소 일련번호가 바뀔 때까지 (inotify/폴링)"""
+    from freq_store import FrequencyStore, get_store_filename
+    from watcher import FolderWatcher
+
+    store = FrequencyStore(get_store_filename())
+    results = {}
+    for mode, use_inotify in (("inotify", True), ("polling", False)):
+        inbox = os.path.join(data_dir, f"inbox_{mode}")
+        os.makedirs(inbox)
+        watcher = FolderWatcher(inbox, use_inotify=use_inotify).start()
+        times = []
+        for i in range(samples):
+            rounds += 1
+            source = os.path.join(data_dir, f"drop_{rounds}.xlsx")
+            make_history(source, rounds, seed=rounds)
+            before = store.header()
+            start = time.perf_counter()
+            # 다 쓴 파일을 옮겨 넣는다 (내려받기 프로그램/복사 도구와 같은 방식)
+            os.replace(source, os.path.join(inbox, os.path.basename(source)))
+            while store.header() == before:
+                time.sleep(0.001)
+            times.append(time.perf_counter() - start)
+        watcher.stop()
+        results[f"watch.latency.{watcher.mode}"] = float(np.median(times))
+    return results
+
+
+def bench_gui_draw(samples):
+    """coll.generate_numbers와 같은 경로(가중치 읽기 + 추첨) 1회의 p50/p99"""
+    import lotto_core
+    from sampler import get_alias_table
+
+    results = {}
+    for method in ("pseudo", "hardware"):
+        def draw():
+            freqs, _ = lotto_core.get_weights()
+            return get_alias_table(freqs, True).sample_unique(6, method)
+
+        times = latencies(draw, samples)
+        results[f"gui.draw.{method}.p50"] = float(np.percentile(times, 50))
+        results[f"gui.draw.{method}.p99"] = float(np.percentile(times, 99))
+    return results
+
+
+def run(sizes=HISTORY_SIZES, samples=LATENCY_SAMPLES):
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ["PICK_LOTTO_DATA_DIR"] = data_dir
+        import lotto_core
+
+        files = {}
+        for rounds in sizes:
+            files[rounds] = os.path.join(data_dir, f"history_{rounds}.xlsx")
+            make_history(files[rounds], rounds, seed=rounds)
+
+        results = bench_ingest(files)
+        numbers, bonus, latest_round = lotto_core.extract_numbers_from_file(files[max(sizes)])
+        normal_freq, bonus_freq = lotto_core.calculate_frequencies(numbers, bonus)
+        results.update(bench_store(normal_freq, bonus_freq, latest_round))
+        freqs = np.add(normal_freq, bonus_freq).tolist()
+        results.update(bench_tickets(freqs))
+        results.update(bench_export(data_dir))
+        results.update(bench_combo_index(freqs))
+        results.update(bench_wheel(freqs))
+        results.update(bench_instrument())
+        results.update(bench_gof(freqs))
+        results.update(bench_watch(data_dir))
+        results.update(bench_gui_draw(samples))
+
+        # 임시 폴더를 지우기 전에 매핑된 저장소 파일을 놓아준다
+        lotto_core._frequency_store = None
+        lotto_core._combo_index = None
+        lotto_core._combo_probabilities = None
+        return results
+
+
+def format_row(name, seconds):
+    if name.startswith("tickets."):
+        return f"{name:32s} {seconds * 1e6:10.3f} us   {1 / seconds:14,.0f} 조합/초"
+    return f"{name:32s} {seconds * 1e6:10.3f} us"
+
+
+def compare(results, baseline, threshold):
+    """기준값보다 threshold배 넘게 느려진 항목 목록"""
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if seconds > base * threshold and seconds - base > NOISE_FLOOR:
+            regressions.append((name, base, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="pick_lotto 성능 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(HISTORY_SIZES),
+                        help="합성 Excel 회차 수 목록")
+    parser.add_argument("--samples", type=int, default=LATENCY_SAMPLES, help="지연 시간 측정 횟수")
+    parser.add_argument("--save", help="측정 결과를 JSON으로 저장")
+    parser.add_argument("--baseline", help="비교할 기준 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"허용 배율 (기본 {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    results = run(tuple(args.sizes), args.samples)
+    for name, seconds in results.items():
+        print(format_row(name, seconds))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, seconds in regressions:
+            print(f"느려짐: {name} {base * 1e6:.3f} us → {seconds * 1e6:.3f} us "
+                  f"({seconds / base:.2f}배)", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
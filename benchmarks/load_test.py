@@ -0,0 +1,109 @@
+"""추첨 서비스(pick_lotto serve) 부하 측정
+
+    python benchmarks/load_test.py --spawn                     # 임시 데이터로 서버를 띄워 측정
+    python benchmarks/load_test.py --port 8645 --clients 64 --duration 10
+
+클라이언트마다 keep-alive 연결 하나로 /generate 요청을 쉬지 않고 보내고,
+초당 요청 수와 지연 시간 백분위를 출력한다. --spawn이면 합성 회차로 채운
+임시 데이터 폴더에서 서버를 띄우므로 실제 빈도수 파일은 건드리지 않는다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+
+async def client(host, port, path, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin1")
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b" 200 " not in status:
+                errors.append(body)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, path, clients, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, deadline, latencies, errors) for _ in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def spawn_server(data_dir):
+    """합성 회차를 저장한 임시 데이터 폴더로 서버를 띄우고 (프로세스, 포트)를 돌려준다."""
+    env = dict(os.environ, PICK_LOTTO_DATA_DIR=data_dir)
+    subprocess.run([sys.executable, "-c", (
+        "import numpy as np, lotto_core\n"
+        "rng = np.random.default_rng(0)\n"
+        "numbers = np.array([rng.choice(45, 7, replace=False) + 1 for _ in range(1000)])\n"
+        "lotto_core.get_draw_database().add_draws(np.arange(1, 1001), numbers[:, :6], numbers[:, 6])\n"
+        "lotto_core.get_draw_database().rebuild_store()\n"
+    )], cwd=ROOT, env=env, check=True)
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "pick_lotto.py"), "serve", "--port", "0"],
+                               cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    port = int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+    return process, port
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="pick_lotto 추첨 서비스 부하 측정")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8645)
+    parser.add_argument("--spawn", action="store_true", help="임시 데이터로 서버를 직접 띄워 측정")
+    parser.add_argument("--clients", type=int, default=64, help="동시 연결 수")
+    parser.add_argument("--duration", type=float, default=5.0, help="측정 시간(초)")
+    parser.add_argument("--path", default="/generate?count=1&method=pseudo", help="요청 경로")
+    args = parser.parse_args(argv)
+
+    process = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        try:
+            if args.spawn:
+                process, args.port = spawn_server(data_dir)
+            # 연결 확인 겸 준비 요청 (추첨 표를 미리 만든다)
+            asyncio.run(run_load(args.host, args.port, args.path, 1, 0.2))
+            latencies, errors, elapsed = asyncio.run(
+                run_load(args.host, args.port, args.path, args.clients, args.duration))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    times = np.array(latencies) * 1000
+    print(f"요청 {len(times):,}개, {elapsed:.1f}초, {len(times) / elapsed:,.0f}요청/초, 오류 {len(errors)}개")
+    if len(times):
+        p50, p99, worst = np.percentile(times, [50, 99, 100])
+        print(f"지연 시간 p50 {p50:.2f} ms, p99 {p99:.2f} ms, 최대 {worst:.2f} ms")
+    if errors:
+        print(json.loads(errors[0]).get("error"), file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
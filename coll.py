@@ -1,173 +1,156 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
-import pandas as pd
-import json
+from tkinter import filedialog, messagebox, ttk
+import argparse
 import os
-import random
-import bisect
-import ctypes
-import datetime
-
-def extract_numbers_from_file(file_path):
-    numbers = []
-    bonus_numbers = []
-    latest_round = 0  # 최신 회차 초기화
-
-    df = pd.read_excel(file_path, header=None)
-    for _, row in df.iterrows():
-        row_values = row.dropna().tolist()
-
-        # 두 번째 열(인덱스 1)에 회차 번호가 있다고 가정
-        if len(row_values) > 1 and isinstance(row_values[1], (int, float)):
-            if int(row_values[1]) > latest_round:
-                latest_round = int(row_values[1])
-
-        # 1~45 숫자만 추출
-        numeric_values = [int(v) for v in row_values if isinstance(v, (int, float)) and 1 <= v <= 45]
-        if len(numeric_values) >= 7:
-            winning = numeric_values[-7:]
-            numbers.append(winning[:6])
-            bonus_numbers.append(winning[6])
-
-    return numbers, bonus_numbers, latest_round
-
-def calculate_frequencies(all_numbers, all_bonus):
-    normal_freq = [0] * 45
-    bonus_freq = [0] * 45
-
-    for draw in all_numbers:
-        for num in draw:
-            normal_freq[num - 1] += 1
-    for b in all_bonus:
-        bonus_freq[b - 1] += 1
-
-    # 이제 두 개 리스트 모두 리턴
-    return normal_freq, bonus_freq
-
-def get_hidden_filename():
-    if os.name == 'nt':
-        base_dir = "C:\\rand_a"
-    else:
-        base_dir = "/rand_a"
-
-    os.makedirs(base_dir, exist_ok=True)
-
-    filename = "frequencies.json" if os.name == 'nt' else ".frequencies.json"
-    return os.path.join(base_dir, filename)
-
-def save_frequencies(normal_freq, bonus_freq, latest_round):
-    filename = get_hidden_filename()
-    data = {
-        "normal_frequencies": normal_freq,
-        "bonus_frequencies": bonus_freq,
-        "latest_round": latest_round
-    }
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f)
-
-def load_frequencies():
-    filename = get_hidden_filename()
-    if not os.path.exists(filename):
-        return None, None, None
-    with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        return data.get("normal_frequencies"), data.get("bonus_frequencies"), data.get("latest_round")
-
-def get_hardware_random_bytes(n):
-    if os.name == 'nt':
-        BCRYPT_USE_SYSTEM_PREFERRED_RNG = 0x00000002
-        bcrypt = ctypes.windll.bcrypt
-        buffer = ctypes.create_string_buffer(n)
-        status = bcrypt.BCryptGenRandom(None, buffer, n, BCRYPT_USE_SYSTEM_PREFERRED_RNG)
-        if status != 0:
-            raise OSError(f"BCryptGenRandom failed: {status}")
-        return buffer.raw
-    else:
-        return os.urandom(n)
-
-def get_hardware_random_float():
-    b = get_hardware_random_bytes(4)
-    return int.from_bytes(b, byteorder='little') / 2**32
-
-def build_weighted_table(weights):
-    cumulative = []
-    total = 0
-    for w in weights:
-        total += w
-        cumulative.append(total)
-    return cumulative, total
-
-def weighted_choice(cumulative_weights, total_weight, method='hardware'):
-    if method == 'pseudo':
-        r = random.uniform(0, total_weight)
-    else:
-        r = get_hardware_random_float() * total_weight
-    return bisect.bisect_left(cumulative_weights, r) + 1
-
-def get_weighted_unique_numbers(frequencies, method='hardware'):
-    cumulative_weights, total_weight = build_weighted_table(frequencies)
-    numbers = set()
-    while len(numbers) < 6:
-        num = weighted_choice(cumulative_weights, total_weight, method)
-        numbers.add(num)
-    return sorted(numbers)
+import queue
+import time
+import multiprocessing
+import numpy as np
+import gof_monitor
+import instrument
+from background import BackgroundRunner
+from rng import (METHOD_HARDWARE, METHOD_PSEUDO, METHOD_PCG64, METHOD_PHILOX, SEEDED_METHODS,
+                 RandomStream, make_generator, new_seed)
+from sampler import WeightedTable, generate_tickets, get_alias_table
+from tickets import TicketSet, generate_unique_tickets, unrank
+from ingest import extract_round_records, files_task
+from export import TICKET_COLUMNS, export_table, format_for_path, format_throughput
+from weighting import MODE_ALL, MODE_WINDOW, MODE_DECAY
+from simulate import run_simulation, format_eta, format_results
+from table_view import VirtualTable
+from wheel import build_wheel, format_stats, parse_pool
+from watcher import FolderWatcher, format_result as format_watch_result
+from lotto_core import (get_draw_database, get_frequency_store, load_frequencies, get_weights, get_freq_file_age_text,
+                        get_simulation_history)
+
+# 여러 장 생성에서 한 번에 만들어 저장하는 장 수 (이 단위로 진행 상황 표시와 취소 확인)
+BATCH_BLOCK = 8192
+# 저장소 일련번호 확인 간격 (다른 프로세스나 폴더 감시가 저장한 빈도수를 반영, stat 한 번이라 가볍다)
+STORE_POLL_MS = 250
+
+def current_weights():
+    """선택된 가중치 방식의 (45개 가중치, 최신 회차). 입력이 잘못되었거나 데이터가 없으면 ValueError."""
+    weight_mode = weight_mode_var.get()
+    n = None
+    if weight_mode != MODE_ALL:
+        try:
+            n = int(weight_n_var.get())
+        except ValueError:
+            raise ValueError("회차 수는 1 이상의 정수로 입력하세요.") from None
+    return get_weights(weight_mode, n, include_bonus_var.get())
+
+def current_seed():
+    """시드 방식이면 입력된 시드 (비어 있으면 새로 만들어 칸에 채움), 아니면 None"""
+    if method_var.get() not in SEEDED_METHODS:
+        return None
+    text = seed_var.get().strip()
+    if not text:
+        seed = new_seed()
+        seed_var.set(str(seed))
+        return seed
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError("시드는 정수로 입력하세요.") from None
+
+def get_draw_stream(method, seed):
+    """방식과 시드가 같으면 같은 스트림을 이어서 사용 (시드부터 다시 하면 같은 순서로 재현)"""
+    if _draw_state["key"] != (method, seed):
+        _draw_state.update(key=(method, seed), stream=RandomStream(method, seed), count=0)
+    return _draw_state["stream"]
+
+# 시드 추첨 스트림과 그 스트림으로 몇 번째 추첨인지
+_draw_state = {"key": None, "stream": None, "count": 0}
 
 def generate_numbers():
     method = method_var.get()
-    normal_freq, bonus_freq, latest_round = load_frequencies()
-    if not normal_freq:
-        messagebox.showerror("오류", "빈도수 파일이 없습니다. 먼저 분석을 수행하세요.")
-        return
+    include_bonus = include_bonus_var.get()
 
-    if include_bonus_var.get():
-        freqs = [normal_freq[i] + bonus_freq[i] for i in range(45)]
-    else:
-        freqs = normal_freq
-
-    numbers = get_weighted_unique_numbers(freqs, method)
-    result_var.set("🎯 추첨 결과: " + ", ".join(map(str, numbers)))
-    if latest_round:
-        latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+    try:
+        freqs, latest_round = current_weights()
+        seed = current_seed()
+    except ValueError as e:
+        messagebox.showerror("오류", str(e))
+        return
+    stream = get_draw_stream(method, seed) if seed is not None else None
+
+    def draw(task):
+        # 빈도수가 바뀌지 않았다면 캐시된 별칭 테이블을 그대로 사용
+        numbers = get_alias_table(freqs, include_bonus).sample_unique(6, method, rng=stream)
+        if stream is not None:
+            _draw_state["count"] += 1
+            return numbers, _draw_state["count"]
+        return numbers, None
+
+    def on_done(result):
+        numbers, draw_index = result
+        suffix = f"  (시드 #{draw_index})" if draw_index else ""
+        result_var.set("🎯 추첨 결과: " + ", ".join(map(str, numbers)) + suffix)
+        if latest_round:
+            latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+
+    # 버튼을 연달아 눌러도 추첨은 하나씩만 실행하고 마지막 요청만 이어서 처리
+    runner.submit("generate", draw, on_done=on_done,
+                  on_error=lambda e: messagebox.showerror("오류", str(e)))
 
 def analyze_and_save():
     files = filedialog.askopenfilenames(title="Excel 파일 선택", filetypes=[("엑셀 파일", "*.xlsx")])
     if not files:
         return
 
-    all_numbers = []
-    all_bonus = []
-    latest_round = 0
-
-    for file in files:
-        try:
-            nums, bonus, round_num = extract_numbers_from_file(file)
-            all_numbers.extend(nums)
-            all_bonus.extend(bonus)
-            if round_num > latest_round:
-                latest_round = round_num
-        except Exception as e:
-            messagebox.showerror("에러", f"{file} 처리 중 오류 발생:\n{str(e)}")
-            return
+    # 처음 가져올 때는 이전 JSON 누적값 대신 가져온 회차로 빈도수를 다시 맞춘다
+    first_import = get_draw_database().count() == 0
+    counts = [0, 0]
+    errors = []
+
+    def on_progress(done, total, result):
+        file, records, error = result
+        if error is None:
+            # 이미 저장된 회차는 건너뛰고 새 회차만큼만 빈도수를 더한다
+            rounds, nums, bonus = records
+            counts[0] += get_draw_database().add_draws(rounds, nums, bonus, source=os.path.basename(file))
+            counts[1] += 1
+        else:
+            errors.append(f"{os.path.basename(file)}: {error}")
+        progress_bar.configure(value=done)
+        progress_var.set(f"분석 중... ({done}/{total})")
+
+    def finish():
+        analyze_button.config(state=tk.NORMAL)
+        cancel_button.config(state=tk.DISABLED)
+        progress_bar.configure(value=0)
+        progress_var.set("")
+        if errors:
+            messagebox.showerror("에러", "다음 파일 처리 중 오류 발생:\n" + "\n".join(errors))
+        if not counts[1]:
+            return False
+        if first_import:
+            get_draw_database().rebuild_store()
+        update_freq_status()
+        _, _, latest_round = load_frequencies()
+        latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+        return True
 
-    normal_freq, bonus_freq = calculate_frequencies(all_numbers, all_bonus)
-    save_frequencies(normal_freq, bonus_freq, latest_round)
-    update_freq_status()
-    latest_round_var.set(f"최신 분석 회차: {latest_round}회")
-    messagebox.showinfo("완료", "빈도수 저장 완료")
+    def on_done(_):
+        if finish():
+            messagebox.showinfo("완료", f"빈도수 저장 완료 (새 회차 {counts[0]}개 추가)")
 
-def get_freq_file_age_text():
-    filename = get_hidden_filename()
-    if not os.path.exists(filename):
-        return "빈도수 파일 없음", "red"
+    def on_cancel():
+        # 취소 전에 끝난 파일의 회차는 이미 저장되어 있다
+        if finish():
+            messagebox.showinfo("취소", f"분석을 취소했습니다 (새 회차 {counts[0]}개 추가)")
 
-    last_modified = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
-    days_ago = (datetime.datetime.now() - last_modified).days
-    days_ago = max(days_ago, 0)  # 음수 방지
+    def on_error(e):
+        finish()
+        messagebox.showerror("에러", str(e))
 
-    if days_ago >= 30:
-        return f"빈도수 파일이 오래되었습니다 ({days_ago}일 전)", "red"
-    else:
-        return f"빈도수 최신화: {days_ago}일 전", "green"
+    # 파일 파싱은 작업 스레드가 프로세스 풀로 처리하고, DB 저장은 GUI 스레드에서 파일 단위로 한다
+    analyze_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    progress_bar.configure(maximum=len(files), value=0)
+    progress_var.set(f"분석 중... (0/{len(files)})")
+    runner.submit("import", files_task, list(files), extract_round_records, on_progress=on_progress,
+                  on_done=on_done, on_cancel=on_cancel, on_error=on_error, coalesce=False)
 
 def update_freq_status():
     text, color = get_freq_file_age_text()
@@ -220,19 +203,16 @@ def open_manual_entry_popup():
                 messagebox.showerror("입력 오류", "보너스 번호는 1~6번 번호와 중복될 수 없습니다.")
                 return
 
-            normal_freq, bonus_freq, latest_round = load_frequencies()
-            if normal_freq is None or bonus_freq is None:
-                normal_freq = [0]*45
-                bonus_freq = [0]*45
-                latest_round = 0
-
-            new_round = latest_round + 1
-
-            for n in nums:
-                normal_freq[n-1] += 1
-            bonus_freq[bonus-1] += 1
+            db = get_draw_database()
+            _, _, latest_round = load_frequencies()
+            latest_round = max(latest_round or 0, db.latest_round())
+            last = db.get_draw(latest_round)
+            if last is not None and sorted(last[0]) == sorted(nums) and last[1] == bonus:
+                messagebox.showerror("입력 오류", f"{latest_round}회차와 같은 번호입니다. 이미 등록된 회차입니다.")
+                return
 
-            save_frequencies(normal_freq, bonus_freq, new_round)
+            # 회차를 저장하고 빈도수는 해당 번호만 증가시켜 원자적으로 교체
+            new_round = db.add_draw(nums, bonus, round_num=latest_round + 1)
             latest_round_var.set(f"최신 분석 회차: {new_round}회")
             update_freq_status()
 
@@ -241,50 +221,463 @@ def open_manual_entry_popup():
         except ValueError:
             messagebox.showerror("입력 오류", "모든 칸에 숫자를 정확히 입력하세요.")
 
+    def on_undo():
+        db = get_draw_database()
+        round_num = db.last_round(source="manual")
+        if round_num is None:
+            messagebox.showinfo("알림", "취소할 수동 등록 회차가 없습니다.")
+            return
+        numbers, bonus = db.get_draw(round_num)
+        if not messagebox.askyesno("등록 취소", f"{round_num}회차 ({', '.join(map(str, numbers))} + {bonus}) 등록을 취소할까요?"):
+            return
+        db.delete_round(round_num)
+        _, _, latest_round = load_frequencies()
+        latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+        update_freq_status()
+
     popup.bind("<Return>", on_enter)
     entries[0].focus_set()
 
-    btn = tk.Button(popup, text="등록", command=on_enter)
-    btn.pack(pady=5)
+    btn_row = tk.Frame(popup)
+    btn_row.pack(pady=5)
+    tk.Button(btn_row, text="등록", command=on_enter).grid(row=0, column=0, padx=5)
+    tk.Button(btn_row, text="최근 수동 등록 취소", command=on_undo).grid(row=0, column=1, padx=5)
 
-def load_latest_round_on_start():
-    _, _, latest_round = load_frequencies()
-    if latest_round:
-        latest_round_var.set(f"최신 분석 회차: {latest_round}회")
-    else:
-        latest_round_var.set("최신 분석 회차: 없음")
+def open_simulation_popup():
+    popup = tk.Toplevel(root)
+    popup.title("당첨률 시뮬레이션")
+    popup.geometry("520x330")
+    popup.resizable(False, False)
 
-# --- GUI 구성 ---
-root = tk.Tk()
-root.title("로또 분석 및 추첨기")
-root.geometry("380x280")
-root.resizable(False, False)
+    tk.Label(popup, text="저장된 모든 회차에 대해 가중치 추첨과 균등 추첨 티켓을 채점합니다.").pack(pady=(10, 5))
 
-freq_status_label = tk.Label(root, font=("Arial", 10))
-freq_status_label.pack(pady=5)
-update_freq_status()
+    option_frame = tk.Frame(popup)
+    option_frame.pack()
+    tickets_var = tk.StringVar(value="100000")
+    seed_var = tk.StringVar(value="0")
+    tk.Label(option_frame, text="회차당 티켓 수").grid(row=0, column=0)
+    tk.Entry(option_frame, width=10, justify='center', textvariable=tickets_var).grid(row=0, column=1, padx=5)
+    tk.Label(option_frame, text="시드").grid(row=0, column=2)
+    tk.Entry(option_frame, width=8, justify='center', textvariable=seed_var).grid(row=0, column=3, padx=5)
+    start_button = tk.Button(option_frame, text="시작")
+    start_button.grid(row=0, column=4, padx=5)
 
-latest_round_var = tk.StringVar(value="최신 분석 회차: 없음")
-tk.Label(root, textvariable=latest_round_var, font=("Arial", 10), fg="blue").pack(pady=2)
+    progress = ttk.Progressbar(popup, length=480, mode="determinate")
+    progress.pack(pady=(10, 2))
+    status_var = tk.StringVar()
+    tk.Label(popup, textvariable=status_var, fg="gray").pack()
 
-load_latest_round_on_start()
+    result_text = tk.Text(popup, height=8, width=66)
+    result_text.pack(pady=5)
 
-btn_frame = tk.Frame(root)
-btn_frame.pack(pady=5)
+    state = {"executor": None}
 
-tk.Button(btn_frame, text="📊 Excel 분석 및 저장", font=("Arial", 12), command=analyze_and_save).grid(row=0, column=0, padx=10)
-tk.Button(btn_frame, text="📝 최근 회차 번호 등록", font=("Arial", 12), command=open_manual_entry_popup).grid(row=0, column=1, padx=10)
+    def on_start():
+        try:
+            tickets_per_round = int(tickets_var.get())
+            seed = int(seed_var.get())
+            if tickets_per_round < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("입력 오류", "티켓 수는 1 이상의 정수, 시드는 정수로 입력하세요.", parent=popup)
+            return
+        try:
+            history = get_simulation_history(include_bonus_var.get())
+        except ValueError as e:
+            messagebox.showerror("오류", str(e), parent=popup)
+            return
 
-include_bonus_var = tk.BooleanVar(value=True)
-tk.Checkbutton(root, text="보너스 번호 빈도 포함", variable=include_bonus_var).pack()
+        result_queue = queue.Queue()
+        executor, total = run_simulation(history, result_queue, tickets_per_round, seed)
+        state["executor"] = executor
+        start_button.config(state=tk.DISABLED)
+        progress.configure(maximum=total, value=0)
+        status_var.set(f"시뮬레이션 중... (0/{total})")
+        result_text.delete(1.0, tk.END)
+        popup.after(100, poll_simulation, result_queue, total, time.perf_counter(), {}, {}, [0])
+
+    def poll_simulation(result_queue, total, started, counts, tickets, done):
+        if not popup.winfo_exists():
+            return
+        while True:
+            try:
+                strategy, n, result, error = result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                state["executor"].shutdown(wait=False, cancel_futures=True)
+                start_button.config(state=tk.NORMAL)
+                status_var.set("")
+                messagebox.showerror("오류", f"시뮬레이션 중 오류가 발생했습니다:\n{error}", parent=popup)
+                return
+            counts[strategy] = counts.get(strategy, 0) + result
+            tickets[strategy] = tickets.get(strategy, 0) + n
+            done[0] += 1
+
+        # 끝난 작업 비율로 남은 시간 추정
+        elapsed = time.perf_counter() - started
+        progress.configure(value=done[0])
+        if done[0]:
+            speed = sum(tickets.values()) / elapsed
+            eta = elapsed / done[0] * (total - done[0])
+            status_var.set(f"시뮬레이션 중... ({done[0]}/{total}) {speed:,.0f}장/초, 남은 시간 {format_eta(eta)}")
+
+        if done[0] < total:
+            popup.after(100, poll_simulation, result_queue, total, started, counts, tickets, done)
+            return
+
+        start_button.config(state=tk.NORMAL)
+        status_var.set(f"완료: {sum(tickets.values()):,}장, {format_eta(elapsed)} 소요")
+        result_text.delete(1.0, tk.END)
+        for row in format_results(counts, tickets):
+            result_text.insert(tk.END, "\t".join(row) + "\n")
+
+    def on_close():
+        # 창을 닫으면 아직 시작하지 않은 작업은 취소
+        if state["executor"] is not None:
+            state["executor"].shutdown(wait=False, cancel_futures=True)
+        popup.destroy()
+
+    start_button.config(command=on_start)
+    popup.protocol("WM_DELETE_WINDOW", on_close)
+
+def generate_batch_task(task, freqs, count, method, unique, path, seed=None):
+    """작업 스레드: count장을 묶음 단위로 만들어 바로 파일에 저장 (묶음마다 취소 확인)
+
+    형식은 확장자로 정한다 (.npy/.parquet, 그 외에는 CSV). 시드 방식이면 이 작업만의
+    Generator를 쓰므로 같은 시드로 같은 파일을 다시 만들 수 있다. (장 수, 걸린 초)를 돌려준다.
+    """
+    table = WeightedTable(freqs)
+    rng = make_generator(method, seed) if seed is not None else None
+    seen = TicketSet() if unique else None
+
+    def blocks():
+        for start in range(0, count, BATCH_BLOCK):
+            task.check()
+            size = min(BATCH_BLOCK, count - start)
+            if seen is not None:
+                yield unrank(generate_unique_tickets(table, size, method, rng=rng, seen=seen))
+            else:
+                yield generate_tickets(table, size, method, rng=rng)
+
+    return export_table(path, format_for_path(path), TICKET_COLUMNS, blocks(), count=count, header=False,
+                        on_chunk=lambda done: task.report(done, count))
+
+def open_batch_popup():
+    popup = tk.Toplevel(root)
+    popup.title("여러 장 생성")
+    popup.geometry("420x170")
+    popup.resizable(False, False)
+
+    option_frame = tk.Frame(popup)
+    option_frame.pack(pady=(10, 5))
+    count_var = tk.StringVar(value="100000")
+    unique_var = tk.BooleanVar(value=True)
+    tk.Label(option_frame, text="장 수").grid(row=0, column=0)
+    tk.Entry(option_frame, width=10, justify='center', textvariable=count_var).grid(row=0, column=1, padx=5)
+    tk.Checkbutton(option_frame, text="중복 조합 제외", variable=unique_var).grid(row=0, column=2)
+
+    progress = ttk.Progressbar(popup, length=320, mode="determinate")
+    progress.pack(pady=5)
+    status_var = tk.StringVar()
+    tk.Label(popup, textvariable=status_var, fg="gray").pack()
+
+    btn_row = tk.Frame(popup)
+    btn_row.pack(pady=5)
+    start_button = tk.Button(btn_row, text="생성 후 파일 저장")
+    start_button.grid(row=0, column=0, padx=5)
+    stop_button = tk.Button(btn_row, text="취소", state=tk.DISABLED, command=lambda: runner.cancel("batch"))
+    stop_button.grid(row=0, column=1, padx=5)
+
+    def on_start():
+        try:
+            count = int(count_var.get())
+            if count < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("입력 오류", "장 수는 1 이상의 정수로 입력하세요.", parent=popup)
+            return
+        try:
+            freqs, _ = current_weights()
+            seed = current_seed()
+        except ValueError as e:
+            messagebox.showerror("오류", str(e), parent=popup)
+            return
+        path = filedialog.asksaveasfilename(parent=popup, defaultextension=".csv",
+                                            filetypes=[("CSV files", "*.csv"), ("NumPy files", "*.npy"),
+                                                       ("Parquet files", "*.parquet"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def finish(text):
+            if popup.winfo_exists():
+                start_button.config(state=tk.NORMAL)
+                stop_button.config(state=tk.DISABLED)
+                status_var.set(text)
+
+        def on_progress(done, total, _):
+            if popup.winfo_exists():
+                progress.configure(value=done)
+                status_var.set(f"생성 중... {done:,}/{total:,}")
+
+        start_button.config(state=tk.DISABLED)
+        stop_button.config(state=tk.NORMAL)
+        progress.configure(maximum=count, value=0)
+        runner.submit("batch", generate_batch_task, np.array(freqs, dtype=np.float64), count,
+                      method_var.get(), unique_var.get(), path, seed, coalesce=False,
+                      on_progress=on_progress,
+                      on_done=lambda result: finish(f"완료: {format_throughput(*result)} ({os.path.basename(path)})"),
+                      on_cancel=lambda: finish("취소됨 (저장된 파일은 일부만 기록됨)"),
+                      on_error=lambda e: (finish(""), messagebox.showerror("오류", str(e))))
+
+    def on_close():
+        runner.cancel("batch")
+        popup.destroy()
+
+    start_button.config(command=on_start)
+    popup.protocol("WM_DELETE_WINDOW", on_close)
+
+# 휠 창의 목표 → (풀에서 나올 개수 t, 맞출 개수 m). m이 None이면 t개 조합을 그대로 덮는다.
+WHEEL_TARGETS = {
+    "번호 쌍 덮기": (2, None),
+    "세 개 조합 덮기": (3, None),
+    "4개 나오면 3개 맞춤 보장": (4, 3),
+    "5개 나오면 4개 맞춤 보장": (5, 4),
+}
+
+def open_wheel_popup():
+    """여러 장을 따로 뽑지 않고, 번호 풀의 쌍/조합을 최대한 겹치지 않게 덮도록 함께 고른다."""
+    popup = tk.Toplevel(root)
+    popup.title("휠 생성")
+    popup.geometry("480x360")
+    popup.resizable(False, False)
+
+    option_frame = tk.Frame(popup)
+    option_frame.pack(pady=(10, 5))
+    pool_var = tk.StringVar(value="1-45")
+    count_var = tk.StringVar(value="10")
+    target_var = tk.StringVar(value=next(iter(WHEEL_TARGETS)))
+    weighted_var = tk.BooleanVar(value=True)
+    tk.Label(option_frame, text="번호 풀").grid(row=0, column=0)
+    tk.Entry(option_frame, width=24, textvariable=pool_var).grid(row=0, column=1, padx=5)
+    tk.Label(option_frame, text="장 수").grid(row=0, column=2)
+    tk.Entry(option_frame, width=5, justify='center', textvariable=count_var).grid(row=0, column=3, padx=5)
+    ttk.Combobox(option_frame, values=list(WHEEL_TARGETS), textvariable=target_var, state="readonly",
+                 width=22).grid(row=1, column=0, columnspan=2, pady=5)
+    tk.Checkbutton(option_frame, text="빈도 가중치 반영", variable=weighted_var).grid(row=1, column=2, columnspan=2)
+    start_button = tk.Button(popup, text="휠 만들기")
+    start_button.pack()
+
+    status_var = tk.StringVar()
+    tk.Label(popup, textvariable=status_var, fg="gray", wraplength=460).pack(pady=2)
+    result_text = tk.Text(popup, height=12, width=60)
+    result_text.pack(pady=5)
+
+    def on_start():
+        try:
+            pool = parse_pool(pool_var.get())
+            count = int(count_var.get())
+        except ValueError:
+            messagebox.showerror("입력 오류", "번호 풀은 '1-20' 또는 '3,7,11'처럼, 장 수는 정수로 입력하세요.", parent=popup)
+            return
+        t, m = WHEEL_TARGETS[target_var.get()]
+        try:
+            freqs = current_weights()[0] if weighted_var.get() and m is None else None
+            seed = current_seed()
+        except ValueError as e:
+            messagebox.showerror("오류", str(e), parent=popup)
+            return
 
-method_var = tk.StringVar(value="hardware")
-tk.Radiobutton(root, text="의사 난수", variable=method_var, value="pseudo").pack()
-tk.Radiobutton(root, text="하드웨어 난수 (기본)", variable=method_var, value="hardware").pack()
+        def on_done(result):
+            tickets, stats = result
+            if not popup.winfo_exists():
+                return
+            start_button.config(state=tk.NORMAL)
+            status_var.set(format_stats(stats, t, m))
+            result_text.delete(1.0, tk.END)
+            for i, numbers in enumerate(tickets, 1):
+                result_text.insert(tk.END, f"{i:>3}. " + ", ".join(map(str, numbers)) + "\n")
+
+        def on_error(e):
+            if popup.winfo_exists():
+                start_button.config(state=tk.NORMAL)
+                status_var.set("")
+            messagebox.showerror("오류", str(e))
+
+        start_button.config(state=tk.DISABLED)
+        status_var.set("휠을 찾는 중...")
+        runner.submit("wheel", lambda task: build_wheel(pool, count, t, m, freqs, seed=seed), coalesce=False,
+                      on_done=on_done, on_error=on_error)
+
+    start_button.config(command=on_start)
+
+def open_stats_popup():
+    """계측 통계 창 (1초마다 갱신). 계측/분포 감시를 켜고 끌 수 있고 JSON으로 저장할 수 있다."""
+    popup = tk.Toplevel(root)
+    popup.title("성능 통계")
+    popup.geometry("640x360")
+
+    enabled_var = tk.BooleanVar(value=instrument.enabled)
+    monitor_var = tk.BooleanVar(value=gof_monitor.enabled)
+    top = tk.Frame(popup)
+    top.pack(fill=tk.X, padx=10, pady=5)
+    tk.Checkbutton(top, text="계측 켜기", variable=enabled_var,
+                   command=lambda: instrument.enable(enabled_var.get())).pack(side=tk.LEFT)
+    tk.Checkbutton(top, text="분포 감시", variable=monitor_var,
+                   command=lambda: gof_monitor.enable(monitor_var.get())).pack(side=tk.LEFT)
+    tk.Button(top, text="초기화", command=lambda: (instrument.reset(), refresh(repeat=False))).pack(side=tk.LEFT, padx=5)
+    tk.Button(top, text="JSON 저장", command=lambda: save()).pack(side=tk.LEFT)
+    elapsed_var = tk.StringVar()
+    tk.Label(top, textvariable=elapsed_var, fg="gray").pack(side=tk.RIGHT)
+
+    columns = ("구분", "이름", "횟수/값", "총 ms", "평균 us", "최대 ms")
+    table = VirtualTable(popup, columns, height=12, widths=(60, 200, 90, 80, 80, 80))
+    table.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 5))
+    # 가장 최근의 분포 감시 경고 (추첨 스레드에서 쌓인 것을 갱신 때 읽는다)
+    alert_var = tk.StringVar()
+    tk.Label(popup, textvariable=alert_var, fg="red", wraplength=620, justify=tk.LEFT).pack(fill=tk.X, padx=10, pady=(0, 5))
+
+    def refresh(repeat=True):
+        if not popup.winfo_exists():
+            return
+        rows = instrument.table_rows()
+        table.set_data(*(zip(*rows) if rows else [()] * len(columns)))
+        state = "켜짐" if instrument.enabled else "꺼짐"
+        elapsed_var.set(f"계측 {state}, {instrument.snapshot()['elapsed']:.0f}초 경과")
+        alert_var.set(gof_monitor.alerts[-1] if gof_monitor.alerts else "")
+        if repeat:
+            popup.after(1000, refresh)
+
+    def save():
+        path = filedialog.asksaveasfilename(parent=popup, defaultextension=".json",
+                                            filetypes=[("JSON files", "*.json")])
+        if path:
+            instrument.dump(path)
+
+    refresh()
+
+def poll_store(serial=None):
+    """저장소 일련번호가 바뀌었으면 표시를 고치고 지금 설정의 추첨 표를 미리 다시 만든다"""
+    while True:
+        try:
+            message = watch_messages.get_nowait()
+        except queue.Empty:
+            break
+        progress_var.set("자동 가져오기: " + message.splitlines()[0])
+    header = get_frequency_store().header()
+    current = header[1] if header else None
+    if serial is not None and current != serial:
+        update_freq_status()
+        try:
+            freqs, latest_round = current_weights()
+            get_alias_table(freqs, include_bonus_var.get())
+        except ValueError:
+            pass
+        else:
+            latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+    root.after(STORE_POLL_MS, poll_store, current)
 
-tk.Button(root, text="✨ 번호 추첨하기", font=("Arial", 12), command=generate_numbers).pack(pady=10)
+# 폴더 감시 스레드가 보낸 처리 결과 (GUI 스레드의 poll_store가 꺼내 표시)
+watch_messages = queue.Queue()
 
-result_var = tk.StringVar()
-tk.Label(root, textvariable=result_var, font=("Arial", 14), anchor="center").pack(pady=10)
+def load_latest_round_on_start():
+    _, _, latest_round = load_frequencies()
+    if latest_round:
+        latest_round_var.set(f"최신 분석 회차: {latest_round}회")
+    else:
+        latest_round_var.set("최신 분석 회차: 없음")
 
-root.mainloop()
+# --- GUI 구성 ---
+# 작업 프로세스가 이 파일을 다시 import해도 창이 뜨지 않도록 보호
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="로또 분석 및 추첨기")
+    parser.add_argument("--instrument", action="store_true", help="시작할 때부터 계측 켜기 (성능 통계 창)")
+    parser.add_argument("--metrics", metavar="JSON", help="종료할 때 계측 결과를 JSON으로 저장 (계측 켜짐)")
+    parser.add_argument("--monitor", action="store_true", help="시작할 때부터 추첨 결과 분포 감시 켜기 (경고는 성능 통계 창)")
+    parser.add_argument("--watch", metavar="DIR", help="폴더에 들어오는 Excel 파일을 자동으로 가져오기")
+    parser.add_argument("--profile", nargs="?", const="coll.prof", metavar="PROF",
+                        help="cProfile로 실행해 결과를 저장하고 상위 함수를 출력 (기본 coll.prof)")
+    args = parser.parse_args()
+    if args.instrument or args.metrics:
+        instrument.enable()
+    if args.monitor:
+        gof_monitor.enable()
+
+    root = tk.Tk()
+    root.title("로또 분석 및 추첨기")
+    root.geometry("400x510")
+    root.resizable(False, False)
+
+    freq_status_label = tk.Label(root, font=("Arial", 10))
+    freq_status_label.pack(pady=5)
+    update_freq_status()
+
+    latest_round_var = tk.StringVar(value="최신 분석 회차: 없음")
+    tk.Label(root, textvariable=latest_round_var, font=("Arial", 10), fg="blue").pack(pady=2)
+
+    load_latest_round_on_start()
+
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(pady=5)
+
+    analyze_button = tk.Button(btn_frame, text="📊 Excel 분석 및 저장", font=("Arial", 12), command=analyze_and_save)
+    analyze_button.grid(row=0, column=0, padx=10)
+    tk.Button(btn_frame, text="📝 최근 회차 번호 등록", font=("Arial", 12), command=open_manual_entry_popup).grid(row=0, column=1, padx=10)
+    tk.Button(btn_frame, text="📦 여러 장 생성", font=("Arial", 10), command=open_batch_popup).grid(row=1, column=0, pady=(5, 0))
+    tk.Button(btn_frame, text="🎲 당첨률 시뮬레이션", font=("Arial", 10), command=open_simulation_popup).grid(row=1, column=1, pady=(5, 0))
+    tk.Button(btn_frame, text="🎡 휠 생성", font=("Arial", 10), command=open_wheel_popup).grid(row=2, column=0, pady=(5, 0))
+    tk.Button(btn_frame, text="⏱ 성능 통계", font=("Arial", 10), command=open_stats_popup).grid(row=2, column=1, pady=(5, 0))
+
+    include_bonus_var = tk.BooleanVar(value=True)
+    tk.Checkbutton(root, text="보너스 번호 빈도 포함", variable=include_bonus_var).pack()
+
+    method_frame = tk.Frame(root)
+    method_frame.pack()
+    method_var = tk.StringVar(value=METHOD_HARDWARE)
+    tk.Radiobutton(method_frame, text="의사 난수", variable=method_var, value=METHOD_PSEUDO).grid(row=0, column=0, sticky="w")
+    tk.Radiobutton(method_frame, text="하드웨어 난수 (기본)", variable=method_var, value=METHOD_HARDWARE).grid(row=0, column=1, sticky="w")
+    tk.Radiobutton(method_frame, text="시드 PCG64", variable=method_var, value=METHOD_PCG64).grid(row=1, column=0, sticky="w")
+    tk.Radiobutton(method_frame, text="시드 Philox", variable=method_var, value=METHOD_PHILOX).grid(row=1, column=1, sticky="w")
+    seed_var = tk.StringVar()
+    tk.Label(method_frame, text="시드").grid(row=2, column=0, sticky="e")
+    tk.Entry(method_frame, width=22, textvariable=seed_var).grid(row=2, column=1, sticky="w")
+
+    weight_frame = tk.LabelFrame(root, text="가중치 방식", padx=5, pady=2)
+    weight_frame.pack(pady=2)
+    weight_mode_var = tk.StringVar(value=MODE_ALL)
+    tk.Radiobutton(weight_frame, text="전체", variable=weight_mode_var, value=MODE_ALL).grid(row=0, column=0)
+    tk.Radiobutton(weight_frame, text="최근 N회", variable=weight_mode_var, value=MODE_WINDOW).grid(row=0, column=1)
+    tk.Radiobutton(weight_frame, text="감쇠 (반감기 N회)", variable=weight_mode_var, value=MODE_DECAY).grid(row=0, column=2)
+    weight_n_var = tk.StringVar(value="100")
+    tk.Label(weight_frame, text="N =").grid(row=1, column=0, sticky="e")
+    tk.Spinbox(weight_frame, from_=1, to=5000, width=6, textvariable=weight_n_var).grid(row=1, column=1, sticky="w")
+
+    tk.Button(root, text="✨ 번호 추첨하기", font=("Arial", 12), command=generate_numbers).pack(pady=10)
+
+    result_var = tk.StringVar()
+    tk.Label(root, textvariable=result_var, font=("Arial", 14), anchor="center").pack(pady=10)
+
+    progress_frame = tk.Frame(root)
+    progress_frame.pack()
+    progress_bar = ttk.Progressbar(progress_frame, length=200, mode="determinate")
+    progress_bar.grid(row=0, column=0)
+    cancel_button = tk.Button(progress_frame, text="취소", state=tk.DISABLED, command=lambda: runner.cancel("import"))
+    cancel_button.grid(row=0, column=1, padx=5)
+    progress_var = tk.StringVar()
+    tk.Label(root, textvariable=progress_var, font=("Arial", 10), fg="gray").pack()
+
+    # 오래 걸리는 작업은 작업 스레드에서 실행하고 결과만 root.after로 받는다
+    runner = BackgroundRunner(root)
+    # 다른 프로세스나 폴더 감시가 저장한 빈도수를 바로 반영
+    poll_store()
+    if args.watch:
+        FolderWatcher(args.watch, on_ingest=lambda result: watch_messages.put(format_watch_result(result))).start()
+
+    if args.profile:
+        instrument.profile_call(root.mainloop, args.profile)
+    else:
+        root.mainloop()
+    if args.metrics:
+        instrument.dump(args.metrics)
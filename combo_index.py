@@ -0,0 +1,268 @@
+import os
+import struct
+from collections import OrderedDict
+import numpy as np
+import instrument
+from freq_store import get_data_dir
+from rng import RandomStream
+from sampler import weights_key
+from tickets import COMBINATIONS, RANK_DTYPE, TicketSet, _BINOM
+
+# 색인 파일 형식: 헤더(32바이트) + 열 10개 × COMBINATIONS바이트 (모두 uint8, 순위 순서)
+#   번호 1~6번째 열 (오름차순), 합계, 홀수 개수, 최장 연속, 번호대 수
+MAGIC = b"PLCI"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sII20x")  # 매직, 형식 버전, 조합 수
+# 합계는 21(1+…+6) ~ 255(40+…+45)이므로 그대로 uint8에 들어간다
+FEATURES = ("sum", "odd", "run", "decades")
+COLUMNS = 6 + len(FEATURES)
+FILE_SIZE = HEADER.size + COLUMNS * COMBINATIONS
+# 색인을 만들 때 한 번에 처리하는 조합 수 (메모리 사용량 제한)
+BUILD_CHUNK = 1 << 20
+# 조건 + 가중치별로 만든 누적 가중치(항목당 약 65MB)를 재사용하는 개수 (최근 사용 순)
+SUBSET_CACHE_SIZE = 2
+
+
+def get_index_filename():
+    filename = "combo_index.bin" if os.name == 'nt' else ".combo_index.bin"
+    return os.path.join(get_data_dir(), filename)
+
+
+def _combinations(start, stop):
+    """순위 start ~ stop - 1의 조합 → (6, n) uint8 번호 배열 (0부터, 열마다 오름차순)
+
+    tickets.unrank와 같은 계산이지만 연속 구간이므로 가장 큰 번호부터
+    구간 경계만 찾아 채운다.
+    """
+    remaining = np.arange(start, stop, dtype=np.int64)
+    numbers = np.empty((6, remaining.size), dtype=np.uint8)
+    for i in range(6, 0, -1):
+        c = np.searchsorted(_BINOM[:45, i], remaining, side="right") - 1
+        numbers[i - 1] = c
+        remaining -= _BINOM[c, i]
+    return numbers
+
+
+def _features(numbers):
+    """(6, n) 0부터 시작하는 번호 → (합계, 홀수 개수, 최장 연속, 번호대 수) uint8 열"""
+    total = numbers.sum(axis=0, dtype=np.uint16) + 6
+    # 0부터 시작하므로 짝수 인덱스가 홀수 번호
+    odd = 6 - (numbers & 1).sum(axis=0, dtype=np.uint8)
+    current = np.zeros(numbers.shape[1], dtype=np.uint8)
+    longest = np.zeros(numbers.shape[1], dtype=np.uint8)
+    for a, b in zip(numbers[:-1], numbers[1:]):
+        current = np.where(b - a == 1, current + 1, 0).astype(np.uint8)
+        np.maximum(longest, current, out=longest)
+    # 번호대: 1~9, 10~19, 20~29, 30~39, 40~45 (정렬되어 있으므로 바뀌는 횟수 + 1)
+    decade = (numbers + 1) // 10
+    decades = 1 + (decade[1:] != decade[:-1]).sum(axis=0, dtype=np.uint8)
+    return total.astype(np.uint8), odd, longest + 1, decades
+
+
+def build_index(path):
+    """모든 조합의 번호/특징 열을 BUILD_CHUNK씩 계산해 path에 저장 (임시 파일 후 교체)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, COMBINATIONS))
+        f.truncate(FILE_SIZE)
+    data = np.memmap(tmp_path, dtype=np.uint8, mode="r+", offset=HEADER.size, shape=(COLUMNS, COMBINATIONS))
+    try:
+        for start in range(0, COMBINATIONS, BUILD_CHUNK):
+            stop = min(start + BUILD_CHUNK, COMBINATIONS)
+            numbers = _combinations(start, stop)
+            data[:6, start:stop] = numbers + 1
+            for row, column in enumerate(_features(numbers), 6):
+                data[row, start:stop] = column
+        data.flush()
+    finally:
+        del data
+    os.replace(tmp_path, path)
+
+
+def colex_fold(values, op, dtype=None):
+    """번호별 값 45개 → 모든 조합에 대해 여섯 값을 op(np.add, np.multiply 등)로 합친 배열 (순위 순서)
+
+    colex 순서에서 가장 큰 번호가 t인 k개 조합은 {0..t-1}의 (k-1)개 조합 전체
+    (앞쪽 C(t, k-1)개) 뒤에 t를 붙인 것과 같은 순서이므로, 이전 단계 배열의
+    앞부분에 값 하나를 op로 합쳐 이어 붙이면 된다. 번호를 꺼내 보지 않아 빠르다.
+    """
+    values = np.asarray(values, dtype=dtype)
+    if values.shape != (45,):
+        raise ValueError("번호별 값은 45개여야 합니다.")
+    level = values.copy()
+    for k in range(2, 7):
+        result = np.empty(int(_BINOM[45, k]), dtype=values.dtype)
+        for t in range(k - 1, 45):
+            start, size = int(_BINOM[t, k]), int(_BINOM[t, k - 1])
+            op(level[:size], values[t], out=result[start:start + size])
+        level = result
+    return level
+
+
+def combo_weights(weights):
+    """모든 조합의 가중치 (여섯 번호 가중치의 곱, 순위 순서 float64)"""
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (45,):
+        raise ValueError("가중치는 45개여야 합니다.")
+    if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+        raise ValueError("빈도수는 0 이상의 유한한 값이어야 합니다.")
+    return colex_fold(weights, np.multiply)
+
+
+def _check_number(number):
+    number = int(number)
+    if not 1 <= number <= 45:
+        raise ValueError("번호는 1~45 사이여야 합니다.")
+    return number
+
+
+def _parse_range(value):
+    """None / 정수 / (하한, 상한) → (하한, 상한) 또는 None"""
+    if value is None:
+        return None
+    if isinstance(value, (tuple, list)):
+        low, high = value
+    else:
+        low = high = value
+    return int(low), int(high)
+
+
+class ComboIndex:
+    """45개 중 6개 모든 조합(8,145,060개)의 번호와 특징 열 (mmap, 약 81MB)
+
+    i번째 행이 순위 i의 조합이므로 tickets.rank_numbers/unrank와 그대로 맞는다.
+    조건은 열에 대한 불리언 마스크로 바꾸고, 남은 조합 중에서 번호 가중치의
+    곱에 비례해 누적 가중치 + searchsorted로 한 번에 뽑는다. 번호 가중치의 곱은
+    get_weighted_unique_numbers의 공 단위 재추첨과 같은 분포는 아니므로, 같은
+    분포가 필요하면 정확한 확률 표(table)를 넘긴다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or count != COMBINATIONS \
+                or os.path.getsize(path) != FILE_SIZE:
+            raise ValueError("조합 색인 파일 형식이 올바르지 않습니다.")
+        self.data = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(COLUMNS, COMBINATIONS))
+        self.numbers = self.data[:6]
+        self.sum, self.odd, self.run, self.decades = self.data[6:]
+        self._subsets = OrderedDict()
+
+    @classmethod
+    def open(cls, path=None):
+        """색인 파일을 연다. 없거나 손상되었으면 새로 만든다 (한 번, 수 초)."""
+        path = path or get_index_filename()
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error):
+            build_index(path)
+            return cls(path)
+
+    def __len__(self):
+        return COMBINATIONS
+
+    def mask(self, sum=None, odd=None, run=None, decades=None, exclude=(), include=()):
+        """조건을 모두 만족하는 조합이 True인 (COMBINATIONS,) 불리언 배열
+
+        sum/odd/run/decades는 정수(같은 값) 또는 (하한, 상한) (양끝 포함).
+        exclude의 번호는 하나도 없고 include의 번호는 모두 있는 조합만 남긴다.
+        """
+        selected = np.ones(COMBINATIONS, dtype=bool)
+        for name, value in (("sum", sum), ("odd", odd), ("run", run), ("decades", decades)):
+            bounds = _parse_range(value)
+            if bounds is None:
+                continue
+            column = getattr(self, name)
+            low, high = bounds
+            if low > 0:
+                selected &= column >= low
+            if high < 255:
+                selected &= column <= high
+        if exclude or include:
+            # 포함할 번호는 1, 제외할 번호는 8로 두고 조합마다 더하면
+            # 포함할 번호 수와 같은 조합만 조건을 만족한다 (1 × 6 < 8)
+            marks = np.zeros(45, dtype=np.uint8)
+            for number in exclude:
+                marks[_check_number(number) - 1] = 8
+            for number in include:
+                number = _check_number(number)
+                if marks[number - 1]:
+                    raise ValueError(f"{number}번을 포함과 제외에 함께 지정했습니다.")
+                marks[number - 1] = 1
+            selected &= colex_fold(marks, np.add) == np.count_nonzero(marks == 1)
+        return selected
+
+    def count(self, **constraints):
+        """조건을 만족하는 조합 수 (가중치가 0인 조합 포함)"""
+        return int(np.count_nonzero(self.mask(**constraints)))
+
+    @instrument.span("combo.subset")
+    def subset(self, weights, table=None, **constraints):
+        """(누적 가중치, 뽑힐 수 있는 조합 비트셋). 같은 가중치/조건이면 다시 계산하지 않는다.
+
+        누적 가중치는 순위 순서의 (COMBINATIONS,) float64이며, 조건을 만족하지 않는
+        조합은 가중치가 0이므로 searchsorted로 찾은 위치가 곧 순위가 된다.
+        table(combo_prob.ComboProbabilities)을 주면 번호 가중치의 곱 대신 그 표의
+        정확한 조합 확률을 쓴다.
+        """
+        key = (table.key if table is not None else weights_key(weights), tuple(sorted(
+            (name, tuple(value) if isinstance(value, (tuple, list, set)) else value)
+            for name, value in constraints.items())))
+        cached = self._subsets.get(key)
+        if cached is not None:
+            self._subsets.move_to_end(key)
+            return cached
+        combo = table.probabilities() if table is not None else combo_weights(weights)
+        if constraints:
+            combo *= self.mask(**constraints)
+        positive = combo > 0
+        if not positive.any():
+            raise ValueError("조건을 만족하는 조합이 없습니다.")
+        # TicketSet.bits와 같은 배치 (순위 >> 3번째 바이트의 순위 & 7번째 비트)
+        cached = np.cumsum(combo, out=combo), np.packbits(positive, bitorder="little")
+        self._subsets[key] = cached
+        if len(self._subsets) > SUBSET_CACHE_SIZE:
+            self._subsets.popitem(last=False)
+        return cached
+
+    @instrument.span("combo.sample")
+    def sample(self, weights, n, method='hardware', rng=None, unique=False, seen=None, table=None, **constraints):
+        """조건을 만족하는 조합 중에서 가중치에 비례해 n개를 뽑은 순위 배열 (RANK_DTYPE)
+
+        rng는 Generator/RandomStream (없으면 method의 새 난수열). unique이면 같은
+        조합을 다시 내지 않으며, seen(TicketSet)을 넘기면 여러 번 호출해도 겹치지 않는다.
+        table은 subset()과 같다.
+        """
+        if n < 0:
+            raise ValueError("생성 개수는 0 이상이어야 합니다.")
+        cumulative, positive = self.subset(weights, table, **constraints)
+        rng = rng if rng is not None else RandomStream(method)
+        total = cumulative[-1]
+        # 가중치가 있는 마지막 조합 (누적값이 처음 total이 되는 곳)
+        last = int(np.searchsorted(cumulative, total, side="left"))
+
+        def draw(size):
+            picked = np.searchsorted(cumulative, rng.random(size) * total, side="right")
+            # 반올림으로 total과 같아진 값은 마지막 조합으로
+            return np.minimum(picked, last).astype(RANK_DTYPE)
+
+        if not unique:
+            return draw(n)
+        seen = TicketSet() if seen is None else seen
+        available = int(np.unpackbits(positive & ~seen.bits).sum())
+        if n > available:
+            raise ValueError(f"조건을 만족하는 서로 다른 조합이 {n:,}개보다 적습니다.")
+        result = np.empty(n, dtype=RANK_DTYPE)
+        filled = 0
+        while filled < n:
+            want = n - filled
+            candidates = draw(want + want // 8 + 16)
+            fresh = candidates[seen.add(candidates, limit=want)]
+            result[filled:filled + fresh.size] = fresh
+            filled += fresh.size
+        return result
+
+    def tickets(self, ranks):
+        """순위 배열 → (n, 6) uint8 번호 배열 (각 행 오름차순)"""
+        return np.ascontiguousarray(self.numbers[:, ranks].T)
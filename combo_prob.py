@@ -0,0 +1,220 @@
+import hashlib
+import os
+import struct
+import numpy as np
+import instrument
+from freq_store import get_data_dir
+from rng import RandomStream
+from tickets import COMBINATIONS, RANK_DTYPE
+
+# 계산 방식이나 파일 배치가 바뀌면 올린다 (가중치 해시에 섞여 이전 표는 쓰지 않게 된다)
+FORMAT_VERSION = 2
+# 한 번에 계산하는 조합 수 (작업 배열이 CPU 캐시에 머무는 크기, 메모리 사용량 제한)
+PROB_CHUNK = 1 << 14
+# 가중치별로 보관하는 표 개수 (표 하나에 약 65MB, 오래 쓰지 않은 것부터 지움)
+TABLE_LIMIT = 3
+
+# 번호 쌍 (a, b)의 열 위치 (a < b, 조합의 번호 열이 오름차순이므로 앞 열 < 뒤 열)
+_PAIR_COLUMNS = tuple((i, j) for i in range(6) for j in range(i + 1, 6))
+
+# 포함-배제 합의 항 순서: 여섯 번호 부분집합을 그레이 코드 순서로 돌며 매번 번호 하나만 넣거나 뺀다
+# (바뀌는 열, 넣으면 +1 / 빼면 -1). 부분집합 크기가 하나씩 바뀌므로 항의 부호도 번갈아 바뀐다.
+_GRAY_STEPS = tuple(
+    ((g & -g).bit_length() - 1, 1 if (g ^ (g >> 1)) & (g & -g) else -1)
+    for g in range(1, 64)
+)
+
+
+def get_table_dir():
+    dirname = "prob_tables" if os.name == 'nt' else ".prob_tables"
+    path = os.path.join(get_data_dir(), dirname)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _normalize(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (45,):
+        raise ValueError("가중치는 45개여야 합니다.")
+    if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+        raise ValueError("빈도수는 0 이상의 유한한 값이어야 합니다.")
+    if np.count_nonzero(weights) < 6:
+        raise ValueError("빈도수가 0보다 큰 번호가 6개 이상 있어야 합니다.")
+    return weights / weights.sum()
+
+
+def table_key(weights):
+    """가중치 비율 + FORMAT_VERSION의 blake2b 해시 (표 파일 이름). 배수만 다른 가중치는 같은 키."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struct.pack("<I", FORMAT_VERSION))
+    digest.update(_normalize(weights).astype("<f8").tobytes())
+    return digest.hexdigest()
+
+
+def combo_probabilities(numbers, weights):
+    """(6, n) 번호 열 → 공 단위 가중 추첨 + 중복 재추첨으로 각 조합이 나올 정확한 확률 (float64)
+
+    get_weighted_unique_numbers처럼 가중치 비례로 복원 추첨하고 이미 나온 번호를
+    버리면, 번호마다 비율 w_i인 지수분포 시각에 도착하는 순서대로 뽑는 것과 같다.
+    조합 S가 나오려면 S의 번호가 모두 나머지 번호보다 먼저 도착해야 하므로
+    R = 1 - w(S)로 두면 P(S) = Σ_{T⊆S} (-1)^|T| · R / (R + w(T)) (64항).
+    """
+    weights = np.concatenate(([0.0], _normalize(weights)))
+    columns = weights[np.asarray(numbers, dtype=np.intp)]
+    rest = 1.0 - columns.sum(axis=0)
+    # 남은 가중치가 0이면 (가중치가 있는 번호가 정확히 6개) 그 조합만 확률 1
+    np.maximum(rest, 0.0, out=rest)
+    empty = rest == 0
+    rest[empty] = 1.0
+    subset = np.zeros_like(rest)
+    term = np.empty_like(rest)
+    result = np.ones_like(rest)
+    sign = 1.0
+    for column, step in _GRAY_STEPS:
+        subset += columns[column] * step
+        sign = -sign
+        np.add(rest, subset, out=term)
+        np.divide(rest, term, out=term)
+        if sign > 0:
+            result += term
+        else:
+            result -= term
+    # 가중치가 0인 번호가 있는 조합은 정확히 0 (항끼리 상쇄되고 남은 반올림 오차를 지운다)
+    result[columns.min(axis=0) == 0] = 0.0
+    result[empty] = 1.0
+    return np.maximum(result, 0.0, out=result)
+
+
+class ComboProbabilities:
+    """모든 조합의 정확한 추첨 확률 표 (순위 순서 누적 확률 .npy, mmap)
+
+    cdf[i]는 순위 0 ~ i 조합의 확률 합이다. 표본은 균등 난수로 searchsorted
+    한 번 (O(log n))이면 되고, 번호별 포함 확률과 번호 쌍 포함 확률은 따로 저장해 둔다.
+    """
+
+    def __init__(self, key, cdf, inclusion, pairs):
+        self.key = key
+        self.cdf = cdf
+        self.inclusion = inclusion
+        # pairs[a - 1, b - 1]: 번호 a와 b가 한 조합에 함께 나올 확률 (대칭, 대각선은 0)
+        self.pairs = pairs
+        self.total = float(cdf[-1])
+        # 확률이 있는 마지막 조합 (누적값이 처음 total이 되는 곳)
+        self._last = int(np.searchsorted(cdf, self.total, side="left"))
+
+    @classmethod
+    def load(cls, directory, key):
+        """저장된 표 (없거나 손상되었으면 None)"""
+        prefix = os.path.join(directory, key)
+        try:
+            inclusion = np.load(prefix + ".inclusion.npy")
+            pairs = np.load(prefix + ".pairs.npy")
+            cdf = np.load(prefix + ".cdf.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if cdf.shape != (COMBINATIONS,) or cdf.dtype != np.float64 or inclusion.shape != (45,) or pairs.shape != (45, 45):
+            return None
+        for path in (prefix + ".cdf.npy", prefix + ".inclusion.npy", prefix + ".pairs.npy"):
+            os.utime(path)
+        return cls(key, cdf, inclusion, pairs)
+
+    @classmethod
+    @instrument.span("combo.build_probabilities")
+    def build(cls, directory, weights, index, on_chunk=None):
+        """index(ComboIndex)의 번호 열로 PROB_CHUNK씩 계산해 저장. on_chunk(done, total)로 진행 상황."""
+        key = table_key(weights)
+        prefix = os.path.join(directory, key)
+        tmp_path = f"{prefix}.{os.getpid()}.tmp.npy"
+        cdf = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(COMBINATIONS,))
+        inclusion = np.zeros(46, dtype=np.float64)
+        pairs = np.zeros(46 * 46, dtype=np.float64)
+        running = 0.0
+        completed = False
+        try:
+            for start in range(0, COMBINATIONS, PROB_CHUNK):
+                stop = min(start + PROB_CHUNK, COMBINATIONS)
+                numbers = index.numbers[:, start:stop]
+                probabilities = combo_probabilities(numbers, weights)
+                for column in numbers:
+                    inclusion += np.bincount(column, weights=probabilities, minlength=46)
+                wide = numbers.astype(np.intp)
+                for i, j in _PAIR_COLUMNS:
+                    pairs += np.bincount(wide[i] * 46 + wide[j], weights=probabilities, minlength=46 * 46)
+                np.cumsum(probabilities, out=cdf[start:stop])
+                cdf[start:stop] += running
+                running = float(cdf[stop - 1])
+                if on_chunk is not None:
+                    on_chunk(stop, COMBINATIONS)
+            cdf.flush()
+            completed = True
+        finally:
+            # 매핑을 닫아야 이름을 바꾸거나 지울 수 있다
+            del cdf
+            if not completed:
+                os.remove(tmp_path)
+        pairs = pairs.reshape(46, 46)[1:, 1:]
+        # 포함 확률을 먼저 저장하고 누적 확률 파일을 마지막에 바꿔 넣는다 (셋 다 있어야 완성된 표)
+        for name, values in (("inclusion", inclusion[1:]), ("pairs", pairs + pairs.T)):
+            np.save(f"{prefix}.{os.getpid()}.{name}.tmp.npy", values)
+            os.replace(f"{prefix}.{os.getpid()}.{name}.tmp.npy", f"{prefix}.{name}.npy")
+        os.replace(tmp_path, prefix + ".cdf.npy")
+        evict(directory)
+        return cls.load(directory, key)
+
+    def probability(self, ranks):
+        """순위 배열의 조합별 확률"""
+        ranks = np.asarray(ranks, dtype=np.int64)
+        before = np.where(ranks > 0, self.cdf[np.maximum(ranks - 1, 0)], 0.0)
+        return self.cdf[ranks] - before
+
+    def probabilities(self):
+        """모든 조합의 확률 (순위 순서, 약 65MB)"""
+        return np.diff(self.cdf, prepend=0.0)
+
+    def most_likely(self, k=10):
+        """확률이 가장 큰 조합 k개의 (순위, 확률), 큰 순서"""
+        probabilities = self.probabilities()
+        ranks = np.argpartition(probabilities, -k)[-k:]
+        ranks = ranks[np.argsort(probabilities[ranks])[::-1]]
+        return ranks.astype(RANK_DTYPE), probabilities[ranks]
+
+    @instrument.span("combo.exact_sample")
+    def sample(self, n, method='hardware', rng=None):
+        """표의 확률대로 n개를 뽑은 순위 배열 (RANK_DTYPE). rng가 없으면 method의 새 난수열."""
+        if n < 0:
+            raise ValueError("생성 개수는 0 이상이어야 합니다.")
+        rng = rng if rng is not None else RandomStream(method)
+        picked = np.searchsorted(self.cdf, rng.random(n) * self.total, side="right")
+        # 반올림으로 total과 같아진 값은 마지막 조합으로
+        return np.minimum(picked, self._last).astype(RANK_DTYPE)
+
+
+def evict(directory, limit=TABLE_LIMIT):
+    """표가 limit개를 넘으면 오래 쓰지 않은 것부터 지운다. 지운 표 수를 돌려준다."""
+    tables = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".cdf.npy"):
+                try:
+                    tables.append((entry.stat().st_mtime_ns, entry.name[:-len(".cdf.npy")]))
+                except OSError:
+                    continue
+    removed = 0
+    for _, key in sorted(tables)[:max(len(tables) - limit, 0)]:
+        for suffix in (".cdf.npy", ".inclusion.npy", ".pairs.npy"):
+            try:
+                os.remove(os.path.join(directory, key + suffix))
+            except OSError:
+                # 다른 프로세스가 먼저 지웠거나 (Windows에서) 매핑 중
+                continue
+        removed += 1
+    return removed
+
+
+def get_probabilities(weights, index, on_chunk=None, directory=None):
+    """weights의 정확한 확률 표. 같은 가중치 비율로 만든 표가 있으면 읽고, 없으면 만든다."""
+    directory = directory or get_table_dir()
+    table = ComboProbabilities.load(directory, table_key(weights))
+    if table is None:
+        table = ComboProbabilities.build(directory, weights, index, on_chunk)
+    return table
@@ -0,0 +1,206 @@
+import os
+from itertools import combinations
+import numpy as np
+from freq_store import get_data_dir
+
+# 캐시 파일 형식이 바뀌면 올린다 (다른 버전의 캐시는 버리고 새로 계산)
+CACHE_VERSION = 1
+
+# 상위 조합 표시에 쓰는 번호 쌍 / 세 개 조합의 인덱스 (0부터)
+_PAIRS = np.array(list(combinations(range(45), 2)), dtype=np.intp)
+_TRIPLES = np.array(list(combinations(range(45), 3)), dtype=np.intp)
+# combo_counts()의 조합 표시 문자열 (처음 쓸 때 한 번만 만든다)
+_COMBO_LABELS = None
+
+
+def get_cooccur_filename():
+    filename = "cooccur.npz" if os.name == 'nt' else ".cooccur.npz"
+    return os.path.join(get_data_dir(), filename)
+
+
+def _draw_matrix(numbers):
+    """(회차, 6) 번호 배열 → (회차, 45) uint8 출현 행렬 D"""
+    numbers = np.asarray(numbers, dtype=np.intp).reshape(-1, 6)
+    matrix = np.zeros((len(numbers), 45), dtype=np.uint8)
+    matrix[np.arange(len(numbers))[:, None], numbers - 1] = 1
+    return matrix
+
+
+def _longest_runs(numbers):
+    """회차마다 연속된 번호(예: 12, 13, 14)가 가장 길게 이어진 길이 (1~6)"""
+    ordered = np.sort(np.asarray(numbers, dtype=np.intp).reshape(-1, 6), axis=1)
+    consecutive = np.diff(ordered, axis=1) == 1
+    current = np.zeros(len(ordered), dtype=np.intp)
+    longest = np.zeros(len(ordered), dtype=np.intp)
+    for column in consecutive.T:
+        current = np.where(column, current + 1, 0)
+        np.maximum(longest, current, out=longest)
+    return longest + 1
+
+
+class CooccurrenceStats:
+    """번호 쌍/세 개 조합 동시 출현, 미출현 간격, 연속 출현 통계
+
+    회차를 (회차 × 45) uint8 출현 행렬 D로 바꾸면 D.T @ D가 45×45 쌍 표
+    (대각선은 번호별 출현 횟수)이고, 번호 i가 나온 회차만 곱한
+    (D * D[:, i]).T @ D가 i를 포함하는 세 개 조합 표이다. 모든 표는 회차에
+    대한 합이므로 새 회차가 들어오면 그 회차의 행만 더하면 된다.
+    """
+
+    def __init__(self, rounds=(), numbers=()):
+        self.pairs = np.zeros((45, 45), dtype=np.int64)
+        self.triples = np.zeros((45, 45, 45), dtype=np.int32)
+        self.first_seen = np.zeros(45, dtype=np.int64)      # 처음 나온 회차 (0: 아직 없음)
+        self.last_seen = np.zeros(45, dtype=np.int64)       # 마지막으로 나온 회차
+        self.longest_gap = np.zeros(45, dtype=np.int64)     # 두 출현 사이 가장 긴 미출현 회차 수
+        self.streak = np.zeros(45, dtype=np.int64)          # 마지막 회차까지 이어진 연속 출현 수
+        self.longest_streak = np.zeros(45, dtype=np.int64)  # 가장 길게 연속으로 나온 회차 수
+        self.run_lengths = np.zeros(7, dtype=np.int64)      # [k]: 연속 번호가 최대 k개인 회차 수
+        self.first_round = 0
+        self.last_round = 0
+        self.count = 0
+        self.deletions = 0
+        if len(rounds):
+            self.extend(rounds, numbers)
+
+    @classmethod
+    def from_database(cls, db):
+        rounds, numbers, _ = db.all_draws()
+        stats = cls(rounds, numbers)
+        stats.deletions = db.deletions()
+        return stats
+
+    @property
+    def frequencies(self):
+        return np.diagonal(self.pairs).copy()
+
+    def extend(self, rounds, numbers):
+        """마지막 회차 뒤에 여러 회차 추가 (추가한 회차 수에 비례하는 비용)"""
+        rounds = np.asarray(rounds, dtype=np.int64)
+        if not rounds.size:
+            return
+        if rounds[0] <= self.last_round or np.any(np.diff(rounds) <= 0):
+            raise ValueError("회차는 마지막 회차보다 크고 오름차순이어야 합니다.")
+
+        draws = _draw_matrix(numbers)
+        # 정수 행렬곱은 BLAS를 쓰지 못하므로 정확히 표현되는 float64로 곱한다
+        matrix = draws.astype(np.float64)
+        self.pairs += (matrix.T @ matrix).astype(np.int64)
+        for i in range(45):
+            rows = matrix[draws[:, i] == 1]
+            if len(rows):
+                self.triples[i] += (rows.T @ rows).astype(np.int32)
+
+        for i in range(45):
+            seen = rounds[draws[:, i] == 1]
+            if not seen.size:
+                continue
+            if self.last_seen[i]:
+                gaps = np.diff(seen, prepend=self.last_seen[i]) - 1
+            else:
+                self.first_seen[i] = seen[0]
+                gaps = np.diff(seen) - 1
+            if gaps.size:
+                self.longest_gap[i] = max(self.longest_gap[i], int(gaps.max()))
+            self.last_seen[i] = seen[-1]
+        self._update_streaks(rounds, draws)
+
+        self.run_lengths += np.bincount(_longest_runs(numbers), minlength=7)
+        if not self.count:
+            self.first_round = int(rounds[0])
+        self.last_round = int(rounds[-1])
+        self.count += len(rounds)
+
+    def _update_streaks(self, rounds, draws):
+        """연속 출현은 바로 앞 회차에도 나왔을 때만 이어진다 (빠진 회차가 있으면 끊김)"""
+        previous_round = self.last_round
+        for round_num, row in zip(rounds, draws):
+            hit = row.astype(bool)
+            contiguous = round_num == previous_round + 1
+            self.streak = np.where(hit, np.where(contiguous, self.streak, 0) + 1, 0)
+            np.maximum(self.longest_streak, self.streak, out=self.longest_streak)
+            previous_round = round_num
+
+    def append(self, round_num, numbers):
+        """한 회차 추가"""
+        self.extend([round_num], [numbers])
+
+    def sync(self, db):
+        """DB에 새로 추가된 회차만 반영. 삭제나 중간 회차 추가가 있으면 새로 만든다."""
+        if db.deletions() != self.deletions:
+            return CooccurrenceStats.from_database(db)
+        rounds, numbers, _ = db.draws_after(self.last_round)
+        self.extend(rounds, numbers)
+        if db.count() != self.count:
+            return CooccurrenceStats.from_database(db)
+        return self
+
+    def current_gaps(self):
+        """번호별 마지막 출현 뒤로 지난 회차 수 (한 번도 안 나왔으면 전체 회차 수)"""
+        never = self.last_seen == 0
+        gaps = self.last_round - self.last_seen
+        gaps[never] = self.last_round - self.first_round + 1 if self.count else 0
+        return gaps
+
+    def top_pairs(self, limit=20):
+        """많이 함께 나온 번호 쌍 [((a, b), 횟수), ...]"""
+        counts = self.pairs[_PAIRS[:, 0], _PAIRS[:, 1]]
+        order = np.argsort(-counts, kind="stable")[:limit]
+        return [((int(a) + 1, int(b) + 1), int(c)) for (a, b), c in zip(_PAIRS[order], counts[order])]
+
+    def top_triples(self, limit=20):
+        """많이 함께 나온 세 번호 [((a, b, c), 횟수), ...]"""
+        counts = self.triples[_TRIPLES[:, 0], _TRIPLES[:, 1], _TRIPLES[:, 2]]
+        order = np.argsort(-counts, kind="stable")[:limit]
+        return [(tuple(int(x) + 1 for x in combo), int(c)) for combo, c in zip(_TRIPLES[order], counts[order])]
+
+    def combo_counts(self):
+        """모든 번호 쌍과 세 번호의 (구분, 조합, 횟수) 배열 (표 전체 표시용)
+
+        조합은 '01, 02'처럼 두 자리로 맞춰 문자열 정렬이 번호 순서와 같다.
+        """
+        global _COMBO_LABELS
+        if _COMBO_LABELS is None:
+            labels = [", ".join(f"{x + 1:02d}" for x in combo) for combo in _PAIRS]
+            labels += [", ".join(f"{x + 1:02d}" for x in combo) for combo in _TRIPLES]
+            _COMBO_LABELS = np.array(labels)
+        kinds = np.repeat(np.array(["번호 쌍", "세 번호"]), [len(_PAIRS), len(_TRIPLES)])
+        counts = np.concatenate([
+            self.pairs[_PAIRS[:, 0], _PAIRS[:, 1]],
+            self.triples[_TRIPLES[:, 0], _TRIPLES[:, 1], _TRIPLES[:, 2]],
+        ])
+        return kinds, _COMBO_LABELS, counts
+
+    def best_partners(self):
+        """번호별로 가장 많이 함께 나온 번호와 횟수"""
+        others = self.pairs.copy()
+        np.fill_diagonal(others, -1)
+        partner = others.argmax(axis=1)
+        return partner + 1, others[np.arange(45), partner]
+
+    def save(self, path):
+        """캐시 파일로 저장 (임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 교체)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path, version=CACHE_VERSION, pairs=self.pairs, triples=self.triples,
+            first_seen=self.first_seen, last_seen=self.last_seen, longest_gap=self.longest_gap,
+            streak=self.streak, longest_streak=self.longest_streak, run_lengths=self.run_lengths,
+            meta=np.array([self.first_round, self.last_round, self.count, self.deletions], dtype=np.int64),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """캐시 파일 읽기. 없거나 형식이 다르면 None."""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != CACHE_VERSION:
+                    return None
+                stats = cls()
+                for name in ("pairs", "triples", "first_seen", "last_seen", "longest_gap",
+                             "streak", "longest_streak", "run_lengths"):
+                    setattr(stats, name, data[name].astype(getattr(stats, name).dtype))
+                stats.first_round, stats.last_round, stats.count, stats.deletions = map(int, data["meta"])
+        except (OSError, KeyError, ValueError):
+            return None
+        return stats
@@ -0,0 +1,183 @@
+import datetime
+import os
+import sqlite3
+import numpy as np
+from freq_store import get_data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    round INTEGER PRIMARY KEY,
+    n1 INTEGER NOT NULL, n2 INTEGER NOT NULL, n3 INTEGER NOT NULL,
+    n4 INTEGER NOT NULL, n5 INTEGER NOT NULL, n6 INTEGER NOT NULL,
+    bonus INTEGER NOT NULL,
+    source TEXT,
+    added_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS draws_source ON draws (source, round);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def get_db_filename():
+    filename = "draws.sqlite3" if os.name == 'nt' else ".draws.sqlite3"
+    return os.path.join(get_data_dir(), filename)
+
+
+def _counts(numbers, bonus):
+    normal_freq = np.bincount(np.asarray(numbers, dtype=np.intp).ravel(), minlength=46)[1:46]
+    bonus_freq = np.bincount(np.asarray(bonus, dtype=np.intp).ravel(), minlength=46)[1:46]
+    return normal_freq.astype(np.int64), bonus_freq.astype(np.int64)
+
+
+class DrawDatabase:
+    """회차 번호를 키로 하는 당첨번호 저장소 (SQLite)
+
+    store(FrequencyStore)가 주어지면 회차를 추가/삭제할 때 전체를 다시 세지 않고
+    바뀐 회차의 번호만큼 빈도수를 더하거나 뺀다. 같은 회차는 한 번만 저장되므로
+    겹치는 Excel 파일을 여러 번 가져와도 결과가 같다.
+    """
+
+    def __init__(self, path, store=None):
+        self.path = path
+        self.store = store
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM draws").fetchone()[0]
+
+    def deletions(self):
+        """지금까지 삭제된 회차 수 (캐시가 다시 계산해야 하는지 판단할 때 사용)"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'deletions'").fetchone()
+        return row[0] if row else 0
+
+    def latest_round(self):
+        return self.conn.execute("SELECT COALESCE(MAX(round), 0) FROM draws").fetchone()[0]
+
+    def get_draw(self, round_num):
+        """(당첨번호 6개, 보너스). 없으면 None."""
+        row = self.conn.execute(
+            "SELECT n1, n2, n3, n4, n5, n6, bonus FROM draws WHERE round = ?", (round_num,)
+        ).fetchone()
+        if row is None:
+            return None
+        return list(row[:6]), row[6]
+
+    def last_round(self, source=None):
+        """가장 최근 회차 번호 (source를 주면 해당 출처만)"""
+        if source is None:
+            return self.latest_round() or None
+        row = self.conn.execute("SELECT MAX(round) FROM draws WHERE source = ?", (source,)).fetchone()
+        return row[0]
+
+    def all_draws(self):
+        """(회차, 당첨번호 (n, 6), 보너스) 배열. 회차 오름차순."""
+        rows = self.conn.execute(
+            "SELECT round, n1, n2, n3, n4, n5, n6, bonus FROM draws ORDER BY round"
+        ).fetchall()
+        data = np.array(rows, dtype=np.int64).reshape(-1, 8)
+        return data[:, 0], data[:, 1:7].astype(np.uint8), data[:, 7].astype(np.uint8)
+
+    def iter_draws(self, chunk=65536):
+        """(회차, n1~n6, 보너스) 행을 chunk개씩 (k, 8) int64 배열로 (전체를 한 번에 읽지 않음)"""
+        cursor = self.conn.execute("SELECT round, n1, n2, n3, n4, n5, n6, bonus FROM draws ORDER BY round")
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                return
+            yield np.array(rows, dtype=np.int64)
+
+    def draws_after(self, round_num):
+        """round_num보다 큰 회차들의 (회차, 당첨번호, 보너스) 배열"""
+        rows = self.conn.execute(
+            "SELECT round, n1, n2, n3, n4, n5, n6, bonus FROM draws WHERE round > ? ORDER BY round",
+            (round_num,),
+        ).fetchall()
+        data = np.array(rows, dtype=np.int64).reshape(-1, 8)
+        return data[:, 0], data[:, 1:7].astype(np.uint8), data[:, 7].astype(np.uint8)
+
+    def add_draws(self, rounds, numbers, bonus, source=None):
+        """아직 없는 회차만 추가하고 추가된 회차 수를 돌려준다."""
+        rounds = np.asarray(rounds, dtype=np.int64)
+        numbers = np.asarray(numbers, dtype=np.int64).reshape(-1, 6)
+        bonus = np.asarray(bonus, dtype=np.int64)
+        if not rounds.size:
+            return 0
+
+        # 같은 파일 안에서 회차가 겹치면 처음 나온 행만 사용
+        rounds, first = np.unique(rounds, return_index=True)
+        numbers = numbers[first]
+        bonus = bonus[first]
+
+        existing = {r for (r,) in self.conn.execute(
+            "SELECT round FROM draws WHERE round BETWEEN ? AND ?", (int(rounds[0]), int(rounds[-1]))
+        )}
+        new = np.array([int(r) not in existing for r in rounds], dtype=bool)
+        if not new.any():
+            return 0
+
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (int(r), *map(int, nums), int(b), source, now)
+            for r, nums, b in zip(rounds[new], numbers[new], bonus[new])
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT INTO draws VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._apply(numbers[new], bonus[new], +1)
+        return len(rows)
+
+    def add_draw(self, numbers, bonus, round_num=None, source="manual"):
+        """한 회차 추가. 회차를 주지 않으면 최신 회차 + 1. 이미 있으면 None을 돌려준다."""
+        if round_num is None:
+            round_num = self.latest_round() + 1
+        added = self.add_draws([round_num], [numbers], [bonus], source=source)
+        return round_num if added else None
+
+    def delete_round(self, round_num):
+        """회차 삭제 (수동 등록 취소 등). 삭제했으면 True."""
+        draw = self.get_draw(round_num)
+        if draw is None:
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM draws WHERE round = ?", (round_num,))
+            self.conn.execute(
+                "INSERT INTO meta VALUES ('deletions', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+            )
+        self._apply([draw[0]], [draw[1]], -1, removed_round=round_num)
+        return True
+
+    def _apply(self, numbers, bonus, sign, removed_round=None):
+        """바뀐 회차만큼 빈도수 저장소를 갱신 (회차 수에 비례하는 비용)"""
+        if self.store is None:
+            return
+        normal_delta, bonus_delta = _counts(numbers, bonus)
+        # 다른 스레드(폴더 감시)나 프로세스가 같은 저장소를 동시에 갱신해도 잃지 않도록
+        with self.store.locked():
+            normal_freq, bonus_freq, latest_round = self.store.read()
+            if normal_freq is None:
+                normal_freq = np.zeros(45, dtype=np.int64)
+                bonus_freq = np.zeros(45, dtype=np.int64)
+                latest_round = 0
+            if removed_round is not None and removed_round == latest_round:
+                latest_round = removed_round - 1
+            self.store.write(
+                normal_freq.astype(np.int64) + sign * normal_delta,
+                bonus_freq.astype(np.int64) + sign * bonus_delta,
+                max(latest_round, self.latest_round()),
+            )
+
+    def rebuild_store(self):
+        """저장된 모든 회차로 빈도수 저장소를 다시 계산 (이전 JSON 누적값은 버린다)"""
+        if self.store is None:
+            return
+        with self.store.locked():
+            _, numbers, bonus = self.all_draws()
+            normal_freq, bonus_freq = _counts(numbers, bonus)
+            self.store.write(normal_freq, bonus_freq, self.latest_round())
@@ -0,0 +1,130 @@
+import os
+import ctypes
+import threading
+import weakref
+import numpy as np
+import instrument
+
+# OS 난수를 한 번에 읽어 오는 기본 크기
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def get_hardware_random_bytes(n):
+    if os.name == 'nt':
+        BCRYPT_USE_SYSTEM_PREFERRED_RNG = 0x00000002
+        bcrypt = ctypes.windll.bcrypt
+        buffer = ctypes.create_string_buffer(n)
+        status = bcrypt.BCryptGenRandom(None, buffer, n, BCRYPT_USE_SYSTEM_PREFERRED_RNG)
+        if status != 0:
+            raise OSError(f"BCryptGenRandom failed: {status}")
+        return buffer.raw
+    else:
+        return os.urandom(n)
+
+
+_pools = weakref.WeakSet()
+
+
+class HardwareEntropyPool:
+    """OS 난수를 큰 블록으로 읽어 두고 조금씩 나눠 주는 스레드 안전 버퍼
+
+    블록을 다 쓰면 새 bytes 객체로 교체하므로, 이미 나눠 준 memoryview나
+    np.frombuffer 배열은 복사 없이 계속 유효하다.
+    """
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE):
+        if block_size < 8:
+            raise ValueError("블록 크기는 8바이트 이상이어야 합니다.")
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._pos = 0
+        # 통계: OS 난수 호출 횟수와 나눠 준 바이트 수
+        self.refills = 0
+        self.bytes_served = 0
+        _pools.add(self)
+
+    def _take(self, n):
+        """연속된 n바이트의 (버퍼, 시작 위치). 호출 시 잠금을 잡고 있어야 한다."""
+        self.bytes_served += n
+        if n > self.block_size:
+            # 블록보다 큰 요청은 버퍼를 거치지 않고 바로 읽는다
+            self.refills += 1
+            return get_hardware_random_bytes(n), 0
+        if self._pos + n > len(self._buffer):
+            self._buffer = get_hardware_random_bytes(self.block_size)
+            self._pos = 0
+            self.refills += 1
+        offset = self._pos
+        self._pos += n
+        return self._buffer, offset
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._pos = 0
+
+    def random_bytes(self, n):
+        """n바이트 난수 (읽기 전용 memoryview)"""
+        with self._lock:
+            buffer, offset = self._take(n)
+        return memoryview(buffer)[offset:offset + n]
+
+    def random_array(self, count, dtype='<u4'):
+        """지정한 정수 자료형의 난수 배열 (복사 없는 읽기 전용 배열)"""
+        dtype = np.dtype(dtype)
+        with self._lock:
+            buffer, offset = self._take(count * dtype.itemsize)
+        return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+    def random_float(self):
+        """[0, 1) 구간 실수 하나 (32비트 해상도)"""
+        with self._lock:
+            buffer, offset = self._take(4)
+        return int.from_bytes(buffer[offset:offset + 4], byteorder='little') / 2**32
+
+    def random_floats(self, count):
+        """[0, 1) 구간 실수 배열 (32비트 해상도)"""
+        return self.random_array(count, '<u4') * 2.0**-32
+
+    def randbelow(self, n):
+        """[0, n) 구간 정수 하나 (편향 없는 거부 추출)"""
+        if not 0 < n <= 2**32:
+            raise ValueError("범위는 1 이상 2**32 이하여야 합니다.")
+        limit = (2**32 // n) * n
+        while True:
+            with self._lock:
+                buffer, offset = self._take(4)
+            value = int.from_bytes(buffer[offset:offset + 4], byteorder='little')
+            if value < limit:
+                return value % n
+
+    def random_integers(self, n, count):
+        """[0, n) 구간 정수 배열 (편향 없는 거부 추출)"""
+        if not 0 < n <= 2**32:
+            raise ValueError("범위는 1 이상 2**32 이하여야 합니다.")
+        limit = (2**32 // n) * n
+        out = np.empty(count, dtype=np.int64)
+        filled = 0
+        while filled < count:
+            raw = self.random_array(count - filled, '<u4')
+            accepted = raw[raw < limit]
+            out[filled:filled + accepted.size] = accepted % n
+            filled += accepted.size
+        return out
+
+
+def _reset_pools_after_fork():
+    # 자식 프로세스가 부모와 같은 버퍼를 나눠 쓰지 않도록 비운다
+    for pool in list(_pools):
+        pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+# 프로그램 전체에서 함께 쓰는 기본 풀
+hardware_pool = HardwareEntropyPool()
+# 계측 통계에 OS 난수 사용량을 함께 표시 (풀이 이미 세고 있는 값이라 추가 비용 없음)
+instrument.gauge("rng.bytes.hardware", lambda: hardware_pool.bytes_served)
+instrument.gauge("rng.hardware_refills", lambda: hardware_pool.refills)
@@ -0,0 +1,216 @@
+import os
+import sys
+import time
+from itertools import combinations
+import numpy as np
+
+# 내보내기 형식
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_NPY = "npy"
+FORMAT_TEXT = "txt"  # 빈도 분석 보고서 (사람이 읽는 형식)
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_PARQUET, FORMAT_NPY, FORMAT_TEXT)
+
+# 한 번에 만들어 쓰는 행 수
+EXPORT_CHUNK = 1 << 16
+
+# .npy 헤더 길이. 항상 이 길이로 써 두고 행 수를 다 센 뒤 같은 자리에 다시 쓴다.
+NPY_HEADER = 128
+
+# 내보낼 표의 열 이름
+FREQUENCY_COLUMNS = ("number", "normal", "bonus", "total")
+PAIR_COLUMNS = ("a", "b", "count")
+ROUND_COLUMNS = ("round", "n1", "n2", "n3", "n4", "n5", "n6", "bonus")
+TICKET_COLUMNS = ("n1", "n2", "n3", "n4", "n5", "n6")
+
+_PAIRS = np.array(list(combinations(range(45), 2)), dtype=np.intp)
+
+
+def format_for_path(path, default=FORMAT_CSV):
+    """파일 확장자로 형식 결정 (.parquet/.npy/.txt, 그 외에는 default)"""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return ext if ext in EXPORT_FORMATS else default
+
+
+def format_throughput(rows, seconds):
+    """'1,000,000행, 0.52초 (1,923,077행/초)'"""
+    rate = rows / seconds if seconds > 0 else 0
+    return f"{rows:,}행, {seconds:.2f}초 ({rate:,.0f}행/초)"
+
+
+def frequency_chunks(normal_freq, bonus_freq):
+    """번호별 빈도 표 (45, 4): 번호, 일반, 보너스, 합계"""
+    normal = np.asarray(normal_freq, dtype=np.int64)
+    bonus = np.asarray(bonus_freq, dtype=np.int64)
+    yield np.column_stack([np.arange(1, 46), normal, bonus, normal + bonus])
+
+
+def pair_chunks(pairs):
+    """45×45 동시 출현 행렬 → (a, b, 횟수) 행 (a < b, 990행)"""
+    pairs = np.asarray(pairs, dtype=np.int64)
+    yield np.column_stack([_PAIRS + 1, pairs[_PAIRS[:, 0], _PAIRS[:, 1]]])
+
+
+def round_chunks(database, chunk=EXPORT_CHUNK):
+    """DrawDatabase의 회차별 기록 (회차, n1~n6, 보너스)"""
+    return database.iter_draws(chunk)
+
+
+def _iter_chunks(chunks, on_chunk=None):
+    """청크를 배열로 넘기고, 쓸 때마다 on_chunk(누적 행 수) 호출"""
+    rows = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        yield chunk
+        rows += len(chunk)
+        if on_chunk is not None:
+            on_chunk(rows)
+
+
+def _open_output(path):
+    """경로가 None이나 '-'이면 표준 출력, 아니면 새 파일 (바이너리)"""
+    if path is None or path == "-":
+        return sys.stdout.buffer, False
+    return open(path, "wb"), True
+
+
+def write_csv(path, columns, chunks, on_chunk=None, header=True):
+    """청크마다 한 번의 문자열 포맷으로 CSV를 쓴다 (메모리는 청크 크기만큼만 사용)"""
+    out, owned = _open_output(path)
+    rows = 0
+    try:
+        if header:
+            out.write((",".join(columns) + "\n").encode("utf-8"))
+        for chunk in _iter_chunks(chunks, on_chunk):
+            if not len(chunk):
+                continue
+            chunk = chunk.reshape(len(chunk), -1)
+            field = "%d" if chunk.dtype.kind in "iub" else "%.10g"
+            line = ",".join([field] * chunk.shape[1]) + "\n"
+            out.write(((line * len(chunk)) % tuple(chunk.ravel().tolist())).encode("ascii"))
+            rows += len(chunk)
+        out.flush()
+    finally:
+        if owned:
+            out.close()
+    return rows
+
+
+def _npy_header(dtype, shape):
+    """길이가 NPY_HEADER로 고정된 .npy 1.0 헤더"""
+    text = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (np.dtype(dtype).str, tuple(shape))
+    prefix = b"\x93NUMPY\x01\x00"
+    size = NPY_HEADER - len(prefix) - 2
+    if len(text) + 1 > size:
+        raise ValueError("배열 모양이 너무 커서 헤더에 들어가지 않습니다.")
+    body = (text + " " * (size - len(text) - 1) + "\n").encode("latin1")
+    return prefix + size.to_bytes(2, "little") + body
+
+
+def write_npy(path, chunks, count=None, on_chunk=None):
+    """청크를 이어 붙인 하나의 .npy 배열로 저장
+
+    count(전체 행 수)를 모르면 헤더를 임시로 써 두었다가 끝난 뒤 실제 행 수로
+    고쳐 쓰므로 파일이어야 한다. 표준 출력으로 보낼 때는 count가 필요하다.
+    """
+    out, owned = _open_output(path)
+    if not owned and count is None:
+        raise ValueError("표준 출력으로 .npy를 보낼 때는 전체 행 수가 필요합니다.")
+    rows = 0
+    dtype = tail = None
+    try:
+        for chunk in _iter_chunks(chunks, on_chunk):
+            if dtype is None:
+                dtype, tail = chunk.dtype, chunk.shape[1:]
+                out.write(_npy_header(dtype, (count if count is not None else 0,) + tail))
+            elif chunk.dtype != dtype or chunk.shape[1:] != tail:
+                raise ValueError("청크마다 자료형과 열 수가 같아야 합니다.")
+            out.write(np.ascontiguousarray(chunk).tobytes())
+            rows += len(chunk)
+        if dtype is None:
+            dtype, tail = np.dtype(np.int64), ()
+            out.write(_npy_header(dtype, (0,)))
+        if count is not None and rows != count:
+            raise ValueError(f"행 수가 맞지 않습니다 (예상 {count:,}, 실제 {rows:,}).")
+        if count is None:
+            out.seek(0)
+            out.write(_npy_header(dtype, (rows,) + tail))
+        out.flush()
+    finally:
+        if owned:
+            out.close()
+    return rows
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet로 저장하려면 pyarrow가 필요합니다 (pip install pyarrow).")
+    return pyarrow, pyarrow.parquet
+
+
+def write_parquet(path, columns, chunks, on_chunk=None):
+    """청크마다 row group 하나씩 Parquet 파일로 저장 (pyarrow 필요)"""
+    pa, pq = _require_pyarrow()
+    writer = None
+    rows = 0
+    try:
+        for chunk in _iter_chunks(chunks, on_chunk):
+            chunk = chunk.reshape(len(chunk), -1)
+            batch = pa.table({name: chunk[:, i] for i, name in enumerate(columns)})
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema)
+            writer.write_table(batch)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_report(path, analysis_results):
+    """빈도 분석 결과를 사람이 읽는 텍스트 보고서로 저장"""
+    normal_freq = analysis_results['normal_freq']
+    bonus_freq = analysis_results['bonus_freq']
+    total_freq = analysis_results['total_freq']
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("로또 번호 빈도 분석 결과\n")
+        f.write("=" * 50 + "\n\n")
+        f.write(f"총 분석 회차: {analysis_results['total_draws']}회\n\n")
+
+        f.write("일반 번호 빈도수 배열 (1~45번):\n")
+        f.write(str(normal_freq) + "\n\n")
+
+        f.write("보너스 번호 빈도수 배열 (1~45번):\n")
+        f.write(str(bonus_freq) + "\n\n")
+
+        f.write("전체 번호 빈도수 배열 (일반+보너스, 1~45번):\n")
+        f.write(str(total_freq) + "\n\n")
+
+        f.write("상세 분석 결과:\n")
+        f.write("번호\t일반빈도\t보너스빈도\t총빈도\n")
+        f.write("-" * 40 + "\n")
+
+        for i in range(45):
+            f.write(f"{i + 1}\t{normal_freq[i]}\t\t{bonus_freq[i]}\t\t{total_freq[i]}\n")
+    return 45
+
+
+def export_table(path, fmt, columns, chunks, count=None, on_chunk=None, header=True):
+    """columns 이름의 표를 청크 반복자에서 읽어 fmt 형식으로 저장. (행 수, 걸린 초)
+
+    header는 CSV에서 첫 줄에 열 이름을 쓸지 여부.
+    """
+    start = time.perf_counter()
+    if fmt == FORMAT_CSV:
+        rows = write_csv(path, columns, chunks, on_chunk, header)
+    elif fmt == FORMAT_NPY:
+        rows = write_npy(path, chunks, count, on_chunk)
+    elif fmt == FORMAT_PARQUET:
+        rows = write_parquet(path, columns, chunks, on_chunk)
+    else:
+        raise ValueError(f"표 내보내기에 쓸 수 없는 형식입니다: {fmt}")
+    return rows, time.perf_counter() - start
@@ -0,0 +1,263 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 파일 형식: 헤더(32바이트) + 일반 빈도 45개 + 보너스 빈도 45개 (모두 little-endian uint32)
+MAGIC = b"PLFQ"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIQ12x")  # 매직, 형식 버전, 최신 회차, 저장 일련번호
+COUNTERS = 45 * 2
+FILE_SIZE = HEADER.size + COUNTERS * 4
+# (Windows) 매핑 중이라 교체에 실패했을 때 다시 시도하는 횟수와 간격 (초)
+REPLACE_RETRIES = 20
+REPLACE_RETRY_DELAY = 0.05
+
+
+def get_data_dir():
+    # 서버/배치 작업에서는 환경 변수로 데이터 폴더를 바꿀 수 있다
+    if os.environ.get("PICK_LOTTO_DATA_DIR"):
+        base_dir = os.environ["PICK_LOTTO_DATA_DIR"]
+    elif os.name == 'nt':
+        base_dir = "C:\\rand_a"
+    else:
+        base_dir = "/rand_a"
+
+    os.makedirs(base_dir, exist_ok=True)
+    return base_dir
+
+
+def get_store_filename():
+    filename = "frequencies.bin" if os.name == 'nt' else ".frequencies.bin"
+    return os.path.join(get_data_dir(), filename)
+
+
+class _StoreLock:
+    """한 저장소 파일에 대한 잠금 (같은 스레드에서는 다시 잡을 수 있다)
+
+    프로세스 안의 스레드는 RLock으로, 다른 프로세스와는 옆의 .lock 파일에 거는
+    OS 잠금(flock / msvcrt.locking)으로 막는다.
+    """
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = self._lock_file()
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+        self._lock.release()
+
+    def _lock_file(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # LK_LOCK은 10초 동안만 다시 시도하므로 잡힐 때까지 반복
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+
+_store_locks = {}
+_store_locks_guard = threading.Lock()
+
+
+def _store_lock(path):
+    """경로별로 프로세스 안에서 하나뿐인 잠금 (저장소 객체가 여럿이어도 같은 잠금)"""
+    key = os.path.normcase(os.path.abspath(path))
+    with _store_locks_guard:
+        lock = _store_locks.get(key)
+        if lock is None:
+            lock = _store_locks[key] = _StoreLock(path)
+        return lock
+
+
+class FrequencyStore:
+    """mmap으로 읽는 이진 빈도수 저장소
+
+    읽기는 파일이 바뀌었는지 stat 한 번으로 확인한 뒤 매핑된 메모리를 그대로
+    돌려주고, 쓰기는 임시 파일에 쓴 다음 이름을 바꿔서 원자적으로 교체한다.
+    legacy_json_path가 주어지면 이진 파일이 없을 때 기존 JSON을 변환한다.
+    읽고 더해서 다시 쓰는 갱신은 locked() 안에서 해야 다른 스레드/프로세스의
+    갱신을 잃지 않는다 (add_draw, DrawDatabase는 알아서 잡는다).
+    """
+
+    def __init__(self, path, legacy_json_path=None):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self._map = None
+        self._stat_key = None
+
+    def locked(self):
+        """저장소 파일 잠금 (with 문). 같은 스레드에서 겹쳐 잡아도 된다."""
+        return _store_lock(self.path)
+
+    def _migrate(self):
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return False
+        with open(self.legacy_json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        normal_freq = data.get("normal_frequencies") or [0] * 45
+        bonus_freq = data.get("bonus_frequencies") or [0] * 45
+        self.write(normal_freq, bonus_freq, data.get("latest_round") or 0)
+        # 최신화 경과일 표시가 초기화되지 않도록 JSON의 수정 시각을 유지
+        mtime = os.path.getmtime(self.legacy_json_path)
+        os.utime(self.path, (mtime, mtime))
+        return True
+
+    def exists(self):
+        return os.path.exists(self.path) or self._migrate()
+
+    def _mapped(self):
+        """현재 파일의 mmap (없으면 None). 파일이 교체되었을 때만 다시 연다."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if not self._migrate():
+                self._map = self._stat_key = None
+                return None
+            st = os.stat(self.path)
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key != self._stat_key:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, _ = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != FORMAT_VERSION or len(mapped) < FILE_SIZE:
+                raise ValueError(f"빈도수 파일 형식이 올바르지 않습니다: {self.path}")
+            # 이전 매핑은 넘겨준 배열이 모두 사라지면 자동으로 해제된다
+            self._map = mapped
+            self._stat_key = key
+        return self._map
+
+    def header(self):
+        """(최신 회차, 저장 일련번호). 파일이 없으면 None."""
+        mapped = self._mapped()
+        if mapped is None:
+            return None
+        _, _, latest_round, serial = HEADER.unpack_from(mapped, 0)
+        return latest_round, serial
+
+    def read(self):
+        """(일반 빈도, 보너스 빈도, 최신 회차). 빈도는 복사 없는 읽기 전용 uint32 배열."""
+        mapped = self._mapped()
+        if mapped is None:
+            return None, None, None
+        _, _, latest_round, _ = HEADER.unpack_from(mapped, 0)
+        counters = np.frombuffer(mapped, dtype="<u4", count=COUNTERS, offset=HEADER.size)
+        return counters[:45], counters[45:], latest_round
+
+    def write(self, normal_freq, bonus_freq, latest_round):
+        """빈도수 전체를 원자적으로 교체"""
+        counters = np.concatenate([
+            np.asarray(normal_freq, dtype=np.int64),
+            np.asarray(bonus_freq, dtype=np.int64),
+        ])
+        if counters.shape != (COUNTERS,):
+            raise ValueError("빈도수 배열은 각각 45개여야 합니다.")
+        if counters.min() < 0 or counters.max() >= 2**32:
+            raise ValueError("빈도수가 저장 가능한 범위를 벗어났습니다.")
+
+        with self.locked():
+            header = self.header() if os.path.exists(self.path) else None
+            serial = header[1] + 1 if header else 1
+            data = HEADER.pack(MAGIC, FORMAT_VERSION, int(latest_round), serial) + counters.astype("<u4").tobytes()
+
+            # 임시 파일 이름이 스레드/프로세스끼리 겹치지 않도록 mkstemp
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                dir=os.path.dirname(os.path.abspath(self.path)),
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp는 소유자만 읽을 수 있게 만들므로 다른 사용자(서버)도 읽도록
+                os.chmod(tmp_path, 0o644)
+                old_map, self._map, self._stat_key = self._map, None, None
+                self._replace(tmp_path, old_map)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _replace(self, tmp_path, old_map):
+        """임시 파일로 교체. Windows에서는 매핑 중인 파일의 이름을 바꿀 수 없으므로
+        이 프로세스의 매핑을 닫고 잠시 뒤 다시 시도한다 (제자리에 덮어쓰지는 않는다)."""
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp_path, self.path)
+                return
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                if old_map is not None:
+                    try:
+                        old_map.close()
+                    except BufferError:
+                        # read()로 넘겨준 배열이 남아 있으면 그 배열이 사라질 때 해제된다
+                        pass
+                    old_map = None
+                time.sleep(REPLACE_RETRY_DELAY)
+
+    def add_draw(self, numbers, bonus, round_num=None):
+        """한 회차를 더해서 저장. 회차를 주지 않으면 최신 회차 + 1. 저장한 회차를 돌려준다."""
+        with self.locked():
+            normal_freq, bonus_freq, latest_round = self.read()
+            if normal_freq is None:
+                normal_freq = np.zeros(45, dtype=np.int64)
+                bonus_freq = np.zeros(45, dtype=np.int64)
+                latest_round = 0
+            normal_freq = normal_freq.astype(np.int64)
+            bonus_freq = bonus_freq.astype(np.int64)
+
+            for n in numbers:
+                normal_freq[n - 1] += 1
+            bonus_freq[bonus - 1] += 1
+            if round_num is None:
+                round_num = latest_round + 1
+
+            self.write(normal_freq, bonus_freq, max(latest_round, round_num))
+        return round_num
@@ -0,0 +1,341 @@
+"""추첨 결과 분포 감시 (기본은 꺼져 있음)
+
+    if gof_monitor.enabled:
+        gof_monitor.observe(weights, tickets)
+
+가중치마다 번호 쌍 횟수표 (46 × 46 정수, 번호별 횟수는 쌍 횟수에서 계산)
+하나만 두고 묶음 단위로 np.bincount로 더하므로 메모리는 생성량과 관계없이
+일정하다. 어느 경로든 OBSERVE_STRIDE장마다 한 장만 세고 (결과와 무관하게
+고르므로 분포는 그대로), 한 장씩 뽑는 경로는 OBSERVE_BUFFER장을 모아서
+센다. CHECK_EVERY장을 셀 때마다 그 구간과 누적 횟수를 정확한 포함 확률
+(combo_prob 표)과 비교해 카이제곱 / KS / 번호 쌍 최대 편차 검정을 하고,
+p 값이 ALERT_P보다 작거나 확률이 0인 번호가 나오면 경고한다. 켜는 방법은
+enable() 또는 환경 변수 PICK_LOTTO_GOF=1.
+프로세스 풀 작업자에서는 감시하지 않으며 (풀을 만들 때 initializer로
+enable(False)), 결과를 받는 부모 프로세스가 센다.
+"""
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from collections import OrderedDict, deque
+import numpy as np
+import instrument
+
+enabled = (os.environ.get("PICK_LOTTO_GOF", "") not in ("", "0")
+           and multiprocessing.parent_process() is None)
+
+# 세는 간격 (16장마다 한 장: 생성 시간의 5% 안쪽)
+OBSERVE_STRIDE = 16
+# 한 장씩 뽑는 경로에서 모아 두었다가 한 번에 세는 장 수
+OBSERVE_BUFFER = 256
+# 구간 검정 간격 (센 티켓 수 기준)
+CHECK_EVERY = 1 << 16
+# 검정을 여러 번 반복하므로 오경보가 거의 없도록 작게 잡은 경고 기준
+ALERT_P = 1e-6
+# 근사 분포가 맞으려면 필요한 최소 티켓 수 (이보다 적으면 경고하지 않는다)
+MIN_TICKETS = 1000
+# 가중치별 감시기 수 (오래 쓰지 않은 것부터 버림)
+MONITOR_LIMIT = 8
+# 기억해 두는 최근 경고 수
+ALERT_HISTORY = 32
+
+# 번호 쌍 (a, b)의 열 위치 (티켓 행은 오름차순이므로 a < b)
+_FIRST, _SECOND = (np.array(c) for c in zip(*((i, j) for i in range(6) for j in range(i + 1, 6))))
+
+_lock = threading.Lock()
+_monitors = OrderedDict()
+_handlers = []
+_calls = 0
+alerts = deque(maxlen=ALERT_HISTORY)
+
+
+def _chi2_sf(x, df):
+    """카이제곱 분포 꼬리 확률 (Wilson-Hilferty 근사)"""
+    if df <= 0:
+        return 1.0
+    h = 2.0 / (9.0 * df)
+    z = ((x / df) ** (1.0 / 3.0) - (1.0 - h)) / math.sqrt(h)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def _kolmogorov_sf(x):
+    """Kolmogorov 분포 꼬리 확률 P(K > x)"""
+    if x < 0.2:
+        return 1.0
+    return min(1.0, max(0.0, 2.0 * sum((-1) ** (k - 1) * math.exp(-2.0 * k * k * x * x) for k in range(1, 101))))
+
+
+class Expectation:
+    """가중치 하나의 기대 분포 (번호 포함 확률, 쌍 포함 확률)와 검정용 값"""
+
+    def __init__(self, inclusion, pairs):
+        self.inclusion = np.asarray(inclusion, dtype=np.float64)
+        self.pairs = np.asarray(pairs, dtype=np.float64)
+        upper = np.triu_indices(45, 1)
+        self.pair_cells = self.pairs[upper]
+        self.cdf = np.cumsum(self.inclusion) / 6.0
+        # 번호 횟수 벡터의 티켓당 공분산: 대각은 π_i(1 - π_i), 나머지는 π_ij - π_i π_j.
+        # 티켓마다 합이 6으로 고정이라 역행렬이 없으므로 0이 아닌 고윳값 방향만 쓴다 (마할라노비스 거리).
+        live = np.flatnonzero(self.inclusion > 0)
+        p = self.inclusion[live]
+        cov = self.pairs[np.ix_(live, live)] - np.outer(p, p)
+        cov[np.diag_indices_from(cov)] = p * (1.0 - p)
+        values, vectors = np.linalg.eigh(cov)
+        keep = values > values.max() * 1e-9
+        self.live = live
+        self.basis = vectors[:, keep] / np.sqrt(values[keep])
+        self.df = int(keep.sum())
+
+    def evaluate(self, pair_counts, n):
+        """46 × 46 쌍 횟수표 (센 티켓 n장)의 검정 결과 dict"""
+        if n == 0:
+            return {"tickets": 0, "p": 1.0, "alert": False}
+        counts = pair_counts[1:, 1:]
+        counts = counts + counts.T
+        numbers = counts.sum(axis=1) / 5.0
+
+        # 확률이 0인 번호/쌍에서 나온 횟수 (하나라도 있으면 추첨 경로의 오류)
+        impossible = int(numbers[self.inclusion == 0].sum())
+
+        # 번호별 횟수: 공분산을 반영한 카이제곱 (자유도 = 확률이 있는 번호 수 - 1)
+        deviation = numbers[self.live] - n * self.inclusion[self.live]
+        chi2 = float(np.sum((deviation @ self.basis) ** 2) / n)
+        chi2_p = _chi2_sf(chi2, self.df)
+
+        # 공 단위 번호 누적 분포의 최대 차이 (KS)
+        balls = 6.0 * n
+        ks = float(np.abs(np.cumsum(numbers) / balls - self.cdf).max())
+        ks_p = _kolmogorov_sf(math.sqrt(balls) * ks)
+
+        # 번호 쌍: 표준화 편차의 최댓값 (쌍끼리 상관이 있어도 맞는 본페로니 보정)
+        observed = counts[np.triu_indices(45, 1)]
+        possible = self.pair_cells > 0
+        impossible += int(observed[~possible].sum())
+        expected = n * self.pair_cells[possible]
+        z = np.abs(observed[possible] - expected) / np.sqrt(expected * (1.0 - self.pair_cells[possible]))
+        pair_z = float(z.max()) if z.size else 0.0
+        pair_p = min(1.0, z.size * math.erfc(pair_z / math.sqrt(2.0)))
+
+        p = min(chi2_p, ks_p, pair_p)
+        return {
+            "tickets": int(n),
+            "chi2": chi2, "df": self.df, "chi2_p": chi2_p,
+            "ks": ks, "ks_p": ks_p,
+            "pair_z": pair_z, "pair_p": pair_p,
+            "impossible": impossible,
+            "p": p,
+            "alert": bool(impossible) or (n >= MIN_TICKETS and p < ALERT_P),
+        }
+
+
+class GofMonitor:
+    """가중치 하나로 만든 추첨 결과의 번호 쌍 횟수 (구간 + 누적)와 검정 결과"""
+
+    def __init__(self, weights, check_every=CHECK_EVERY):
+        self.weights = np.array(weights, dtype=np.float64)
+        self.check_every = check_every
+        self.window = np.zeros((46, 46), dtype=np.int64)
+        self.total = np.zeros((46, 46), dtype=np.int64)
+        self.window_tickets = 0
+        self.tickets = 0
+        self.checks = 0
+        self.last = None
+        self._pending = []
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._expectation = None
+        self._loading = None
+
+    def observe(self, tickets):
+        """(n, 6) 오름차순 번호 배열을 센다"""
+        tickets = np.asarray(tickets)
+        if tickets.ndim != 2 or tickets.shape[1] != 6 or not tickets.size:
+            return
+        ids = tickets[:, _FIRST].astype(np.intp) * 46 + tickets[:, _SECOND]
+        counts = np.bincount(ids.ravel(), minlength=46 * 46).reshape(46, 46)
+        with self._lock:
+            self.window += counts
+            self.total += counts
+            self.window_tickets += len(tickets)
+            self.tickets += len(tickets)
+            due = self.window_tickets >= self.check_every
+        if due:
+            self.check()
+
+    def observe_one(self, numbers):
+        """오름차순 번호 6개 하나 (OBSERVE_STRIDE장마다 한 장을 모아 두었다가 OBSERVE_BUFFER장이 되면 센다)"""
+        self._calls += 1
+        if not self._calls % OBSERVE_STRIDE:
+            self._collect(numbers)
+
+    def _collect(self, numbers):
+        with self._lock:
+            self._pending.append(numbers)
+            full = len(self._pending) >= OBSERVE_BUFFER
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self.observe(np.array(pending, dtype=np.uint8))
+
+    def expectation(self, wait=False):
+        """정확한 포함 확률. 표가 없으면 다른 스레드에서 만들고 (wait가 아니면) 준비될 때까지 None."""
+        if self._expectation is None:
+            with self._lock:
+                if self._loading is None:
+                    self._loading = threading.Thread(target=self._load, daemon=True)
+                    self._loading.start()
+            if wait:
+                self._loading.join()
+        return self._expectation
+
+    def _load(self):
+        # 첫 표는 만드는 데 몇 초 걸리므로 추첨 경로를 막지 않는다
+        from lotto_core import get_combo_probabilities
+
+        try:
+            table = get_combo_probabilities(self.weights)
+            self._expectation = Expectation(table.inclusion, table.pairs)
+        except (OSError, ValueError) as e:
+            # 다시 시도하지 않는다 (검정만 멈추고 추첨은 그대로)
+            print(f"분포 감시: 기대 확률을 만들 수 없습니다: {e}", file=sys.stderr)
+
+    def check(self):
+        """구간 횟수와 누적 횟수를 검정하고 구간을 비운다. 기대 확률이 아직 없으면 None."""
+        expectation = self.expectation()
+        if expectation is None:
+            return None
+        with self._lock:
+            window, n = self.window.copy(), self.window_tickets
+            total, tickets = self.total.copy(), self.tickets
+            self.window[:] = 0
+            self.window_tickets = 0
+            self.checks += 1
+        result = {"window": expectation.evaluate(window, n), "total": expectation.evaluate(total, tickets)}
+        self.last = result
+        if instrument.enabled:
+            instrument.count("gof.checks")
+        if result["window"]["alert"] or result["total"]["alert"]:
+            _alert(self, result)
+        return result
+
+    def report(self):
+        """남은 것을 모두 세고 누적 횟수 검정 결과 (기대 확률이 준비될 때까지 기다린다)"""
+        self.flush()
+        expectation = self.expectation(wait=True)
+        if expectation is None:
+            return None
+        with self._lock:
+            total, tickets = self.total.copy(), self.tickets
+        return expectation.evaluate(total, tickets)
+
+
+def format_result(result):
+    """evaluate 결과를 한 줄로"""
+    if not result["tickets"]:
+        return "센 티켓 없음"
+    text = (f"{result['tickets']:,}장: 카이제곱 {result['chi2']:.1f} (자유도 {result['df']}, p={result['chi2_p']:.3g}), "
+            f"KS {result['ks']:.2e} (p={result['ks_p']:.3g}), 쌍 최대 편차 {result['pair_z']:.2f}σ (p={result['pair_p']:.3g})")
+    if result["impossible"]:
+        text += f", 확률 0인 번호/쌍 {result['impossible']:,}회"
+    return text
+
+
+def _alert(monitor, result):
+    part = "window" if result["window"]["alert"] else "total"
+    message = f"분포 감시 경고 ({'구간' if part == 'window' else '누적'}) {format_result(result[part])}"
+    alerts.append(message)
+    if instrument.enabled:
+        instrument.count("gof.alerts")
+    for handler in list(_handlers):
+        handler(message, monitor, result)
+
+
+def _print_alert(message, monitor, result):
+    print(message, file=sys.stderr)
+
+
+def add_alert_handler(func):
+    """경고 때마다 func(메시지, 감시기, 검정 결과)를 부른다 (추첨한 스레드에서)"""
+    _handlers.append(func)
+
+
+def get_monitor(weights):
+    """가중치 비율이 같으면 같은 감시기. 번호가 45개가 아니면 None."""
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (45,):
+        return None
+    total = weights.sum()
+    if not total > 0:
+        return None
+    # 합이 1이 되게 맞춰 비례하는 가중치 (정수/실수, 배수)가 같은 키가 되도록
+    # (나눗셈 반올림 차이는 자릿수를 잘라 없앤다)
+    ratio = np.round(weights / total, 12)
+    key = ratio.tobytes()
+    with _lock:
+        monitor = _monitors.get(key)
+        if monitor is None:
+            monitor = _monitors[key] = GofMonitor(ratio)
+            if len(_monitors) > MONITOR_LIMIT:
+                _monitors.popitem(last=False)
+        else:
+            _monitors.move_to_end(key)
+    return monitor
+
+
+def observe(weights, tickets, stride=OBSERVE_STRIDE):
+    """weights로 뽑은 (n, 6) 번호 배열에서 stride장마다 한 장씩 센다"""
+    monitor = get_monitor(weights)
+    if monitor is not None:
+        monitor.observe(tickets[::stride])
+
+
+def observe_one(weights, numbers):
+    """weights로 뽑은 번호 6개 하나. 감시기를 찾는 비용도 아끼도록 OBSERVE_STRIDE번에 한 번만 넘긴다."""
+    global _calls
+    _calls += 1
+    if _calls % OBSERVE_STRIDE:
+        return
+    monitor = get_monitor(weights)
+    if monitor is not None:
+        monitor._collect(numbers)
+
+
+def monitors():
+    with _lock:
+        return list(_monitors.values())
+
+
+def reset():
+    """감시기와 경고 기록을 모두 지운다"""
+    with _lock:
+        _monitors.clear()
+    alerts.clear()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def report_lines():
+    """감시기마다 누적 검정 결과 한 줄"""
+    lines = []
+    for monitor in monitors():
+        result = monitor.report()
+        if result is not None and result["tickets"]:
+            state = "경고" if result["alert"] else "정상"
+            lines.append(f"분포 감시 {state}: {format_result(result)}")
+    return lines
+
+
+_handlers.append(_print_alert)
+# 성능 통계 창/--metrics에 감시 상태를 함께 표시 (감시기 목록만 훑으므로 추첨 경로 비용 없음)
+instrument.gauge("gof.tickets", lambda: sum(m.tickets for m in monitors()))
+instrument.gauge("gof.alerts", lambda: len(alerts))
+instrument.gauge("gof.min_p", lambda: min((m.last["window"]["p"] for m in monitors() if m.last), default=1.0))
@@ -0,0 +1,338 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from functools import partial
+import numpy as np
+import instrument
+import parse_cache
+
+# 스트리밍 읽기에서 한 번에 변환하는 행 수
+STREAM_CHUNK_ROWS = 4096
+
+# pandas.read_excel이 기본으로 결측값(NaN)으로 바꾸는 문자열
+_NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+])
+
+
+_NUMBER_TYPES = (int, float, np.integer, np.floating, np.bool_)
+_type_of = np.frompyfunc(type, 1, 1)
+_is_na_string = np.frompyfunc(_NA_STRINGS.__contains__, 1, 1)
+
+
+def _text_number(text):
+    """숫자로 읽히는 글자 ('2000', ' 7 ', '1e3')의 값, 아니면 NaN"""
+    if "_" in text:
+        return np.nan
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+_text_numbers = np.frompyfunc(_text_number, 1, 1)
+
+
+def _object_columns(cells):
+    """object 배열 → (실수 값, 숫자 칸 여부, 값이 있는 칸 여부, 숫자로 읽히는 글자 칸의 값)
+
+    칸마다 isinstance를 부르지 않고 자료형을 한 번 구한 뒤 자료형별로 묶어 처리한다.
+    숫자로 읽히는 글자는 숫자 칸으로 치지 않고 마지막 배열에만 값을 둔다 (나머지는 NaN).
+    pandas처럼 열 전체가 숫자일 때만 숫자로 볼지는 호출하는 쪽이 정한다.
+    """
+    kinds = _type_of(cells)
+    values = np.full(cells.shape, np.nan)
+    text_values = np.full(cells.shape, np.nan)
+    numeric = np.zeros(cells.shape, dtype=bool)
+    present = np.ones(cells.shape, dtype=bool)
+    for kind in set(kinds.flat):
+        mask = kinds == kind
+        if kind is type(None):
+            present[mask] = False
+        elif issubclass(kind, str):
+            strings = cells[mask]
+            kept = ~_is_na_string(strings).astype(bool)
+            present[mask] = kept
+            text_values[mask] = np.where(kept, _text_numbers(strings).astype(np.float64), np.nan)
+        elif issubclass(kind, _NUMBER_TYPES):
+            values[mask] = cells[mask].astype(np.float64)
+            numeric[mask] = True
+    # 실수 NaN은 빈 칸으로 취급 (dropna와 동일)
+    missing = numeric & np.isnan(values)
+    numeric[missing] = False
+    present[missing] = False
+    return values, numeric, present, text_values
+
+
+def _extract_rows(values, numeric, present):
+    """행 단위 규칙을 표 전체에 대해 한 번에 적용
+
+    - 값이 있는 두 번째 칸이 숫자이면 회차 번호로 본다.
+    - 1~45 사이 숫자가 7개 이상인 행은 마지막 7개를 당첨번호 6개 + 보너스로 본다.
+    - 각 당첨번호 행의 회차는 두 번째 열(회차 열) 값, 없으면 위 회차 번호를 쓴다.
+
+    반환값: (당첨번호, 보너스, 행별 회차 번호, 당첨번호 행의 회차)
+    """
+    rows = values.shape[0]
+    if rows == 0 or values.shape[1] == 0:
+        empty = np.zeros(0, np.int64)
+        return np.empty((0, 6), np.uint8), np.empty(0, np.uint8), empty, empty
+
+    # 값이 있는 두 번째 칸 (dropna 후 인덱스 1)
+    second = present & (np.cumsum(present, axis=1) == 2)
+    has_second = second.any(axis=1)
+    col = second.argmax(axis=1)
+    candidate = values[np.arange(rows), col]
+    is_round = has_second & numeric[np.arange(rows), col] & np.isfinite(candidate)
+    rounds = np.where(is_round, np.trunc(np.where(is_round, candidate, 0)), 0).astype(np.int64)
+
+    in_range = numeric & (values >= 1) & (values <= 45)
+    from_right = np.cumsum(in_range[:, ::-1], axis=1)[:, ::-1]
+    valid = from_right[:, 0] >= 7
+    take = in_range & (from_right <= 7) & valid[:, None]
+    winning = values[take].reshape(-1, 7).astype(np.uint8)
+
+    draw_rounds = rounds[valid]
+    if values.shape[1] > 1:
+        column = values[valid, 1]
+        in_column = numeric[valid, 1] & np.isfinite(column) & (column >= 1)
+        draw_rounds = np.where(in_column, np.trunc(np.where(in_column, column, 0)), draw_rounds).astype(np.int64)
+    return winning[:, :6].copy(), winning[:, 6].copy(), rounds, draw_rounds
+
+
+def _frame_columns(df):
+    """DataFrame → (실수 값, 숫자 칸 여부, 값이 있는 칸 여부)"""
+    shape = df.shape
+    values = np.full(shape, np.nan)
+    numeric = np.zeros(shape, dtype=bool)
+    present = np.zeros(shape, dtype=bool)
+    for j, name in enumerate(df.columns):
+        column = df[name]
+        if column.dtype.kind in "biuf":
+            v = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            values[:, j] = v
+            numeric[:, j] = present[:, j] = ~np.isnan(v)
+        elif column.dtype.kind in "mM":
+            present[:, j] = column.notna().to_numpy()
+        else:
+            # pandas가 숫자로 바꾸지 못한 열이므로 숫자로 읽히는 글자도 글자 그대로 둔다
+            values[:, j], numeric[:, j], present[:, j], _ = _object_columns(column.to_numpy(dtype=object))
+    return values, numeric, present
+
+
+def _stream_rows(file_path, chunk_rows):
+    """openpyxl 읽기 전용 모드로 첫 시트를 chunk_rows 행씩 읽는다."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        chunk = []
+        for row in ws.iter_rows(values_only=True):
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        wb.close()
+
+
+def _chunk_cells(chunk):
+    width = max(len(row) for row in chunk)
+    cells = np.empty((len(chunk), width), dtype=object)
+    for i, row in enumerate(chunk):
+        cells[i, :len(row)] = row
+    return cells
+
+
+def _stream_blocks(file_path, chunk_rows):
+    """스트리밍 읽기를 pandas와 같은 결과로
+
+    pandas는 숫자로 읽히는 글자 ('2000')를 그 열의 다른 값이 모두 숫자일 때만
+    숫자로 바꾼다. 열 끝까지 봐야 알 수 있으므로 그런 칸이 처음 나온 묶음부터는
+    끝까지 모아 두었다가 처리한다 (이미 글자가 있는 열의 칸이면 바로 처리).
+    """
+    blocked = np.zeros(0, dtype=bool)  # 숫자가 아닌 값이 있어 글자를 숫자로 보지 않는 열
+    held = []
+    for chunk in _stream_rows(file_path, chunk_rows):
+        values, numeric, present, text_values = _object_columns(_chunk_cells(chunk))
+        text = ~np.isnan(text_values)
+        width = values.shape[1]
+        if width > blocked.size:
+            blocked = np.concatenate([blocked, np.zeros(width - blocked.size, dtype=bool)])
+        blocked[:width] |= (present & ~numeric & ~text).any(axis=0)
+        if held or (text & ~blocked[:width]).any():
+            held.append((values, numeric, present, text_values))
+        else:
+            yield _extract_rows(values, numeric, present)
+    for values, numeric, present, text_values in held:
+        convert = ~np.isnan(text_values) & ~blocked[:values.shape[1]]
+        values[convert] = text_values[convert]
+        numeric |= convert
+        yield _extract_rows(values, numeric, present)
+
+
+def _read_blocks(file_path, streaming, chunk_rows):
+    if streaming:
+        yield from _stream_blocks(file_path, chunk_rows)
+    else:
+        import pandas as pd
+        yield _extract_rows(*_frame_columns(pd.read_excel(file_path, header=None)))
+
+
+@instrument.span("ingest.parse_file")
+def parse_file(file_path, streaming=False, chunk_rows=STREAM_CHUNK_ROWS):
+    """Excel 파일 해석 결과 (당첨번호 (n, 6) uint8, 보너스 (n,) uint8, 행별 회차 (n,) int64, 최신 회차)
+
+    회차를 알 수 없는 행의 회차는 0 이하이다. streaming=True이면 pandas 대신
+    openpyxl 읽기 전용 모드로 행 묶음 단위로 처리해 파일 크기와 관계없이
+    메모리 사용량이 일정하다 (숫자로 읽히는 글자 칸이 있으면 그 뒤 묶음은 모아
+    두므로 예외). 두 방식의 결과는 같다.
+    """
+    numbers, bonus, draw_rounds, latest_round = [], [], [], 0
+    for nums, bonus_nums, rounds, row_rounds in _read_blocks(file_path, streaming, chunk_rows):
+        numbers.append(nums)
+        bonus.append(bonus_nums)
+        draw_rounds.append(row_rounds)
+        if rounds.size:
+            latest_round = max(latest_round, int(rounds.max()))
+
+    if not numbers:
+        return np.empty((0, 6), np.uint8), np.empty(0, np.uint8), np.zeros(0, np.int64), latest_round
+    return np.concatenate(numbers), np.concatenate(bonus), np.concatenate(draw_rounds), latest_round
+
+
+def _parse(file_path, streaming, chunk_rows, cache):
+    if not cache:
+        return parse_file(file_path, streaming, chunk_rows)
+    parse = partial(parse_file, streaming=streaming, chunk_rows=chunk_rows)
+    return parse_cache.cached_parse(file_path, parse, "streaming" if streaming else parse_cache.DEFAULT_PARSER)
+
+
+@instrument.span("ingest.extract_draws")
+def extract_draws(file_path, streaming=False, chunk_rows=STREAM_CHUNK_ROWS, cache=True):
+    """Excel 파일에서 (당첨번호 (n, 6) uint8, 보너스 (n,) uint8, 최신 회차) 추출
+
+    cache=True이면 바뀌지 않은 파일은 parse_cache에 저장된 결과를 쓴다.
+    """
+    numbers, bonus, _, latest_round = _parse(file_path, streaming, chunk_rows, cache)
+    return numbers, bonus, latest_round
+
+
+@instrument.span("ingest.extract_round_records")
+def extract_round_records(file_path, streaming=False, chunk_rows=STREAM_CHUNK_ROWS, cache=True):
+    """Excel 파일에서 (회차 (n,) int64, 당첨번호 (n, 6) uint8, 보너스 (n,) uint8) 추출
+
+    회차를 알 수 없는 행은 제외한다.
+    """
+    numbers, bonus, draw_rounds, _ = _parse(file_path, streaming, chunk_rows, cache)
+    known = draw_rounds > 0
+    return draw_rounds[known], numbers[known], bonus[known]
+
+
+def summarize_file(file_path):
+    """파일 하나의 (일반 빈도, 보너스 빈도, 최신 회차, 회차 수). 프로세스 풀 작업 단위."""
+    numbers, bonus, latest_round = extract_draws(file_path)
+    normal_freq = np.bincount(numbers.ravel(), minlength=46)[1:46]
+    bonus_freq = np.bincount(bonus, minlength=46)[1:46]
+    return normal_freq, bonus_freq, latest_round, len(numbers)
+
+
+def merge_summaries(summaries):
+    """summarize_file 결과들을 합친다 (빈도는 합, 회차는 최댓값)."""
+    normal_freq = np.zeros(45, dtype=np.int64)
+    bonus_freq = np.zeros(45, dtype=np.int64)
+    latest_round = 0
+    draw_count = 0
+    for normal, bonus, round_num, count in summaries:
+        normal_freq += normal
+        bonus_freq += bonus
+        latest_round = max(latest_round, round_num)
+        draw_count += count
+    return normal_freq, bonus_freq, latest_round, draw_count
+
+
+# 캐시된 파일이면 프로세스 풀 없이 바로 처리해도 되는 작업 함수 (parse_cache 결과만 읽음)
+_CACHED_WORKERS = (summarize_file, extract_draws, extract_round_records)
+
+
+def _split_cached(files, worker):
+    """(캐시에 해석 결과가 있는 파일, 새로 읽어야 하는 파일)"""
+    if worker not in _CACHED_WORKERS:
+        return [], list(files)
+    cached, pending = [], []
+    for file_path in files:
+        (cached if parse_cache.lookup(file_path) is not None else pending).append(file_path)
+    return cached, pending
+
+
+def _run_inline(worker, file_path):
+    try:
+        return file_path, worker(file_path), None
+    except Exception as e:
+        return file_path, None, e
+
+
+def analyze_files_parallel(files, result_queue, max_workers=None, worker=summarize_file):
+    """파일마다 worker(기본 summarize_file)를 프로세스 풀에서 실행
+
+    끝나는 순서대로 (파일, 결과, 오류)를 result_queue에 넣는다. 한 파일이
+    실패해도 나머지는 계속 처리되며, 오류는 예외 객체로 전달된다.
+    GUI는 root.after로 큐를 확인하면 되고 메인 스레드는 막히지 않는다.
+    바뀌지 않아 캐시에 있는 파일은 풀을 거치지 않고 바로 큐에 넣는다.
+    모든 파일이 캐시에 있으면 풀을 만들지 않고 None을 돌려준다.
+    """
+    cached, pending = _split_cached(files, worker)
+    for file_path in cached:
+        result_queue.put(_run_inline(worker, file_path))
+    if not pending:
+        return None
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def report(file_path, future):
+        try:
+            result_queue.put((file_path, future.result(), None))
+        except Exception as e:
+            result_queue.put((file_path, None, e))
+
+    for file_path in pending:
+        future = executor.submit(worker, file_path)
+        future.add_done_callback(partial(report, file_path))
+    executor.shutdown(wait=False)
+    return executor
+
+
+def imap_files(files, worker=summarize_file, max_workers=None):
+    """파일마다 worker를 프로세스 풀에서 실행하고 끝나는 순서대로 (파일, 결과, 오류)를 내준다.
+
+    작업 스레드에서 쓰는 용도. 캐시에 있는 파일은 먼저 바로 처리하고, 나머지가
+    있을 때만 풀을 만든다. 중간에 반복을 멈추면(close) 아직 시작하지 않은
+    파일은 취소된다.
+    """
+    cached, pending = _split_cached(files, worker)
+    for file_path in cached:
+        yield _run_inline(worker, file_path)
+    if not pending:
+        return
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(worker, file_path): file_path for file_path in pending}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is None:
+                yield futures[future], future.result(), None
+            else:
+                yield futures[future], None, error
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def files_task(task, files, worker=summarize_file, max_workers=None):
+    """BackgroundRunner 작업 함수: 파일마다 (파일, 결과, 오류)를 task.report로 보낸다."""
+    with closing(imap_files(files, worker, max_workers)) as results:
+        for done, result in enumerate(results, 1):
+            task.check()
+            task.report(done, len(files), result)
@@ -0,0 +1,131 @@
+"""실행 시간/횟수 계측 (기본은 꺼져 있음)
+
+    @instrument.span("ingest.extract")
+    def extract_draws(...): ...
+
+    if instrument.enabled:
+        instrument.count("draw.retries", retries)
+
+꺼져 있을 때 span은 플래그 하나만 확인하고 원래 함수를 부르며, count는
+호출하는 쪽에서 instrument.enabled를 먼저 확인한다. 켜는 방법은
+enable() 또는 환경 변수 PICK_LOTTO_INSTRUMENT=1. 프로세스 풀 작업자 안에서
+잰 값은 각 작업자 프로세스에만 쌓이고 부모 프로세스 통계에는 합쳐지지 않는다.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+enabled = os.environ.get("PICK_LOTTO_INSTRUMENT", "") not in ("", "0")
+
+_lock = threading.Lock()
+_spans = {}     # 이름 → [호출 수, 총 시간, 최대 시간]
+_counters = {}  # 이름 → 누적 값
+_gauges = {}    # 이름 → 현재 값을 돌려주는 함수 (이미 다른 곳에서 세는 값)
+_started = time.perf_counter()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    """모은 값을 모두 지운다 (게이지 등록은 유지)"""
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+
+def record(name, seconds, calls=1):
+    """이름별 시간 누적 (span 대신 직접 잰 구간을 넣을 때)"""
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None:
+            _spans[name] = [calls, seconds, seconds / calls]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds / calls)
+
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def gauge(name, func):
+    """func()가 돌려주는 값을 통계에 함께 보여 준다 (호출 경로에 비용 없음)"""
+    _gauges[name] = func
+
+
+def span(name):
+    """함수 실행 시간을 name으로 누적하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """현재까지의 통계 {'elapsed', 'enabled', 'spans': {이름: {...}}, 'counters': {...}}"""
+    with _lock:
+        spans = {name: list(entry) for name, entry in _spans.items()}
+        counters = dict(_counters)
+    for name, func in _gauges.items():
+        try:
+            counters[name] = func()
+        except Exception:
+            continue
+    return {
+        "elapsed": time.perf_counter() - _started,
+        "enabled": enabled,
+        "spans": {
+            name: {"calls": calls, "total_ms": total * 1e3, "mean_us": total / calls * 1e6, "max_ms": worst * 1e3}
+            for name, (calls, total, worst) in sorted(spans.items())
+        },
+        "counters": dict(sorted(counters.items())),
+    }
+
+
+def dump(path):
+    """snapshot()을 JSON 파일로 저장"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+
+
+def table_rows():
+    """통계 표시용 (구분, 이름, 횟수/값, 총 ms, 평균 us, 최대 ms) 행 목록"""
+    data = snapshot()
+    rows = []
+    for name, s in data["spans"].items():
+        rows.append(("구간", name, s["calls"], round(s["total_ms"], 3), round(s["mean_us"], 2), round(s["max_ms"], 3)))
+    for name, value in data["counters"].items():
+        rows.append(("카운터", name, value, 0.0, 0.0, 0.0))
+    return rows
+
+
+def profile_call(func, path=None, top=25):
+    """func()를 cProfile로 감싸 실행. path가 있으면 pstats 파일로 저장하고, 상위 top개를 표준 오류에 출력."""
+    import cProfile
+    import pstats
+    import sys
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        if path:
+            profiler.dump_stats(path)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(top)
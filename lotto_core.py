@@ -0,0 +1,254 @@
+# GUI 없이 쓸 수 있는 핵심 기능 (tkinter는 가져오지 않고, pandas는 파일을 읽을 때만 가져온다)
+import os
+import random
+import bisect
+import datetime
+import time
+import numpy as np
+import gof_monitor
+import instrument
+from entropy import hardware_pool
+from rng import RandomStream, SEEDED_METHODS
+from freq_store import FrequencyStore, get_data_dir, get_store_filename
+from draw_db import DrawDatabase, get_db_filename
+from weighting import RoundWeights, MODE_ALL
+
+@instrument.span("lotto.extract_numbers_from_file")
+def extract_numbers_from_file(file_path):
+    from ingest import extract_draws
+
+    # 표 전체를 NumPy 배열로 한 번에 처리 (당첨번호 (n, 6), 보너스 (n,), 최신 회차)
+    return extract_draws(file_path)
+
+@instrument.span("lotto.calculate_frequencies")
+def calculate_frequencies(all_numbers, all_bonus):
+    normal_freq = np.bincount(np.asarray(all_numbers, dtype=np.intp).ravel(), minlength=46)[1:46]
+    bonus_freq = np.bincount(np.asarray(all_bonus, dtype=np.intp).ravel(), minlength=46)[1:46]
+
+    # 이제 두 개 리스트 모두 리턴
+    return normal_freq.tolist(), bonus_freq.tolist()
+
+def get_hidden_filename():
+    # 이전 버전의 JSON 빈도수 파일 (이진 저장소로 옮기기 전)
+    base_dir = get_data_dir()
+    filename = "frequencies.json" if os.name == 'nt' else ".frequencies.json"
+    return os.path.join(base_dir, filename)
+
+def get_frequency_store():
+    global _frequency_store
+    if _frequency_store is None:
+        # 기존 JSON 파일이 있으면 처음 읽을 때 이진 저장소로 옮긴다
+        _frequency_store = FrequencyStore(get_store_filename(), legacy_json_path=get_hidden_filename())
+    return _frequency_store
+
+_frequency_store = None
+
+def get_draw_database():
+    global _draw_database
+    if _draw_database is None:
+        # 회차별 당첨번호를 저장하고, 회차가 추가/삭제될 때 빈도수 저장소도 함께 갱신
+        _draw_database = DrawDatabase(get_db_filename(), store=get_frequency_store())
+    return _draw_database
+
+_draw_database = None
+
+def get_round_weights():
+    global _round_weights
+    # 회차별 누적 행렬은 한 번만 만들고, 이후에는 새로 추가된 회차만 반영
+    if _round_weights is None:
+        _round_weights = RoundWeights.from_database(get_draw_database())
+    else:
+        _round_weights = _round_weights.sync(get_draw_database())
+    return _round_weights
+
+_round_weights = None
+
+def get_cooccurrence_stats():
+    """회차 DB 기준 번호 쌍/세 개 조합/간격 통계
+
+    캐시 파일에서 읽은 뒤 새로 추가된 회차만 반영하고, 바뀐 경우에만 다시 저장한다.
+    """
+    global _cooccurrence_stats
+    from cooccur import CooccurrenceStats, get_cooccur_filename
+
+    path = get_cooccur_filename()
+    if _cooccurrence_stats is None:
+        _cooccurrence_stats = CooccurrenceStats.load(path) or CooccurrenceStats()
+    cached = _cooccurrence_stats
+    before = (cached.count, cached.last_round, cached.deletions)
+    stats = cached.sync(get_draw_database())
+    changed = stats is not cached or (stats.count, stats.last_round, stats.deletions) != before
+    if changed or not os.path.exists(path):
+        stats.save(path)
+    _cooccurrence_stats = stats
+    return stats
+
+_cooccurrence_stats = None
+
+def get_combo_index():
+    """모든 조합의 번호/특징 색인 (처음 한 번만 만들어 저장하고 이후에는 mmap으로 연다)"""
+    global _combo_index
+    from combo_index import ComboIndex
+
+    if _combo_index is None:
+        _combo_index = ComboIndex.open()
+    return _combo_index
+
+_combo_index = None
+
+def get_combo_probabilities(weights, on_chunk=None):
+    """weights로 추첨할 때 모든 조합의 정확한 확률 표 (가중치 비율별로 저장해 두고 재사용)"""
+    global _combo_probabilities
+    from combo_prob import get_probabilities, table_key
+
+    if _combo_probabilities is None or _combo_probabilities.key != table_key(weights):
+        _combo_probabilities = get_probabilities(weights, get_combo_index(), on_chunk)
+    return _combo_probabilities
+
+_combo_probabilities = None
+
+@instrument.span("lotto.save_frequencies")
+def save_frequencies(normal_freq, bonus_freq, latest_round):
+    get_frequency_store().write(normal_freq, bonus_freq, latest_round)
+
+@instrument.span("lotto.load_frequencies")
+def load_frequencies():
+    # mmap으로 매핑된 읽기 전용 배열을 돌려주므로 JSON 파싱 비용이 없다
+    return get_frequency_store().read()
+
+@instrument.span("lotto.get_weights")
+def get_weights(mode=MODE_ALL, n=None, include_bonus=True):
+    """추첨에 쓸 (45개 가중치, 최신 회차). 데이터가 없으면 ValueError."""
+    if mode == MODE_ALL:
+        normal_freq, bonus_freq, latest_round = load_frequencies()
+        if normal_freq is None:
+            raise ValueError("빈도수 파일이 없습니다. 먼저 분석을 수행하세요.")
+        freqs = normal_freq + bonus_freq if include_bonus else normal_freq
+        return freqs, latest_round
+
+    if n is None or n <= 0:
+        raise ValueError("회차 수는 1 이상의 정수로 입력하세요.")
+    # 최근 N회 / 지수 감쇠 가중치는 회차별 누적 행렬에서 바로 계산 (파일을 다시 읽지 않음)
+    weights = get_round_weights()
+    if not weights.count:
+        raise ValueError("저장된 회차가 없습니다. 먼저 Excel 분석을 수행하세요.")
+    return weights.weights(mode, n, include_bonus), weights.last_round
+
+def ingest_files(files, on_progress=None):
+    """Excel 파일들을 병렬로 읽어 회차 DB에 추가. (추가된 회차 수, [(파일, 오류)])"""
+    import queue
+    from ingest import analyze_files_parallel, extract_round_records
+
+    db = get_draw_database()
+    first_import = db.count() == 0
+    result_queue = queue.Queue()
+    analyze_files_parallel(files, result_queue, worker=extract_round_records)
+
+    added = 0
+    errors = []
+    for done in range(1, len(files) + 1):
+        file, records, error = result_queue.get()
+        if error is None:
+            added += db.add_draws(*records, source=os.path.basename(file))
+        else:
+            errors.append((file, error))
+        if on_progress is not None:
+            on_progress(done, len(files), file, error)
+
+    # 처음 가져올 때는 이전 JSON 누적값 대신 가져온 회차로 빈도수를 다시 맞춘다
+    if first_import and len(errors) < len(files):
+        db.rebuild_store()
+    return added, errors
+
+def get_simulation_history(include_bonus=True):
+    """저장된 회차로 만든 시뮬레이션 입력 (회차별 직전 가중치, 당첨번호 마스크, 보너스 마스크)"""
+    from simulate import build_history
+
+    db = get_draw_database()
+    if not db.count():
+        raise ValueError("저장된 회차가 없습니다. 먼저 Excel 분석을 수행하세요.")
+    return build_history(*db.all_draws(), include_bonus=include_bonus)
+
+def simulate_history(tickets_per_round, seed=0, include_bonus=True, max_workers=None, on_progress=None):
+    """저장된 회차마다 가중치/균등 티켓을 만들어 채점. ({방식: 등수별 장수}, {방식: 티켓 수})"""
+    import queue
+    from simulate import run_simulation
+
+    history = get_simulation_history(include_bonus)
+    result_queue = queue.Queue()
+    executor, total = run_simulation(history, result_queue, tickets_per_round, seed, max_workers=max_workers)
+
+    counts = {}
+    tickets = {}
+    for done in range(1, total + 1):
+        strategy, n, result, error = result_queue.get()
+        if error is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise error
+        counts[strategy] = counts.get(strategy, 0) + result
+        tickets[strategy] = tickets.get(strategy, 0) + n
+        if on_progress is not None:
+            on_progress(done, total, sum(tickets.values()))
+    return counts, tickets
+
+def get_hardware_random_float():
+    # 공마다 OS 난수를 호출하지 않고 미리 읽어 둔 풀에서 꺼낸다
+    return hardware_pool.random_float()
+
+@instrument.span("lotto.build_weighted_table")
+def build_weighted_table(weights):
+    cumulative = []
+    total = 0
+    for w in weights:
+        total += w
+        cumulative.append(total)
+    return cumulative, total
+
+def weighted_choice(cumulative_weights, total_weight, method='hardware', rng=None):
+    if rng is not None:
+        # 시드를 지정한 난수열 (RandomStream 등)
+        r = rng.random() * total_weight
+    elif method == 'pseudo':
+        r = random.uniform(0, total_weight)
+    else:
+        r = get_hardware_random_float() * total_weight
+    return bisect.bisect_left(cumulative_weights, r) + 1
+
+def get_weighted_unique_numbers(frequencies, method='hardware', rng=None):
+    if rng is None and method in SEEDED_METHODS:
+        rng = RandomStream(method)
+    cumulative_weights, total_weight = build_weighted_table(frequencies)
+    numbers = set()
+    if instrument.enabled:
+        # 공마다 감싸면 꺼져 있을 때도 비용이 생기므로 반복 전체를 재서 호출 수로 나눠 기록
+        draws = 0
+        start = time.perf_counter()
+        while len(numbers) < 6:
+            numbers.add(weighted_choice(cumulative_weights, total_weight, method, rng))
+            draws += 1
+        instrument.record("lotto.weighted_choice", time.perf_counter() - start, draws)
+        instrument.count("rng.draws", draws)
+        instrument.count("draw.retries", draws - 6)
+    else:
+        while len(numbers) < 6:
+            num = weighted_choice(cumulative_weights, total_weight, method, rng)
+            numbers.add(num)
+    result = sorted(numbers)
+    if gof_monitor.enabled:
+        gof_monitor.observe_one(frequencies, result)
+    return result
+
+def get_freq_file_age_text():
+    store = get_frequency_store()
+    if not store.exists():
+        return "빈도수 파일 없음", "red"
+    filename = store.path
+
+    last_modified = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
+    days_ago = (datetime.datetime.now() - last_modified).days
+    days_ago = max(days_ago, 0)  # 음수 방지
+
+    if days_ago >= 30:
+        return f"빈도수 파일이 오래되었습니다 ({days_ago}일 전)", "red"
+    else:
+        return f"빈도수 최신화: {days_ago}일 전", "green"
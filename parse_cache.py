@@ -0,0 +1,196 @@
+import hashlib
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+import numpy as np
+import instrument
+from freq_store import get_data_dir
+
+# 결과 파일 형식: 헤더 + 당첨번호 (n, 6) uint8 + 보너스 (n,) uint8 + 회차 (n,) int64 (little-endian)
+MAGIC = b"PLPC"
+# 파일 형식이나 Excel 해석 규칙이 바뀌면 올린다 (내용 해시에 섞여 이전 결과는 쓰지 않게 된다)
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sIIq")  # 매직, 형식 버전, 행 수, 최신 회차
+
+# 캐시 폴더 전체 크기 상한. 넘으면 가장 오래 쓰지 않은 항목부터 지운다.
+CACHE_LIMIT = 64 << 20
+# 한 프로세스 안에서 최근 읽은 결과를 기억해 두는 개수
+MEMORY_ENTRIES = 64
+# 내용 해시를 계산할 때 한 번에 읽는 크기
+HASH_BLOCK = 1 << 20
+# 해석 방식 이름 (ingest: pandas / streaming). 방식마다 결과를 따로 저장한다.
+DEFAULT_PARSER = "pandas"
+
+_memory = OrderedDict()
+
+
+def get_cache_dir():
+    dirname = "parse_cache" if os.name == 'nt' else ".parse_cache"
+    path = os.path.join(get_data_dir(), dirname)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _stat_key(file_path, parser):
+    """(경로, 크기, 수정 시각, 해석 방식) → 포인터 파일 이름. 하나라도 바뀌면 다른 이름이 된다."""
+    st = os.stat(file_path)
+    text = f"{os.path.normcase(os.path.abspath(file_path))}\0{st.st_size}\0{st.st_mtime_ns}\0{parser}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def content_hash(file_path, parser=DEFAULT_PARSER):
+    """파일 내용 + FORMAT_VERSION + 해석 방식의 blake2b 해시 (결과 파일 이름)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struct.pack("<I", FORMAT_VERSION))
+    digest.update(parser.encode("ascii") + b"\0")
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    # 같은 프로세스의 두 스레드(폴더 감시, GUI)가 같은 파일을 동시에 저장해도 겹치지 않도록 mkstemp
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _touch(path):
+    """LRU 순서를 위해 수정 시각을 지금으로 (다른 프로세스가 지웠으면 무시)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _encode(numbers, bonus, rounds, latest_round):
+    return b"".join([
+        HEADER.pack(MAGIC, FORMAT_VERSION, len(numbers), latest_round),
+        np.ascontiguousarray(numbers, dtype=np.uint8).tobytes(),
+        np.ascontiguousarray(bonus, dtype=np.uint8).tobytes(),
+        np.ascontiguousarray(rounds, dtype="<i8").tobytes(),
+    ])
+
+
+def _decode(data):
+    magic, version, count, latest_round = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or len(data) != HEADER.size + count * 15:
+        raise ValueError("손상된 캐시 파일입니다.")
+    offset = HEADER.size
+    numbers = np.frombuffer(data, np.uint8, count * 6, offset).reshape(count, 6)
+    bonus = np.frombuffer(data, np.uint8, count, offset + count * 6)
+    rounds = np.frombuffer(data, "<i8", count, offset + count * 7).astype(np.int64)
+    return numbers, bonus, rounds, latest_round
+
+
+def _remember(key, result):
+    _memory[key] = result
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def lookup(file_path, parser=DEFAULT_PARSER):
+    """파일이 바뀌지 않았으면 parser로 해석해 저장된 (당첨번호, 보너스, 행별 회차, 최신 회차), 아니면 None
+
+    경로/크기/수정 시각이 같으면 파일을 다시 읽지 않는다. 배열은 여러 호출이
+    함께 쓰므로 읽기 전용이다.
+    """
+    try:
+        key = _stat_key(file_path, parser)
+    except OSError:
+        return None
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+
+    cache_dir = get_cache_dir()
+    pointer = os.path.join(cache_dir, key + ".key")
+    try:
+        with open(pointer, "r", encoding="ascii") as f:
+            digest = f.read().strip()
+        with open(os.path.join(cache_dir, digest + ".bin"), "rb") as f:
+            result = _decode(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+    _touch(pointer)
+    _touch(os.path.join(cache_dir, digest + ".bin"))
+    _remember(key, result)
+    return result
+
+
+def cached_parse(file_path, parse, parser=DEFAULT_PARSER):
+    """parse(file_path) 결과를 캐시. parse는 (당첨번호, 보너스, 행별 회차, 최신 회차)를 돌려준다.
+
+    parser는 parse의 해석 방식 이름으로, 다른 방식이 저장한 결과는 쓰지 않는다.
+
+    경로/크기/수정 시각이 바뀐 파일은 내용 해시를 다시 계산하고, 내용까지
+    바뀌었을 때만 다시 해석한다 (같은 내용을 복사하거나 저장만 다시 한 파일은 재사용).
+    """
+    result = lookup(file_path, parser)
+    if result is not None:
+        if instrument.enabled:
+            instrument.count("ingest.cache_hits")
+        return result
+    if instrument.enabled:
+        instrument.count("ingest.cache_misses")
+
+    key = _stat_key(file_path, parser)
+    cache_dir = get_cache_dir()
+    digest = content_hash(file_path, parser)
+    sidecar = os.path.join(cache_dir, digest + ".bin")
+    try:
+        with open(sidecar, "rb") as f:
+            result = _decode(f.read())
+        _touch(sidecar)
+    except (OSError, ValueError, struct.error):
+        data = _encode(*parse(file_path))
+        _write_atomic(sidecar, data)
+        result = _decode(data)
+    _write_atomic(os.path.join(cache_dir, key + ".key"), digest.encode("ascii"))
+    _remember(key, result)
+    evict(cache_dir)
+    return result
+
+
+def evict(cache_dir=None, limit=CACHE_LIMIT):
+    """캐시 폴더가 limit 바이트를 넘으면 오래 쓰지 않은 파일부터 지운다. 지운 파일 수를 돌려준다."""
+    cache_dir = cache_dir or get_cache_dir()
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith((".bin", ".key")):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # 다른 프로세스가 먼저 지웠거나 사용 중
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear():
+    """캐시 전체 삭제 (메모리 포함)"""
+    _memory.clear()
+    return evict(limit=0)
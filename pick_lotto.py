@@ -0,0 +1,415 @@
+"""로또 번호 추첨기 명령줄 도구 (GUI 없이 사용)
+
+    python -m pick_lotto ingest 2023.xlsx 2024.xlsx
+    python -m pick_lotto stats --mode window -n 100
+    python -m pick_lotto generate --count 100000 --method hardware --format npy -o tickets.npy
+    python -m pick_lotto generate --count 1000000 --unique --format rank -o ranks.npy
+    python -m pick_lotto generate --count 10000000 --method philox --seed 7 --workers 8 --format npy -o t.npy
+    python -m pick_lotto generate --count 100000 --sum 100:170 --odd 3 --max-run 2 --exclude 1,2,3
+    python -m pick_lotto generate --count 1000000 --exact --format npy -o exact.npy
+    python -m pick_lotto probabilities --top 20
+    python -m pick_lotto wheel --pool 1-20 --tickets 50 --cover triples --weighted
+    python -m pick_lotto wheel --pool 3,7,11,15,19,23,27,31,35,39 --tickets 5 --guarantee 4:3
+    python -m pick_lotto export rounds -o rounds.parquet
+    python -m pick_lotto simulate --tickets 1000000 --seed 1
+    python -m pick_lotto serve --port 8645
+    python -m pick_lotto watch /srv/lotto/inbox
+    python -m pick_lotto --monitor generate --count 10000000 --method hardware --format npy -o t.npy
+"""
+import argparse
+import os
+import sys
+
+# 추첨 결과를 한 번에 만들어 내보내는 묶음 크기
+GENERATE_BLOCK = 65536
+
+
+def cmd_ingest(args):
+    from lotto_core import ingest_files
+
+    def progress(done, total, file, error):
+        status = f"실패 - {error}" if error else "완료"
+        print(f"[{done}/{total}] {os.path.basename(file)}: {status}", file=sys.stderr)
+
+    added, errors = ingest_files(args.files, on_progress=progress)
+    print(f"새 회차 {added}개 추가")
+    return 1 if errors else 0
+
+
+def cmd_stats(args):
+    from lotto_core import load_frequencies, get_weights
+
+    normal_freq, bonus_freq, latest_round = load_frequencies()
+    if normal_freq is None:
+        print("빈도수 파일이 없습니다. 먼저 ingest를 실행하세요.", file=sys.stderr)
+        return 1
+    weights, _ = get_weights(args.mode, args.n, not args.no_bonus)
+
+    print(f"# 최신 회차: {latest_round}")
+    print("number,normal,bonus,weight")
+    for i in range(45):
+        print(f"{i + 1},{normal_freq[i]},{bonus_freq[i]},{weights[i]:g}")
+    return 0
+
+
+def parse_range(text):
+    """'100:170' → (100, 170), '3' → (3, 3)"""
+    low, _, high = text.partition(":")
+    try:
+        return int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"범위는 '하한:상한' 또는 정수로 입력하세요: {text}")
+
+
+def parse_numbers(text):
+    """'1,2,3' → (1, 2, 3), '1-5,9' → (1, 2, 3, 4, 5, 9)"""
+    from wheel import parse_pool
+
+    try:
+        return parse_pool(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"번호는 쉼표로 구분해 입력하세요: {text}")
+
+
+def get_constraints(args):
+    """generate 조건 옵션 → ComboIndex.mask 인자 (지정한 것만)"""
+    constraints = {
+        "sum": args.sum,
+        "odd": args.odd,
+        "run": (1, args.max_run) if args.max_run is not None else None,
+        "decades": args.decades,
+        "exclude": args.exclude,
+        "include": args.include,
+    }
+    return {name: value for name, value in constraints.items() if value}
+
+
+def cmd_generate(args):
+    from export import FORMAT_PARQUET, TICKET_COLUMNS, export_table, format_throughput
+    from lotto_core import get_weights
+    from rng import SEEDED_METHODS, make_generator, new_seed
+    from sampler import WeightedTable
+    from tickets import TicketSet, generate_unique_tickets, iter_ticket_blocks, rank_numbers, unrank
+
+    seed = args.seed
+    if args.method in SEEDED_METHODS and seed is None:
+        # 시드를 주지 않으면 새로 만들고, 같은 결과를 다시 만들 수 있도록 알려 준다
+        seed = new_seed()
+        print(f"시드: {seed}", file=sys.stderr)
+    elif args.method not in SEEDED_METHODS and seed is not None:
+        raise ValueError("--seed는 pcg64/philox 방식에서만 쓸 수 있습니다.")
+    if args.format == FORMAT_PARQUET and not args.output:
+        raise ValueError("parquet 형식은 -o로 출력 파일을 지정해야 합니다.")
+
+    weights, _ = get_weights(args.mode, args.n, not args.no_bonus)
+    table = WeightedTable(weights)
+    constraints = get_constraints(args)
+    if constraints or args.exact:
+        # 조건이 있으면 전체 조합 색인에서 조건을 만족하는 조합만 남겨 바로 뽑는다 (한 프로세스)
+        from lotto_core import get_combo_index, get_combo_probabilities
+
+        index = get_combo_index()
+        exact = get_combo_probabilities(weights) if args.exact else None
+        seen = TicketSet() if args.unique else None
+        rng = make_generator(args.method, seed) if args.method in SEEDED_METHODS else None
+        sizes = [min(GENERATE_BLOCK, args.count - start) for start in range(0, args.count, GENERATE_BLOCK)]
+        if exact is not None and not constraints and not args.unique:
+            # 조건이 없으면 확률 표의 누적 확률에서 바로 찾는다
+            ranks_blocks = (exact.sample(size, args.method, rng) for size in sizes)
+        else:
+            ranks_blocks = (index.sample(weights, size, args.method, rng, args.unique, seen, exact, **constraints)
+                            for size in sizes)
+        if args.format == "rank":
+            blocks = ranks_blocks
+        else:
+            blocks = (index.tickets(ranks) for ranks in ranks_blocks)
+    elif args.unique:
+        # 전체 출력에서 같은 조합이 두 번 나오지 않도록 비트셋 하나를 공유 (한 프로세스에서 순서대로 생성)
+        seen = TicketSet()
+        rng = make_generator(args.method, seed) if args.method in SEEDED_METHODS else None
+        sizes = [min(GENERATE_BLOCK, args.count - start) for start in range(0, args.count, GENERATE_BLOCK)]
+        ranks_blocks = (generate_unique_tickets(table, size, args.method, rng=rng, seen=seen) for size in sizes)
+        if args.format == "rank":
+            blocks = ranks_blocks
+        else:
+            blocks = (unrank(ranks) for ranks in ranks_blocks)
+    else:
+        ticket_blocks = iter_ticket_blocks(table, args.count, args.method, seed, GENERATE_BLOCK, args.workers)
+        if args.format == "rank":
+            blocks = (rank_numbers(block) for block in ticket_blocks)
+        else:
+            blocks = ticket_blocks
+
+    # 전체를 메모리에 만들지 않고 묶음 단위로 생성해서 바로 내보낸다
+    fmt = "npy" if args.format == "rank" else args.format
+    columns = ("rank",) if args.format == "rank" else TICKET_COLUMNS
+    rows, seconds = export_table(args.output, fmt, columns, blocks, count=args.count, header=False)
+    if args.output:
+        print(format_throughput(rows, seconds), file=sys.stderr)
+    return 0
+
+
+def cmd_probabilities(args):
+    from lotto_core import get_combo_probabilities, get_weights
+    from tickets import unrank
+
+    weights, latest_round = get_weights(args.mode, args.n, not args.no_bonus)
+
+    shown = []
+
+    def progress(done, total):
+        percent = done * 100 // total
+        if not shown or shown[-1] != percent:
+            shown.append(percent)
+            print(f"\r조합 확률 계산 중 {percent}%", end="", file=sys.stderr, flush=True)
+
+    table = get_combo_probabilities(weights, on_chunk=progress)
+    if shown:
+        print(file=sys.stderr)
+    print(f"# 최신 회차: {latest_round}, 균등 추첨 시 조합당 확률 {1 / len(table.cdf):.6e}")
+    print("number,inclusion")
+    for i, p in enumerate(table.inclusion, 1):
+        print(f"{i},{p:.6f}")
+    if args.top:
+        print("rank,combination,probability")
+        ranks, probabilities = table.most_likely(args.top)
+        for rank, numbers, p in zip(ranks, unrank(ranks), probabilities):
+            print(f"{rank},{' '.join(map(str, numbers))},{p:.6e}")
+    return 0
+
+
+def cmd_wheel(args):
+    import numpy as np
+    from export import TICKET_COLUMNS, export_table
+    from lotto_core import get_weights
+    from rng import make_generator
+    from sampler import generate_tickets
+    from tickets import number_masks
+    from wheel import build_wheel, coverage_stats, format_stats
+
+    t, m = args.guarantee if args.guarantee else ({"pairs": 2, "triples": 3}[args.cover], None)
+    pool = args.pool or tuple(range(1, 46))
+    weights = None
+    if args.weighted or args.baseline:
+        weights, _ = get_weights(args.mode, args.n, not args.no_bonus)
+    tickets, stats = build_wheel(pool, args.tickets, t, m, weights if args.weighted else None,
+                                 args.iterations, args.restarts, args.seed, args.workers)
+    export_table(args.output, "csv", TICKET_COLUMNS, [tickets], header=False)
+    print(f"휠: {format_stats(stats, t, m)}", file=sys.stderr)
+    if args.baseline:
+        # 같은 장수를 풀 안에서 가중치대로 따로따로 뽑았을 때와 비교
+        members = np.array(sorted(set(pool))) - 1
+        pooled = np.zeros(45)
+        pooled[members] = np.asarray(weights, dtype=np.float64)[members]
+        independent = generate_tickets(pooled, args.tickets, "pcg64", rng=make_generator("pcg64", args.seed))
+        baseline = coverage_stats(number_masks(independent), pool, t, m, weights if args.weighted else None)
+        print(f"독립 추첨: {format_stats(baseline, t, m)}", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args):
+    import export
+    from lotto_core import get_cooccurrence_stats, get_draw_database, load_frequencies
+
+    fmt = args.format or export.format_for_path(args.output)
+    if fmt == export.FORMAT_TEXT:
+        raise ValueError("txt 보고서는 분석기(analyze.py)에서 저장합니다. csv/parquet/npy를 쓰세요.")
+    if args.table == "frequencies":
+        normal_freq, bonus_freq, _ = load_frequencies()
+        if normal_freq is None:
+            raise ValueError("빈도수 파일이 없습니다. 먼저 ingest를 실행하세요.")
+        columns, chunks = export.FREQUENCY_COLUMNS, export.frequency_chunks(normal_freq, bonus_freq)
+    elif args.table == "pairs":
+        columns, chunks = export.PAIR_COLUMNS, export.pair_chunks(get_cooccurrence_stats().pairs)
+    else:
+        columns, chunks = export.ROUND_COLUMNS, export.round_chunks(get_draw_database())
+    rows, seconds = export.export_table(args.output, fmt, columns, chunks)
+    print(export.format_throughput(rows, seconds), file=sys.stderr)
+    return 0
+
+
+def cmd_simulate(args):
+    import time
+    from lotto_core import simulate_history
+    from simulate import format_eta, format_results
+
+    started = time.perf_counter()
+
+    def progress(done, total, tickets):
+        elapsed = time.perf_counter() - started
+        eta = elapsed / done * (total - done)
+        print(f"\r[{done}/{total}] {tickets / elapsed:,.0f}장/초, 남은 시간 {format_eta(eta)}   ",
+              end="", file=sys.stderr, flush=True)
+
+    counts, tickets = simulate_history(args.tickets, args.seed, not args.no_bonus, args.workers, progress)
+    print(file=sys.stderr)
+    for row in format_results(counts, tickets):
+        print(",".join(row))
+    return 0
+
+
+def cmd_serve(args):
+    import asyncio
+    from server import serve
+
+    def ready(port):
+        print(f"http://{args.host}:{port} 에서 대기 중 (Ctrl+C로 종료)", file=sys.stderr, flush=True)
+
+    if args.watch:
+        from watcher import FolderWatcher, format_result
+
+        # 저장소 일련번호가 바뀌면 서비스가 TABLE_TTL 안에 추첨 표를 다시 만든다
+        FolderWatcher(args.watch, on_ingest=lambda result: print(format_result(result), file=sys.stderr, flush=True)).start()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_watch(args):
+    from watcher import FolderWatcher, format_result
+
+    def report(result):
+        print(format_result(result), file=sys.stderr, flush=True)
+
+    watcher = FolderWatcher(args.directory, on_ingest=report, use_inotify=not args.poll)
+    print(f"{args.directory} 감시 중 (Ctrl+C로 종료)", file=sys.stderr, flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pick_lotto", description="로또 번호 분석 및 추첨기")
+    parser.add_argument("--data-dir", help="빈도수/회차 데이터 폴더 (기본: /rand_a 또는 C:\\rand_a)")
+    parser.add_argument("--metrics", metavar="JSON", help="계측을 켜고 끝날 때 결과를 JSON으로 저장")
+    parser.add_argument("--profile", metavar="PROF", help="cProfile로 실행해 결과를 저장하고 상위 함수를 표준 오류에 출력")
+    parser.add_argument("--monitor", action="store_true",
+                        help="추첨 결과 분포를 정확한 확률과 비교해 벗어나면 경고하고 끝날 때 검정 결과 출력")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="Excel 파일의 회차를 저장소에 추가")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_ingest)
+
+    def add_weight_options(p):
+        p.add_argument("--mode", choices=["all", "window", "decay"], default="all",
+                       help="가중치 방식: 전체 / 최근 N회 / 감쇠(반감기 N회)")
+        p.add_argument("-n", type=int, default=100, help="최근 회차 수 또는 반감기 (기본 100)")
+        p.add_argument("--no-bonus", action="store_true", help="보너스 번호 빈도 제외")
+
+    p = sub.add_parser("stats", help="번호별 빈도수와 가중치 출력")
+    add_weight_options(p)
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("generate", help="번호 조합 생성")
+    p.add_argument("--count", type=int, default=1)
+    p.add_argument("--method", choices=["hardware", "pseudo", "pcg64", "philox"], default="hardware",
+                   help="pcg64/philox는 --seed로 같은 결과를 다시 만들 수 있음")
+    p.add_argument("--seed", type=int, help="pcg64/philox 시드 (생략하면 새로 만들어 표준 오류에 출력)")
+    p.add_argument("--workers", type=int, default=1, help="생성 프로세스 수 (--unique가 아닐 때)")
+    p.add_argument("--format", choices=["csv", "npy", "rank", "parquet"], default="csv",
+                   help="csv / npy (n, 6) 번호 / rank (n,) 조합 순위 uint32 .npy / parquet (pyarrow 필요)")
+    p.add_argument("--unique", action="store_true", help="같은 조합을 두 번 내보내지 않음")
+    p.add_argument("-o", "--output", help="출력 파일 (기본: 표준 출력)")
+    p.add_argument("--sum", type=parse_range, metavar="MIN:MAX", help="번호 합계 범위 (조건을 주면 번호 가중치의 곱으로 추첨)")
+    p.add_argument("--odd", type=parse_range, metavar="MIN:MAX", help="홀수 개수 (예: 3 또는 2:4)")
+    p.add_argument("--max-run", type=int, metavar="N", help="연속 번호는 최대 N개까지")
+    p.add_argument("--decades", type=parse_range, metavar="MIN:MAX", help="번호대(1~9, 10~19, …, 40~45) 수")
+    p.add_argument("--exclude", type=parse_numbers, metavar="1,2,3", help="제외할 번호")
+    p.add_argument("--include", type=parse_numbers, metavar="7,8", help="반드시 포함할 번호")
+    p.add_argument("--exact", action="store_true",
+                   help="정확한 조합 확률 표로 추첨 (GUI 추첨과 같은 분포, 가중치가 바뀌면 처음 한 번 수 초)")
+    add_weight_options(p)
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("probabilities", help="번호별 포함 확률과 확률이 가장 큰 조합 (정확한 값)")
+    p.add_argument("--top", type=int, default=10, help="출력할 조합 수 (0이면 생략)")
+    add_weight_options(p)
+    p.set_defaults(func=cmd_probabilities)
+
+    p = sub.add_parser("wheel", help="여러 장을 함께 골라 번호 쌍/세 개 조합을 최대한 덮기 (또는 최소 적중 보장)")
+    p.add_argument("--tickets", type=int, default=10, help="티켓 수")
+    p.add_argument("--pool", type=parse_numbers, metavar="1-20", help="쓸 번호 (기본: 1~45 전체)")
+    p.add_argument("--cover", choices=["pairs", "triples"], default="pairs", help="덮을 대상")
+    p.add_argument("--guarantee", type=parse_range, metavar="T:M",
+                   help="풀에서 T개가 나오면 어느 한 장은 M개 이상 맞도록 (--cover 대신)")
+    p.add_argument("--weighted", action="store_true", help="번호 쌍/조합을 빈도 가중치의 곱으로 중요도 부여")
+    p.add_argument("--baseline", action="store_true", help="같은 장수를 따로따로 뽑았을 때의 덮음 비율도 출력")
+    p.add_argument("--iterations", type=int, default=20000, help="재시작 하나의 교체 시도 횟수")
+    p.add_argument("--restarts", type=int, help="서로 다른 시드로 다시 찾는 횟수 (기본: 4)")
+    p.add_argument("--seed", type=int, help="같은 시드면 같은 결과")
+    p.add_argument("--workers", type=int, help="재시작을 나눠 돌릴 프로세스 수 (기본: CPU 수)")
+    p.add_argument("-o", "--output", help="출력 파일 (기본: 표준 출력)")
+    add_weight_options(p)
+    p.set_defaults(func=cmd_wheel)
+
+    p = sub.add_parser("export", help="빈도 표 / 번호 쌍 / 회차 기록을 파일로 내보내기")
+    p.add_argument("table", choices=["frequencies", "pairs", "rounds"])
+    p.add_argument("-o", "--output", required=True, help="출력 파일 (확장자로 형식 결정, '-'이면 표준 출력 CSV)")
+    p.add_argument("--format", choices=["csv", "parquet", "npy"], help="확장자 대신 지정할 형식")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("simulate", help="저장된 회차로 가중치/균등 추첨 당첨률 비교")
+    p.add_argument("--tickets", type=int, default=100000, help="회차당 티켓 수 (방식별)")
+    p.add_argument("--seed", type=int, default=0, help="난수 시드 (같으면 결과가 같음)")
+    p.add_argument("--workers", type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    p.add_argument("--no-bonus", action="store_true", help="가중치에서 보너스 번호 빈도 제외")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("serve", help="로컬 HTTP/JSON 추첨 서비스 실행")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8645, help="0이면 빈 포트를 골라 표준 오류에 출력")
+    p.add_argument("--workers", type=int, help="큰 요청을 만드는 프로세스 수 (기본: CPU 수)")
+    p.add_argument("--watch", metavar="DIR", help="폴더에 들어오는 Excel 파일을 자동으로 가져오기")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("watch", help="폴더에 들어오는 Excel 파일을 회차 DB와 빈도수에 자동으로 더하기")
+    p.add_argument("directory")
+    p.add_argument("--poll", action="store_true", help="inotify 대신 주기적으로 폴더 훑기")
+    p.set_defaults(func=cmd_watch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_dir:
+        os.environ["PICK_LOTTO_DATA_DIR"] = args.data_dir
+    if getattr(args, "count", 0) < 0:
+        print("--count는 0 이상이어야 합니다.", file=sys.stderr)
+        return 2
+    if getattr(args, "tickets", 1) < 1:
+        print("--tickets는 1 이상이어야 합니다.", file=sys.stderr)
+        return 2
+    import gof_monitor
+    import instrument
+    if args.metrics:
+        instrument.enable()
+    if args.monitor:
+        gof_monitor.enable()
+    try:
+        if args.profile:
+            return instrument.profile_call(lambda: args.func(args), args.profile)
+        return args.func(args)
+    except (ValueError, RuntimeError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # `| head` 처럼 출력을 중간에 닫아도 조용히 끝낸다
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if args.monitor:
+            for line in gof_monitor.report_lines():
+                print(line, file=sys.stderr)
+        if args.metrics:
+            instrument.dump(args.metrics)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
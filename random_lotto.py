@@ -2,10 +2,10 @@ import tkinter as tk
 from tkinter import messagebox
 import random
 import bisect
-import ctypes
-import os
 import sys
 import platform
+from entropy import hardware_pool
+from background import BackgroundRunner
 
 # --- 가중치 데이터 ---
 frequencies = [
@@ -27,24 +27,10 @@ def build_weighted_table(weights):
 
 cumulative_weights, total_weight = build_weighted_table(frequencies)
 
-# --- 하드웨어 난수 함수 (OS별 처리) ---
-
-def get_hardware_random_bytes(n):
-    if os.name == 'nt':  # Windows
-        BCRYPT_USE_SYSTEM_PREFERRED_RNG = 0x00000002
-        bcrypt = ctypes.windll.bcrypt
-        buffer = ctypes.create_string_buffer(n)
-        status = bcrypt.BCryptGenRandom(None, buffer, n, BCRYPT_USE_SYSTEM_PREFERRED_RNG)
-        if status != 0:
-            raise OSError(f"BCryptGenRandom failed with status {status}")
-        return buffer.raw
-    else:  # Unix/Linux/macOS
-        return os.urandom(n)
+# --- 하드웨어 난수 함수 (OS별 처리, 블록 단위 버퍼 사용) ---
 
 def get_hardware_random_float():
-    rand_bytes = get_hardware_random_bytes(4)
-    rand_int = int.from_bytes(rand_bytes, byteorder='little')
-    return rand_int / 2**32
+    return hardware_pool.random_float()
 
 # --- 가중치 기반 선택 ---
 def weighted_choice_pseudo():
@@ -67,18 +53,21 @@ def get_weighted_unique_numbers(count=6, method='pseudo'):
 
 # --- GUI 구성 ---
 def generate_numbers():
-    try:
-        method = method_var.get()
-        numbers = get_weighted_unique_numbers(6, method=method)
+    method = method_var.get()
+
+    def show(numbers):
         result_var.set("🎯 추첨 결과: " + ", ".join(map(str, numbers)))
-    except Exception as e:
-        messagebox.showerror("에러", str(e))
+
+    # 추첨은 작업 스레드에서 실행하고, 연달아 누르면 마지막 요청만 이어서 처리
+    runner.submit("generate", lambda task: get_weighted_unique_numbers(6, method=method),
+                  on_done=show, on_error=lambda e: messagebox.showerror("에러", str(e)))
 
 # GUI 창
 root = tk.Tk()
 root.title("로또 번호 추첨기 (가중치 기반)")
 root.geometry("460x260")
 root.resizable(False, False)
+runner = BackgroundRunner(root)
 
 # 메인 프레임
 main_frame = tk.Frame(root)
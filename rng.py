@@ -0,0 +1,88 @@
+import random
+import numpy as np
+import instrument
+from entropy import hardware_pool
+
+# 난수 방식
+METHOD_HARDWARE = 'hardware'  # OS 난수 (재현 불가)
+METHOD_PSEUDO = 'pseudo'      # 전역 random 모듈 / 시드 없는 NumPy Generator (재현 불가)
+METHOD_PCG64 = 'pcg64'        # 시드를 지정하는 NumPy PCG64
+METHOD_PHILOX = 'philox'      # 시드를 지정하는 NumPy Philox (카운터 기반)
+
+SEEDED_METHODS = (METHOD_PCG64, METHOD_PHILOX)
+METHODS = (METHOD_HARDWARE, METHOD_PSEUDO) + SEEDED_METHODS
+
+_BIT_GENERATORS = {
+    METHOD_PCG64: np.random.PCG64,
+    METHOD_PHILOX: np.random.Philox,
+}
+
+# RandomStream이 한 번에 받아 두는 난수 개수 (공 하나씩 뽑을 때의 호출 비용 절감)
+STREAM_BUFFER = 1024
+
+
+def new_seed():
+    """재현용으로 기록해 둘 새 시드 (OS 난수로 만든 128비트 정수)"""
+    return np.random.SeedSequence().entropy
+
+
+def make_generator(method=METHOD_PCG64, seed=None):
+    """시드(정수 또는 SeedSequence)로 만든 NumPy Generator. 같은 시드면 같은 난수열."""
+    if method not in _BIT_GENERATORS:
+        raise ValueError(f"시드를 지정할 수 없는 난수 방식입니다: {method}")
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return np.random.Generator(_BIT_GENERATORS[method](sequence))
+
+
+def spawn_seeds(seed, n):
+    """seed에서 갈라진 서로 독립인 SeedSequence n개 (작업 단위마다 하나씩)"""
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return sequence.spawn(n)
+
+
+class RandomStream:
+    """method에 맞는 [0, 1) 균등 난수 공급원
+
+    시드 방식은 자기만의 Generator를 가지므로 다른 스트림과 상태를 공유하지
+    않는다. 여러 스레드/프로세스에서 쓸 때는 하나를 나눠 쓰지 말고 spawn()으로
+    작업자마다 독립 스트림을 만든다.
+    """
+
+    def __init__(self, method=METHOD_HARDWARE, seed=None):
+        if method not in METHODS:
+            raise ValueError(f"알 수 없는 난수 방식입니다: {method}")
+        self.method = method
+        self.seed = seed
+        self.generator = None
+        self._sequence = None
+        if method in SEEDED_METHODS:
+            self._sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+            self.generator = make_generator(method, self._sequence)
+        elif method == METHOD_PSEUDO:
+            self.generator = np.random.default_rng()
+        self._buffer = []
+
+    def random(self, size=None):
+        """size가 None이면 float 하나, 아니면 그 모양의 float64 배열"""
+        if size is not None:
+            if self.method == METHOD_HARDWARE:
+                return hardware_pool.random_floats(int(np.prod(size))).reshape(size)
+            if instrument.enabled:
+                instrument.count("rng.bytes.generator", 8 * int(np.prod(size)))
+            return self.generator.random(size)
+        if self.method == METHOD_HARDWARE:
+            return hardware_pool.random_float()
+        if self.method == METHOD_PSEUDO:
+            return random.random()
+        if not self._buffer:
+            # 뒤에서부터 꺼내도록 뒤집어 둔다 (생성 순서대로 사용)
+            self._buffer = self.generator.random(STREAM_BUFFER).tolist()[::-1]
+            if instrument.enabled:
+                instrument.count("rng.bytes.generator", 8 * STREAM_BUFFER)
+        return self._buffer.pop()
+
+    def spawn(self, n):
+        """독립 자식 스트림 n개. 시드 방식이면 부모 시드로부터 재현 가능하다."""
+        if self._sequence is None:
+            return [RandomStream(self.method) for _ in range(n)]
+        return [RandomStream(self.method, child) for child in self._sequence.spawn(n)]
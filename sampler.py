@@ -0,0 +1,282 @@
+import random
+import threading
+from collections import OrderedDict
+import numpy as np
+import gof_monitor
+import instrument
+from entropy import hardware_pool
+from rng import RandomStream
+
+# 한 번에 처리하는 티켓 블록 크기 (메모리 사용량 제한)
+TICKET_BLOCK = 65536
+# 블록마다 티켓당 미리 뽑아두는 공 개수 (6개 + 중복 대비 여유분)
+DRAWS_PER_PASS = 7
+# 누적 가중치 구간을 빠르게 찾기 위한 안내 테이블 크기
+GUIDE_SIZE = 16384
+
+
+def _uniform(shape, method, rng):
+    """[0, 1) 구간의 균등 난수 배열"""
+    if method == 'hardware':
+        # get_hardware_random_float와 같이 공 하나당 4바이트 사용
+        return hardware_pool.random_floats(int(np.prod(shape))).reshape(shape)
+    if instrument.enabled:
+        instrument.count("rng.bytes.generator", 8 * int(np.prod(shape)))
+    return rng.random(shape)
+
+
+def _scalar_source(method, rng):
+    """float 하나씩 돌려주는 함수. rng(Generator/RandomStream)가 있으면 그것을 쓴다."""
+    if rng is not None:
+        return rng.random
+    if method == 'pseudo':
+        return random.random
+    if method == 'hardware':
+        return hardware_pool.random_float
+    return RandomStream(method).random
+
+
+class WeightedTable:
+    """누적 가중치 + 안내 테이블. bisect_left와 같은 결과를 O(1)에 가깝게 찾는다."""
+
+    def __init__(self, frequencies):
+        weights = np.asarray(frequencies, dtype=np.float64)
+        if weights.ndim != 1 or weights.size == 0:
+            raise ValueError("빈도수 배열이 비어 있습니다.")
+        if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+            raise ValueError("빈도수는 0 이상의 유한한 값이어야 합니다.")
+        self.weights = weights
+        self.cumulative = np.cumsum(weights)
+        self.total = float(self.cumulative[-1])
+        if self.total <= 0:
+            raise ValueError("빈도수 합계가 0입니다.")
+        self.nonzero = int(np.count_nonzero(weights))
+        bounds = np.arange(GUIDE_SIZE, dtype=np.float64) * (self.total / GUIDE_SIZE)
+        # 부동소수점 반올림으로 하한을 넘지 않도록 한 칸 앞에서 시작
+        self.guide = np.maximum(np.searchsorted(self.cumulative, bounds, side='left') - 1, 0)
+        self._last = self.cumulative.size - 1
+
+    def lookup(self, u):
+        """균등 난수 u에 해당하는 0부터 시작하는 인덱스 (bisect_left 기준)"""
+        r = u * self.total
+        idx = self.guide[np.minimum((u * GUIDE_SIZE).astype(np.intp), GUIDE_SIZE - 1)]
+        # 안내 테이블은 하한만 알려주므로 남은 몇 칸을 앞으로 이동
+        while True:
+            behind = self.cumulative[idx] < r
+            behind &= idx < self._last
+            if not behind.any():
+                return idx
+            idx += behind
+
+
+@instrument.span("draw.ticket_masks")
+def generate_ticket_masks(frequencies, n, method='hardware', k=6, rng=None):
+    """빈도수 가중치로 중복 없는 k개 번호 조합 n개를 비트마스크로 생성
+
+    get_weighted_unique_numbers의 공 단위 재추첨을 티켓 전체에 대해
+    벡터로 수행한다. 티켓마다 복원 추첨한 공 중 처음 나온 서로 다른
+    k개를 고르므로 기존 반복문과 같은 분포가 된다.
+    반환값은 (n,) uint64 배열이며 번호 i는 (i - 1)번째 비트이다.
+    """
+    if n < 0:
+        raise ValueError("생성 개수는 0 이상이어야 합니다.")
+    table = frequencies if isinstance(frequencies, WeightedTable) else WeightedTable(frequencies)
+    if table.cumulative.size > 64:
+        raise ValueError("번호는 최대 64개까지 지원합니다.")
+    if table.nonzero < k:
+        raise ValueError(f"빈도수가 0보다 큰 번호가 {k}개 이상 있어야 합니다.")
+    if method != 'hardware' and rng is None:
+        # 시드를 주지 않으면 매번 다른 난수열 (재현하려면 rng를 넘긴다)
+        rng = RandomStream(method)
+
+    result = np.empty(n, dtype=np.uint64)
+    one = np.uint64(1)
+    drawn = 0
+    for start in range(0, n, TICKET_BLOCK):
+        stop = min(start + TICKET_BLOCK, n)
+        bits = np.zeros(stop - start, dtype=np.uint64)
+        count = np.zeros(stop - start, dtype=np.uint8)
+        pending = np.arange(stop - start)
+
+        # 아직 k개를 채우지 못한 티켓에만 공을 더 뽑는다
+        while pending.size:
+            balls = table.lookup(_uniform((DRAWS_PER_PASS, pending.size), method, rng))
+            drawn += balls.size
+            masks = one << balls.astype(np.uint64)
+            b = bits[pending]
+            c = count[pending]
+            for column in masks:
+                new = (b & column) == 0
+                new &= c < k
+                b |= np.where(new, column, 0)
+                c += new
+            bits[pending] = b
+            count[pending] = c
+            pending = pending[c < k]
+        result[start:stop] = bits
+    if instrument.enabled:
+        # 중복으로 버린 공과 마지막 회차에 남은 공을 합친 수
+        instrument.count("rng.draws", drawn)
+        instrument.count("draw.retries", drawn - n * k)
+    if gof_monitor.enabled and k == 6:
+        # 일부만 번호로 바꿔 센다 (전부 세면 생성 시간의 절반 가까이 든다)
+        gof_monitor.observe(table.weights, masks_to_numbers(result[::gof_monitor.OBSERVE_STRIDE]), stride=1)
+    return result
+
+
+def masks_to_numbers(bits, k=6):
+    """비트마스크 배열 → 각 행이 오름차순인 (n, k) uint8 번호 배열"""
+    bits = np.array(bits, dtype=np.uint64)
+    numbers = np.empty((bits.size, k), dtype=np.uint8)
+    one = np.uint64(1)
+    # 가장 낮은 비트부터 꺼내 오름차순 번호로 변환
+    for j in range(k):
+        low = bits & (~bits + one)
+        numbers[:, j] = np.frexp(low.astype(np.float64))[1]
+        bits ^= low
+    return numbers
+
+
+def generate_tickets(frequencies, n, method='hardware', k=6, rng=None):
+    """빈도수 가중치로 중복 없는 k개 번호 조합 n개를 한 번에 생성
+
+    반환값은 각 행이 오름차순으로 정렬된 (n, k) uint8 배열.
+    """
+    tickets = np.empty((n, k), dtype=np.uint8)
+    for start in range(0, n, TICKET_BLOCK):
+        stop = min(start + TICKET_BLOCK, n)
+        bits = generate_ticket_masks(frequencies, stop - start, method, k, rng)
+        tickets[start:stop] = masks_to_numbers(bits, k)
+    return tickets
+
+
+class AliasTable:
+    """Walker/Vose 별칭 테이블. 번호 하나를 난수 한 개로 O(1)에 뽑는다."""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or weights.size == 0:
+            raise ValueError("빈도수 배열이 비어 있습니다.")
+        if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+            raise ValueError("빈도수는 0 이상의 유한한 값이어야 합니다.")
+        if weights.sum() <= 0:
+            raise ValueError("빈도수 합계가 0입니다.")
+        self.weights = weights
+        self.size = weights.size
+        self.nonzero = int(np.count_nonzero(weights))
+        self._weight_list = weights.tolist()
+        self._total = float(weights.sum())
+        self._table = self._build(list(range(self.size)))
+        self._monitor = None
+
+    def _build(self, items):
+        """items(0부터 시작하는 번호 목록)만으로 (번호, 확률, 별칭) 테이블을 만든다."""
+        n = len(items)
+        w = self.weights[items]
+        scaled = (w * (n / w.sum())).tolist()
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+        # 남은 칸은 반올림 오차만 있으므로 확률 1.0(자기 자신)으로 둔다
+        return items, prob, alias
+
+    @staticmethod
+    def _draw(table, u):
+        items, prob, alias = table
+        x = u * len(items)
+        column = min(int(x), len(items) - 1)
+        if x - column < prob[column]:
+            return items[column]
+        return items[alias[column]]
+
+    def draw(self, method='hardware', rng=None):
+        """1부터 시작하는 번호 하나 (복원 추첨)"""
+        return self._draw(self._table, _scalar_source(method, rng)()) + 1
+
+    def sample_unique(self, k=6, method='hardware', rng=None):
+        """중복 없는 k개 번호 (오름차순)
+
+        이미 뽑힌 번호가 나오면 버리고 다시 뽑는다. 남은 번호의 가중치에
+        비례해 뽑는 것과 같으므로 뽑을 때마다 테이블을 다시 만들 필요가 없다.
+        제외된 가중치가 절반을 넘을 때만 남은 번호로 테이블을 한 번 줄여
+        재추첨 횟수를 제한한다. rng(RandomStream 등)를 주면 그 난수열을 쓴다.
+        """
+        if self.nonzero < k:
+            raise ValueError(f"빈도수가 0보다 큰 번호가 {k}개 이상 있어야 합니다.")
+        uniform = _scalar_source(method, rng)
+        weights = self._weight_list
+        items, prob, alias = self._table
+        columns = len(items)
+        total = self._total
+        removed = 0.0
+        picked = set()
+        retries = 0
+        while len(picked) < k:
+            # _draw를 풀어 쓴 것 (추첨 루프의 함수 호출 비용 절감)
+            x = uniform() * columns
+            column = int(x)
+            if column >= columns:
+                column = columns - 1
+            num = items[column] if x - column < prob[column] else items[alias[column]]
+            if num in picked:
+                retries += 1
+                continue
+            picked.add(num)
+            removed += weights[num]
+            if removed * 2 > total and len(picked) < k:
+                items, prob, alias = self._build([i for i in items if i not in picked])
+                columns = len(items)
+                total -= removed
+                removed = 0.0
+        if instrument.enabled:
+            instrument.count("rng.draws", k + retries)
+            instrument.count("draw.retries", retries)
+        result = sorted(num + 1 for num in picked)
+        if gof_monitor.enabled:
+            if self._monitor is None:
+                self._monitor = gof_monitor.get_monitor(self.weights)
+            if self._monitor is not None and k == 6:
+                self._monitor.observe_one(result)
+        return result
+
+
+# 빈도수가 바뀌지 않으면 같은 테이블을 재사용 (최근 사용 순)
+ALIAS_CACHE_SIZE = 8
+_alias_cache = OrderedDict()
+_alias_lock = threading.Lock()
+
+
+def weights_key(weights):
+    """가중치 배열의 내용으로 만든 해시 가능한 키"""
+    if isinstance(weights, np.ndarray):
+        return weights.dtype.str, weights.tobytes()
+    return tuple(weights)
+
+
+@instrument.span("draw.alias_table")
+def get_alias_table(weights, include_bonus=False):
+    """캐시된 별칭 테이블. 가중치와 보너스 포함 여부가 같으면 다시 만들지 않는다."""
+    key = (weights_key(weights), bool(include_bonus))
+    # GUI 스레드와 BackgroundRunner 작업 스레드가 함께 부른다
+    with _alias_lock:
+        table = _alias_cache.get(key)
+        if table is not None:
+            _alias_cache.move_to_end(key)
+            return table
+    table = AliasTable(weights)
+    with _alias_lock:
+        # 그 사이 다른 스레드가 먼저 만들었으면 그것을 쓴다
+        table = _alias_cache.setdefault(key, table)
+        _alias_cache.move_to_end(key)
+        while len(_alias_cache) > ALIAS_CACHE_SIZE:
+            _alias_cache.popitem(last=False)
+    return table
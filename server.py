@@ -0,0 +1,360 @@
+"""로컬 HTTP/JSON 추첨 서비스 (asyncio, 표준 라이브러리만 사용)
+
+    python -m pick_lotto serve --port 8645
+
+    GET  /generate?count=5&method=pseudo&mode=window&n=100   → {"tickets": [[...], ...], ...}
+    GET  /stats?mode=decay&n=50                              → 빈도수와 가중치
+    POST /ingest  {"files": ["2024.xlsx"]}                   → {"added": 회차 수, "errors": [...]}
+
+/generate는 쿼리 대신 같은 이름의 JSON 본문(POST)도 받는다. 작은 요청은
+짧은 시간 모았다가 한 번의 벡터 추첨으로 만들고, 큰 요청은 프로세스 풀에서 만든다.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import gof_monitor
+from rng import METHOD_HARDWARE, METHODS, SEEDED_METHODS, make_generator, new_seed
+from sampler import WeightedTable, generate_tickets
+from weighting import MODE_ALL, MODE_DECAY, MODE_WINDOW
+
+DEFAULT_PORT = 8645
+
+# 이 장 수 이하의 요청은 모아서 한 번에 추첨한다
+SMALL_REQUEST = 64
+# 요청을 모으는 최대 시간(초)과 한 번에 추첨하는 최대 장 수
+BATCH_WINDOW = 0.0005
+BATCH_TICKETS = 4096
+# 이 장 수를 넘는 요청은 프로세스 풀에서 만든다
+POOL_REQUEST = 100000
+# 한 요청에서 만들 수 있는 최대 장 수 (응답 JSON 크기 제한)
+MAX_COUNT = 1000000
+# 빈도수 저장소 일련번호를 다시 확인하는 간격(초). 바뀌면 추첨 표를 새로 만든다.
+TABLE_TTL = 0.25
+# 요청 본문 최대 크기
+MAX_BODY = 1 << 20
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(ValueError):
+    """잘못된 요청 (400 응답)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def generate_block(table, count, method, seed=None):
+    """프로세스 풀 작업 단위: count장 (k, 6) uint8. 시드 방식이면 seed로 만든 독립 난수열 사용."""
+    rng = make_generator(method, seed) if method in SEEDED_METHODS else None
+    return generate_tickets(table, count, method, rng=rng)
+
+
+def _weights_key(params):
+    """요청 인자 → (가중치 방식, 회차 수, 보너스 포함). 형식이 틀리면 RequestError."""
+    mode = params.get("mode", MODE_ALL)
+    if mode not in (MODE_ALL, MODE_WINDOW, MODE_DECAY):
+        raise RequestError(f"알 수 없는 가중치 방식입니다: {mode}")
+    n = None
+    if mode != MODE_ALL:
+        n = _int_param(params, "n", 100, 1)
+    include_bonus = str(params.get("bonus", "1")).lower() not in ("0", "false", "no")
+    return mode, n, include_bonus
+
+
+def _int_param(params, name, default, minimum, maximum=None):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise RequestError(f"{name}은(는) 정수여야 합니다.") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        raise RequestError(f"{name}은(는) {minimum}~{maximum or '∞'} 범위여야 합니다.")
+    return value
+
+
+class DrawService:
+    """추첨 표를 메모리에 두고 요청을 처리하는 서비스 본체
+
+    회차 DB(SQLite)와 저장소는 한 스레드(db_executor)에서만 다룬다. 추첨 표는
+    (가중치 방식, 회차 수, 보너스 포함)마다 만들어 두고 저장소 일련번호가
+    바뀌었을 때만 다시 만든다.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
+        self.pool = None
+        self._tables = {}
+        self._serial = None
+        self._checked = 0.0
+        self._batches = {}
+        self.requests = 0
+        self.batches = 0
+
+    def close(self):
+        self.db_executor.shutdown(wait=False)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_db(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.db_executor, func, *args)
+
+    async def get_table(self, key):
+        """(WeightedTable, 최신 회차). 저장소가 바뀌었으면 새로 만든다."""
+        now = time.monotonic()
+        if now - self._checked > TABLE_TTL:
+            self._checked = now
+            serial = await self._in_db(_store_serial)
+            if serial != self._serial:
+                self._serial = serial
+                self._tables.clear()
+        entry = self._tables.get(key)
+        if entry is None:
+            entry = await self._in_db(_build_table, *key)
+            self._tables[key] = entry
+        return entry
+
+    async def generate(self, params):
+        key = _weights_key(params)
+        count = _int_param(params, "count", 1, 1, MAX_COUNT)
+        method = params.get("method", METHOD_HARDWARE)
+        if method not in METHODS:
+            raise RequestError(f"알 수 없는 난수 방식입니다: {method}")
+        seed = params.get("seed")
+        if seed is not None:
+            if method not in SEEDED_METHODS:
+                raise RequestError("seed는 pcg64/philox 방식에서만 쓸 수 있습니다.")
+            seed = _int_param(params, "seed", 0, 0)
+        elif method in SEEDED_METHODS:
+            # 시드 방식인데 시드가 없으면 새로 만들어 응답에 알려 준다 (같은 결과 재현용)
+            seed = new_seed()
+        table, latest_round = await self.get_table(key)
+
+        if count > POOL_REQUEST:
+            if self.pool is None:
+                # fork로 만든 작업자는 부모의 감시 설정을 물려받으므로 끄고 시작
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=gof_monitor.enable, initargs=(False,),
+                )
+            loop = asyncio.get_running_loop()
+            tickets = await loop.run_in_executor(self.pool, generate_block, table, count, method, seed)
+            if gof_monitor.enabled:
+                # 작업자 프로세스는 감시하지 않으므로 받은 결과를 여기서 센다
+                gof_monitor.observe(table.weights, tickets)
+        elif seed is None and count <= SMALL_REQUEST:
+            tickets = await self._batched(key, method, table, count)
+        elif count > SMALL_REQUEST:
+            # 수천 장이면 수 ms가 걸리므로 이벤트 루프를 막지 않도록 스레드에서 (numpy는 GIL을 놓는다)
+            loop = asyncio.get_running_loop()
+            tickets = await loop.run_in_executor(None, generate_block, table, count, method, seed)
+        else:
+            tickets = generate_block(table, count, method, seed)
+
+        result = {"tickets": tickets.tolist(), "latest_round": latest_round, "method": method}
+        if seed is not None:
+            result["seed"] = seed
+        return result
+
+    def _batched(self, key, method, table, count):
+        """작은 요청을 BATCH_WINDOW 동안 모아 한 번에 추첨하고 각자 몫을 나눠 준다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch_key = key + (method,)
+        batch = self._batches.get(batch_key)
+        if batch is None or batch["table"] is not table:
+            batch = {"table": table, "method": method, "waiting": [], "tickets": 0}
+            self._batches[batch_key] = batch
+            batch["timer"] = loop.call_later(BATCH_WINDOW, self._flush, batch_key, batch)
+        batch["waiting"].append((count, future))
+        batch["tickets"] += count
+        if batch["tickets"] >= BATCH_TICKETS:
+            batch["timer"].cancel()
+            self._flush(batch_key, batch)
+        return future
+
+    def _flush(self, batch_key, batch):
+        if self._batches.get(batch_key) is batch:
+            del self._batches[batch_key]
+        waiting = [(count, future) for count, future in batch["waiting"] if not future.cancelled()]
+        if not waiting:
+            return
+        self.batches += 1
+        try:
+            tickets = generate_tickets(batch["table"], sum(count for count, _ in waiting), batch["method"])
+        except Exception as e:
+            for _, future in waiting:
+                future.set_exception(e)
+            return
+        start = 0
+        for count, future in waiting:
+            future.set_result(tickets[start:start + count])
+            start += count
+
+    async def stats(self, params):
+        key = _weights_key(params)
+        return await self._in_db(_stats, *key)
+
+    async def ingest(self, params):
+        files = params.get("files")
+        if not isinstance(files, list) or not files or not all(isinstance(f, str) for f in files):
+            raise RequestError("files는 Excel 파일 경로 목록이어야 합니다.")
+        missing = [f for f in files if not os.path.isfile(f)]
+        if missing:
+            raise RequestError(f"파일이 없습니다: {', '.join(missing)}")
+        added, errors = await self._in_db(_ingest, files)
+        # 저장소 일련번호가 바뀌었으므로 다음 요청에서 바로 확인하도록
+        self._checked = 0.0
+        return {"added": added, "errors": [[file, str(error)] for file, error in errors]}
+
+
+# --- db_executor 스레드에서 실행되는 함수 ---
+
+def _store_serial():
+    from lotto_core import get_frequency_store
+    header = get_frequency_store().header()
+    return header[1] if header else None
+
+
+def _build_table(mode, n, include_bonus):
+    from lotto_core import get_weights
+    weights, latest_round = get_weights(mode, n, include_bonus)
+    return WeightedTable(weights), int(latest_round or 0)
+
+
+def _stats(mode, n, include_bonus):
+    from lotto_core import get_weights, load_frequencies
+    normal_freq, bonus_freq, latest_round = load_frequencies()
+    if normal_freq is None:
+        raise RequestError("빈도수 파일이 없습니다. 먼저 ingest를 실행하세요.")
+    weights, _ = get_weights(mode, n, include_bonus)
+    return {
+        "latest_round": int(latest_round),
+        "normal": normal_freq.tolist(),
+        "bonus": bonus_freq.tolist(),
+        "weights": np.asarray(weights, dtype=np.float64).tolist(),
+    }
+
+
+def _ingest(files):
+    from lotto_core import ingest_files
+    return ingest_files(files)
+
+
+# --- HTTP ---
+
+async def _read_request(reader):
+    """(메서드, 경로, 쿼리 인자, 본문, keep-alive). 연결이 닫혔으면 None."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin1").split()
+    except ValueError:
+        raise RequestError("요청 줄 형식이 잘못되었습니다.") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise RequestError("Content-Length 형식이 잘못되었습니다.") from None
+    if length < 0:
+        raise RequestError("Content-Length 형식이 잘못되었습니다.")
+    if length > MAX_BODY:
+        raise RequestError("요청 본문이 너무 큽니다.", 413)
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+    url = urlsplit(target)
+    params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return method, url.path, params, body, keep_alive
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin1") + body
+
+
+class DrawServer:
+    def __init__(self, service):
+        self.service = service
+        self.routes = {
+            "/generate": (("GET", "POST"), service.generate),
+            "/stats": (("GET",), service.stats),
+            "/ingest": (("POST",), service.ingest),
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, params, body, keep_alive = request
+                    status, payload = await self.dispatch(method, path, params, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, params, body):
+        route = self.routes.get(path)
+        if route is None:
+            return 404, {"error": f"없는 경로입니다: {path}"}
+        methods, handler = route
+        if method not in methods:
+            return 405, {"error": f"{path}는 {'/'.join(methods)}만 받습니다."}
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise RequestError("본문이 올바른 JSON이 아닙니다.") from None
+            if not isinstance(data, dict):
+                raise RequestError("본문은 JSON 객체여야 합니다.")
+            params = {**params, **data}
+        self.service.requests += 1
+        try:
+            return 200, await handler(params)
+        except ValueError as e:
+            # 데이터가 없거나 인자가 범위를 벗어난 경우 (get_weights 등)
+            return getattr(e, "status", 400), {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, max_workers=None, ready=None):
+    """서비스 실행 (취소될 때까지). ready가 있으면 듣기 시작한 뒤 ready(실제 포트)를 호출."""
+    service = DrawService(max_workers)
+    server = await asyncio.start_server(DrawServer(service).handle, host, port, backlog=1024)
+    try:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from math import comb
+import numpy as np
+import gof_monitor
+from sampler import WeightedTable, generate_ticket_masks
+from tickets import number_masks
+from weighting import RoundWeights
+
+# 비교할 번호 생성 방식
+STRATEGY_WEIGHTED = "weighted"  # 해당 회차 이전까지의 빈도수 가중치 (get_weighted_unique_numbers와 같은 분포)
+STRATEGY_UNIFORM = "uniform"    # 모든 번호 같은 확률
+
+# 당첨 등수 (인덱스 = 등수 코드)
+TIERS = ("낙첨", "5등", "4등", "3등", "2등", "1등")
+
+# 작업 하나가 채점하는 티켓 수와, 그 안에서 한 번에 만드는 티켓 수
+TASK_TICKETS = 1 << 22
+SIM_BLOCK = 1 << 18
+
+# (일치 개수 × 2 + 보너스 일치) → 등수 코드
+_TIER_OF = np.zeros(14, dtype=np.intp)
+_TIER_OF[[6, 7]] = 1   # 3개 일치
+_TIER_OF[[8, 9]] = 2   # 4개 일치
+_TIER_OF[10] = 3       # 5개 일치
+_TIER_OF[11] = 4       # 5개 + 보너스
+_TIER_OF[[12, 13]] = 5  # 6개 일치
+
+
+def uniform_tier_probabilities():
+    """균등 추첨 티켓 한 장의 등수별 이론 확률"""
+    total = comb(45, 6)
+    first = 1
+    second = 6
+    third = comb(6, 5) * comb(38, 1)
+    fourth = comb(6, 4) * comb(39, 2)
+    fifth = comb(6, 3) * comb(39, 3)
+    losing = total - first - second - third - fourth - fifth
+    return np.array([losing, fifth, fourth, third, second, first], dtype=np.float64) / total
+
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        """NumPy 2.0 이전용 비트 개수 (바이트 단위 표 조회)"""
+        values = np.ascontiguousarray(values, dtype=np.uint64)
+        return _BYTE_BITS[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def score_tickets(ticket_masks, draw_mask, bonus_mask):
+    """티켓 마스크 배열을 한 회차 결과로 채점한 등수별 장수 (6,)"""
+    matches = popcount(ticket_masks & draw_mask).astype(np.intp)
+    has_bonus = (ticket_masks & bonus_mask) != 0
+    return np.bincount(_TIER_OF[matches * 2 + has_bonus], minlength=len(TIERS))
+
+
+def build_history(rounds, numbers, bonus, include_bonus=True):
+    """(회차별 직전까지의 가중치 (n, 45), 당첨번호 마스크 (n,), 보너스 마스크 (n,))
+
+    가중치는 해당 회차 이전 회차들만으로 계산하므로 미래 결과를 미리 보지 않는다.
+    """
+    weights = RoundWeights(rounds, numbers, bonus)
+    prior = weights.normal_cum[:-1].astype(np.float64)
+    if include_bonus:
+        prior += weights.bonus_cum[:-1]
+    return prior, number_masks(numbers), number_masks(np.asarray(bonus).reshape(-1, 1))
+
+
+def simulate_task(weights, draw_masks, bonus_masks, tickets_per_round, seed):
+    """연속된 회차 묶음을 채점한 등수별 장수. 프로세스 풀 작업 단위.
+
+    weights가 None이면 균등 추첨. 이전 회차 정보가 부족한(0보다 큰 번호가
+    6개 미만인) 회차도 균등 추첨으로 대신한다.
+    """
+    rng = np.random.default_rng(seed)
+    uniform = WeightedTable(np.ones(45))
+    counts = np.zeros(len(TIERS), dtype=np.int64)
+    for i in range(len(draw_masks)):
+        table = uniform
+        if weights is not None and np.count_nonzero(weights[i]) >= 6:
+            table = WeightedTable(weights[i])
+        for start in range(0, tickets_per_round, SIM_BLOCK):
+            n = min(SIM_BLOCK, tickets_per_round - start)
+            tickets = generate_ticket_masks(table, n, 'pseudo', rng=rng)
+            counts += score_tickets(tickets, draw_masks[i], bonus_masks[i])
+    return counts
+
+
+def plan_tasks(round_count, tickets_per_round):
+    """(시작 회차 인덱스, 끝 인덱스, 회차당 티켓 수) 작업 목록. 작업마다 약 TASK_TICKETS장."""
+    tasks = []
+    if tickets_per_round >= TASK_TICKETS:
+        # 한 회차의 티켓이 많으면 회차 하나를 여러 작업으로 나눈다
+        parts = -(-tickets_per_round // TASK_TICKETS)
+        for i in range(round_count):
+            for p in range(parts):
+                n = tickets_per_round * (p + 1) // parts - tickets_per_round * p // parts
+                tasks.append((i, i + 1, n))
+    else:
+        step = max(1, TASK_TICKETS // max(tickets_per_round, 1))
+        for start in range(0, round_count, step):
+            tasks.append((start, min(start + step, round_count), tickets_per_round))
+    return tasks
+
+
+def run_simulation(history, result_queue, tickets_per_round, seed=0,
+                   strategies=(STRATEGY_WEIGHTED, STRATEGY_UNIFORM), max_workers=None):
+    """저장된 회차를 재현하며 방식별로 티켓을 만들어 채점 (프로세스 풀)
+
+    작업이 끝나는 순서대로 (방식, 티켓 수, 등수별 장수, 오류)를 result_queue에
+    넣고 (executor, 작업 수)를 돌려준다. 작업마다 SeedSequence에서 나눈
+    독립 난수열을 쓰므로 같은 seed면 작업자 수와 관계없이 결과가 같다.
+    """
+    prior, draw_masks, bonus_masks = history
+    tasks = plan_tasks(len(draw_masks), tickets_per_round)
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks) * len(strategies))
+    # 작업자가 물려받은 분포 감시는 끈다 (회차마다 가중치가 달라 감시 비용만 든다)
+    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=gof_monitor.enable, initargs=(False,))
+
+    def report(strategy, tickets, future):
+        try:
+            result_queue.put((strategy, tickets, future.result(), None))
+        except Exception as e:
+            result_queue.put((strategy, tickets, None, e))
+
+    for s, strategy in enumerate(strategies):
+        for t, (start, stop, n) in enumerate(tasks):
+            weights = prior[start:stop] if strategy == STRATEGY_WEIGHTED else None
+            future = executor.submit(simulate_task, weights, draw_masks[start:stop],
+                                     bonus_masks[start:stop], n, seeds[s * len(tasks) + t])
+            future.add_done_callback(partial(report, strategy, (stop - start) * n))
+    executor.shutdown(wait=False)
+    return executor, len(tasks) * len(strategies)
+
+
+def format_eta(seconds):
+    """남은 시간 표시 (예: '1분 05초')"""
+    seconds = int(round(seconds))
+    if seconds >= 60:
+        return f"{seconds // 60}분 {seconds % 60:02d}초"
+    return f"{seconds}초"
+
+
+def format_results(counts, tickets):
+    """방식별 등수 장수를 100만 장당 비율 표로 (이론값 포함). [[칸, ...], ...]"""
+    strategies = [s for s in (STRATEGY_WEIGHTED, STRATEGY_UNIFORM) if s in counts]
+    names = {STRATEGY_WEIGHTED: "가중치", STRATEGY_UNIFORM: "균등"}
+    header = ["등수"]
+    for s in strategies:
+        header += [f"{names[s]}(장)", f"{names[s]}(100만 장당)"]
+    rows = [header + ["이론(100만 장당)"]]
+    theory = uniform_tier_probabilities() * 1e6
+    for tier in range(len(TIERS) - 1, 0, -1):
+        row = [TIERS[tier]]
+        for s in strategies:
+            row += [str(int(counts[s][tier])), f"{counts[s][tier] / max(tickets[s], 1) * 1e6:.2f}"]
+        rows.append(row + [f"{theory[tier]:.2f}"])
+    return rows
@@ -0,0 +1,189 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+
+# 필터 입력에서 쓰는 비교 연산자 (긴 것부터 확인)
+_OPERATORS = (
+    (">=", np.greater_equal), ("<=", np.less_equal), ("!=", np.not_equal),
+    (">", np.greater), ("<", np.less), ("=", np.equal),
+)
+
+
+class VirtualTable(ttk.Frame):
+    """보이는 행만 만드는 표 (행 수와 관계없이 화면에 보이는 height개 항목만 갱신)
+
+    데이터는 열마다 배열로 받고, 정렬과 필터는 행 번호 배열(view)만 바꾼다.
+    Treeview에는 height개의 항목을 한 번만 만들어 두고 스크롤할 때마다 값이
+    바뀐 칸만 다시 쓰므로, 다시 그리는 비용이 전체 행 수에 비례하지 않는다.
+    열 제목을 누르면 정렬(다시 누르면 역순), 필터 칸에는 '값' 또는 '>=200'처럼 입력한다.
+    """
+
+    def __init__(self, master, columns, height=10, widths=None, filterable=True):
+        super().__init__(master)
+        self.columns = list(columns)
+        self.height = height
+        self._data = [np.empty(0) for _ in self.columns]
+        self._text = {}
+        self._view = np.empty(0, dtype=np.intp)
+        self._mask = None
+        self._sort = None
+        self._top = 0
+        self._shown = [None] * height
+
+        row = 0
+        if filterable:
+            filter_frame = ttk.Frame(self)
+            filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+            ttk.Label(filter_frame, text="필터:").grid(row=0, column=0)
+            self.filter_column = ttk.Combobox(filter_frame, values=self.columns, width=12, state="readonly")
+            self.filter_column.current(0)
+            self.filter_column.grid(row=0, column=1, padx=5)
+            self.filter_var = tk.StringVar()
+            entry = ttk.Entry(filter_frame, textvariable=self.filter_var, width=15)
+            entry.grid(row=0, column=2)
+            entry.bind("<Return>", lambda e: self.apply_filter())
+            ttk.Button(filter_frame, text="적용", command=self.apply_filter).grid(row=0, column=3, padx=5)
+            self.count_label = ttk.Label(filter_frame, text="")
+            self.count_label.grid(row=0, column=4, padx=5)
+            row = 1
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", height=height, selectmode="browse")
+        for i, col in enumerate(self.columns):
+            self.tree.heading(col, text=col, command=lambda c=i: self.sort_by(c))
+            self.tree.column(col, width=widths[i] if widths else 100, anchor=tk.CENTER)
+        # 화면에 보이는 줄 수만큼만 항목을 만들어 재사용
+        self._items = [self.tree.insert("", "end", values=()) for _ in range(height)]
+        self.tree.grid(row=row, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=row, column=1, sticky=(tk.N, tk.S))
+        for widget in (self.tree, self.scrollbar):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", lambda e: self.scroll(-3))
+            widget.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: (self.scroll(-1), "break")[1])
+        self.tree.bind("<Down>", lambda e: (self.scroll(1), "break")[1])
+        self.tree.bind("<Prior>", lambda e: (self.scroll(-self.height), "break")[1])
+        self.tree.bind("<Next>", lambda e: (self.scroll(self.height), "break")[1])
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(row, weight=1)
+
+    @property
+    def row_count(self):
+        """필터를 적용한 뒤 보이는 전체 행 수"""
+        return len(self._view)
+
+    def set_data(self, *columns):
+        """열마다 같은 길이의 배열(또는 목록)로 표 내용을 교체. 정렬/필터 설정은 유지한다."""
+        if len(columns) != len(self.columns):
+            raise ValueError("열 개수가 맞지 않습니다.")
+        data = [np.asarray(col) for col in columns]
+        if len({len(col) for col in data}) > 1:
+            raise ValueError("열마다 행 수가 같아야 합니다.")
+        self._data = data
+        self._text = {}
+        self._mask = None
+        invalid = False
+        if hasattr(self, "filter_var") and self.filter_var.get().strip():
+            try:
+                self._mask = self._filter_mask(self.filter_column.current(), self.filter_var.get().strip())
+            except ValueError:
+                # 잘못된 필터는 apply_filter처럼 걸지 않고 오류만 표시
+                invalid = True
+        self._rebuild_view()
+        if invalid:
+            self.count_label.config(text="필터 형식 오류")
+
+    def set_filter(self, mask):
+        """행마다 True/False인 배열로 보이는 행을 고른다 (None이면 전체)."""
+        self._mask = None if mask is None else np.asarray(mask, dtype=bool)
+        self._top = 0
+        self._rebuild_view()
+
+    def apply_filter(self):
+        text = self.filter_var.get().strip()
+        try:
+            mask = self._filter_mask(self.filter_column.current(), text) if text else None
+        except ValueError:
+            self.count_label.config(text="필터 형식 오류")
+            return
+        self.set_filter(mask)
+
+    def sort_by(self, column, descending=None):
+        """column 기준 정렬. descending을 주지 않으면 같은 열을 다시 누를 때 역순."""
+        if descending is None:
+            descending = self._sort == (column, False)
+        self._sort = (column, descending)
+        for i, col in enumerate(self.columns):
+            arrow = (" ▼" if descending else " ▲") if i == column else ""
+            self.tree.heading(col, text=col + arrow)
+        self._top = 0
+        self._rebuild_view()
+
+    def scroll(self, rows):
+        self._top = self._clamp(self._top + rows)
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._top = self._clamp(int(round(float(amount) * len(self._view))))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self._top = self._clamp(self._top + int(amount) * step)
+        self.refresh()
+
+    def _clamp(self, top):
+        return max(0, min(top, len(self._view) - self.height))
+
+    def _column_text(self, column):
+        """열의 문자열 형태 (필터에서 처음 쓸 때 한 번만 만든다)"""
+        if column not in self._text:
+            self._text[column] = self._data[column].astype(str)
+        return self._text[column]
+
+    def _filter_mask(self, column, text):
+        values = self._data[column]
+        for op, func in _OPERATORS:
+            if text.startswith(op) and values.dtype.kind in "iuf":
+                return func(values, float(text[len(op):]))
+        if values.dtype.kind in "iuf":
+            return values == float(text)
+        return np.char.find(self._column_text(column), text) >= 0
+
+    def _rebuild_view(self):
+        rows = len(self._data[0]) if self._data else 0
+        view = np.arange(rows) if self._mask is None else np.flatnonzero(self._mask)
+        if self._sort is not None:
+            column, descending = self._sort
+            keys = self._data[column][view]
+            order = np.argsort(keys, kind="stable")
+            view = view[order[::-1]] if descending else view[order]
+        self._view = view
+        self._top = self._clamp(self._top)
+        if hasattr(self, "count_label"):
+            self.count_label.config(text=f"{len(view):,} / {rows:,}행")
+        self.refresh()
+
+    def refresh(self):
+        """보이는 height개 항목 중 값이 바뀐 것만 다시 쓴다."""
+        visible = self._view[self._top:self._top + self.height]
+        for slot, item in enumerate(self._items):
+            if slot < len(visible):
+                row = visible[slot]
+                values = tuple(col[row].item() if hasattr(col[row], "item") else col[row] for col in self._data)
+            else:
+                values = ()
+            if values != self._shown[slot]:
+                self.tree.item(item, values=values)
+                self._shown[slot] = values
+
+        total = len(self._view)
+        if total > self.height:
+            self.scrollbar.set(self._top / total, (self._top + self.height) / total)
+        else:
+            self.scrollbar.set(0, 1)
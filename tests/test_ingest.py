@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from ingest import parse_file
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("pandas")
+
+
+def _workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+def _draw(round_cell, last=6):
+    return [2023, round_cell, 7, 1, 2, 3, 4, 5, last, 45]
+
+
+def _assert_same(path, chunk_rows):
+    expected = parse_file(path)
+    result = parse_file(path, streaming=True, chunk_rows=chunk_rows)
+    for a, b in zip(expected[:3], result[:3]):
+        np.testing.assert_array_equal(a, b)
+    assert expected[3] == result[3]
+    return result
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 4096])
+def test_numeric_text_round_in_numeric_column(tmp_path, chunk_rows):
+    # 회차 열의 다른 값이 모두 숫자이면 pandas는 '2000'을 숫자로 읽는다
+    rows = [_draw(r, 6 + r) for r in range(1, 5)] + [_draw("2000", 11)]
+    _, _, rounds, latest_round = _assert_same(_workbook(tmp_path / "rounds.xlsx", rows), chunk_rows)
+    assert latest_round == 2000
+    assert rounds[-1] == 2000
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 4096])
+def test_numeric_text_round_in_text_column(tmp_path, chunk_rows):
+    # 열에 숫자가 아닌 글자(머리글)가 있으면 '2000'은 글자 그대로 (뒤에 나와도 같다)
+    rows = [_draw("2000", 11)] + [_draw(r, 6 + r) for r in range(1, 5)] + [["년도", "회차"]]
+    _, _, rounds, latest_round = _assert_same(_workbook(tmp_path / "header.xlsx", rows), chunk_rows)
+    assert latest_round == 4
+    assert rounds[0] == 0
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 4096])
+def test_numeric_text_numbers(tmp_path, chunk_rows):
+    rows = [_draw(1), [2023, 2, 7, " 1 ", "2", "3", "4", "5", "6", "45"], _draw(3), ["", "NA", None]]
+    numbers, _, _, _ = _assert_same(_workbook(tmp_path / "numbers.xlsx", rows), chunk_rows)
+    assert len(numbers) == 3
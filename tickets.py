@@ -0,0 +1,204 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from math import comb
+import numpy as np
+import gof_monitor
+import instrument
+from rng import SEEDED_METHODS, make_generator, spawn_seeds
+from sampler import TICKET_BLOCK, WeightedTable, generate_ticket_masks, generate_tickets
+
+# 45개 중 6개 조합의 수 (순위는 0 ~ COMBINATIONS - 1)
+COMBINATIONS = comb(45, 6)
+# 순위를 담는 자료형 (8,145,060 < 2**32 이므로 티켓당 4바이트)
+RANK_DTYPE = np.uint32
+
+# _BINOM[c, i] = C(c, i)
+_BINOM = np.array([[comb(c, i) for i in range(7)] for c in range(46)], dtype=np.int64)
+
+
+def number_masks(numbers):
+    """번호 배열 (..., k) → 번호 i를 (i - 1)번째 비트로 하는 uint64 마스크"""
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.uint64(1) << (numbers - np.uint64(1)), axis=-1)
+
+
+def rank_numbers(numbers):
+    """(n, 6) 번호 배열 → 조합 순위 (colex 순서, 0 ~ C(45, 6) - 1)
+
+    오름차순으로 정렬한 0부터 시작하는 번호 c1 < … < c6에 대해 Σ C(c_i, i).
+    """
+    numbers = np.sort(np.asarray(numbers, dtype=np.intp).reshape(-1, 6), axis=1) - 1
+    if numbers.size and (numbers.min() < 0 or numbers.max() > 44):
+        raise ValueError("번호는 1~45 사이여야 합니다.")
+    if np.any(numbers[:, 1:] == numbers[:, :-1]):
+        raise ValueError("한 조합 안에 같은 번호가 있습니다.")
+    ranks = np.zeros(len(numbers), dtype=np.int64)
+    for i in range(6):
+        ranks += _BINOM[numbers[:, i], i + 1]
+    return ranks.astype(RANK_DTYPE)
+
+
+def unrank(ranks):
+    """조합 순위 배열 → (n, 6) uint8 번호 배열 (각 행 오름차순)"""
+    remaining = np.asarray(ranks, dtype=np.int64).ravel().copy()
+    if remaining.size and (remaining.min() < 0 or remaining.max() >= COMBINATIONS):
+        raise ValueError("조합 순위가 범위를 벗어났습니다.")
+    numbers = np.empty((remaining.size, 6), dtype=np.uint8)
+    for i in range(6, 0, -1):
+        # C(c, i) <= 남은 순위인 가장 큰 c (C(c, i)는 c에 대해 증가)
+        c = np.searchsorted(_BINOM[:45, i], remaining, side="right") - 1
+        numbers[:, i - 1] = c + 1
+        remaining -= _BINOM[c, i]
+    return numbers
+
+
+def rank_masks(masks):
+    """비트마스크 배열 → 조합 순위 (번호 배열을 거치지 않고 낮은 비트부터 바로 계산)"""
+    bits = np.array(masks, dtype=np.uint64).ravel()
+    ranks = np.zeros(bits.size, dtype=np.int64)
+    one = np.uint64(1)
+    for i in range(1, 7):
+        low = bits & (~bits + one)
+        ranks += _BINOM[np.frexp(low.astype(np.float64))[1] - 1, i]
+        bits ^= low
+    return ranks.astype(RANK_DTYPE)
+
+
+def unrank_masks(ranks):
+    """조합 순위 배열 → 비트마스크 배열"""
+    return number_masks(unrank(ranks))
+
+
+class TicketSet:
+    """모든 조합(8,145,060개)에 대한 비트셋 (약 1MB). 이미 나온 조합을 O(1)에 확인."""
+
+    def __init__(self):
+        self.bits = np.zeros((COMBINATIONS + 7) // 8, dtype=np.uint8)
+        self.count = 0
+        self._avoiding = {}  # 제외 번호 마스크 → 그 번호가 없는 조합 수 (add할 때마다 갱신)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, rank):
+        return bool(self.bits[rank >> 3] & (1 << (rank & 7)))
+
+    def contains(self, ranks):
+        ranks = np.asarray(ranks, dtype=np.int64)
+        return (self.bits[ranks >> 3] >> (ranks & 7).astype(np.uint8)) & 1 == 1
+
+    def add(self, ranks, limit=None, masks=None):
+        """순위 배열을 추가하고, 처음 나온 항목(배열 안에서 겹치면 첫 번째만)이 True인 배열을 돌려준다.
+
+        limit을 주면 새 항목을 앞에서부터 limit개까지만 추가한다. masks는 ranks와
+        같은 순서의 비트마스크 (있으면 count_avoiding 갱신에 다시 계산하지 않는다).
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        new = ~self.contains(ranks)
+        _, first = np.unique(ranks, return_index=True)
+        once = np.zeros(ranks.size, dtype=bool)
+        once[first] = True
+        new &= once
+        if limit is not None:
+            new[np.flatnonzero(new)[limit:]] = False
+        added = ranks[new]
+        np.bitwise_or.at(self.bits, added >> 3, (1 << (added & 7)).astype(np.uint8))
+        self.count += int(added.size)
+        if self._avoiding and added.size:
+            masks = unrank_masks(added) if masks is None else np.asarray(masks)[new]
+            for excluded in self._avoiding:
+                self._avoiding[excluded] += int(np.count_nonzero(masks & np.uint64(excluded) == 0))
+        return new
+
+    def count_avoiding(self, excluded):
+        """excluded(번호 비트마스크)의 번호를 하나도 포함하지 않는 조합 수
+
+        처음 물을 때만 전체를 훑고, 그 뒤로는 add()에서 새 조합만큼 더해 둔다.
+        """
+        excluded = int(excluded)
+        count = self._avoiding.get(excluded)
+        if count is None:
+            ranks = np.flatnonzero(np.unpackbits(self.bits, bitorder="little")[:COMBINATIONS])
+            count = int(np.count_nonzero(unrank_masks(ranks) & np.uint64(excluded) == 0)) if ranks.size else 0
+            self._avoiding[excluded] = count
+        return count
+
+
+def _reachable(table, seen):
+    """가중치가 0보다 큰 번호로만 만든 조합 중 seen에 아직 없는 것의 수"""
+    total = comb(table.nonzero, 6)
+    # 모든 번호에 가중치가 있거나 seen을 모두 빼도 충분하면 seen을 훑지 않는다
+    if table.nonzero == table.cumulative.size or not len(seen):
+        return total - len(seen)
+    return total - seen.count_avoiding(number_masks(np.flatnonzero(table.weights == 0) + 1))
+
+
+def generate_unique_tickets(frequencies, n, method='hardware', rng=None, seen=None):
+    """서로 다른 조합 n개의 순위 배열 (RANK_DTYPE, 생성 순서)
+
+    generate_ticket_masks로 묶음 단위로 만든 뒤 이미 나온 조합은 버리고
+    다시 뽑는다. seen(TicketSet)을 넘기면 여러 번 호출해도 겹치지 않는다.
+    """
+    table = frequencies if isinstance(frequencies, WeightedTable) else WeightedTable(frequencies)
+    seen = TicketSet() if seen is None else seen
+    if n > _reachable(table, seen):
+        raise ValueError(f"가중치로 나올 수 있는 서로 다른 조합이 {n:,}개보다 적습니다.")
+    ranks = np.empty(n, dtype=RANK_DTYPE)
+    filled = 0
+    while filled < n:
+        # 겹쳐서 버려질 몫을 감안해 조금 더 뽑는다
+        want = min(n - filled, TICKET_BLOCK)
+        masks = generate_ticket_masks(table, want + want // 8 + 16, method, rng=rng)
+        candidates = rank_masks(masks)
+        fresh = candidates[seen.add(candidates, limit=n - filled, masks=masks)]
+        if instrument.enabled:
+            # 이미 나온 조합과 다 쓰지 않은 여유분을 합친 수
+            instrument.count("draw.rejected_tickets", candidates.size - fresh.size)
+        ranks[filled:filled + fresh.size] = fresh
+        filled += fresh.size
+    return ranks
+
+
+def _ticket_block(table, n, method, seed):
+    """프로세스 풀 작업 단위: 시드 방식이면 seed로 만든 독립 난수열로 n장 생성"""
+    rng = make_generator(method, seed) if method in SEEDED_METHODS else None
+    return generate_tickets(table, n, method, rng=rng)
+
+
+def iter_ticket_blocks(frequencies, n, method='hardware', seed=None, block=TICKET_BLOCK, max_workers=1):
+    """n장을 block장씩 만들어 순서대로 내준다 (각 묶음은 (block, 6) uint8 배열).
+
+    시드 방식(pcg64/philox)은 i번째 묶음이 seed에서 갈라진 i번째 스트림을 쓰므로
+    작업자 수와 관계없이 같은 seed면 같은 결과가 나온다. max_workers가 2 이상이면
+    묶음을 프로세스 풀에서 나눠 만들고, 작업자끼리 난수 상태를 공유하지 않는다.
+    """
+    table = frequencies if isinstance(frequencies, WeightedTable) else WeightedTable(frequencies)
+    sizes = [min(block, n - start) for start in range(0, n, block)]
+    if method in SEEDED_METHODS:
+        seeds = spawn_seeds(seed, len(sizes))
+    else:
+        seeds = [None] * len(sizes)
+
+    if max_workers == 1 or len(sizes) <= 1:
+        for size, child in zip(sizes, seeds):
+            yield _ticket_block(table, size, method, child)
+        return
+
+    # 소비자가 느려도 메모리가 늘지 않도록 작업자 수의 두 배까지만 미리 제출
+    # fork로 만든 작업자는 부모의 감시 설정을 물려받으므로 끄고 시작
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=gof_monitor.enable, initargs=(False,)) as executor:
+        ahead = 2 * (max_workers or os.cpu_count() or 1)
+        pending = deque()
+        jobs = iter(zip(sizes, seeds))
+        for size, child in islice(jobs, ahead):
+            pending.append(executor.submit(_ticket_block, table, size, method, child))
+        while pending:
+            result = pending.popleft().result()
+            for size, child in islice(jobs, 1):
+                pending.append(executor.submit(_ticket_block, table, size, method, child))
+            if gof_monitor.enabled:
+                # 작업자 프로세스는 감시하지 않으므로 받은 묶음을 여기서 센다
+                gof_monitor.observe(table.weights, result)
+            yield result
@@ -0,0 +1,257 @@
+"""폴더 감시 자동 가져오기
+
+    watcher = FolderWatcher("/srv/lotto/inbox", on_ingest=print)
+    watcher.start()   # 작업 스레드 (watcher.run()은 현재 스레드에서 계속 실행)
+
+폴더에 새로 들어오거나 바뀐 Excel 파일만 읽어 회차 DB에 더한다. 빈도수
+저장소는 DrawDatabase가 바뀐 회차만큼 더해서 원자적으로 교체하고 헤더의
+저장 일련번호를 올리므로, 다른 프로세스(GUI, 서버)는 그 번호만 가끔 읽어
+바뀌었을 때 가중치를 다시 만들면 된다. 리눅스에서는 inotify로 파일이 닫히거나
+옮겨진 순간 깨어나고, 쓸 수 없으면 POLL_INTERVAL마다 폴더를 훑어 크기와
+수정 시각이 두 번 연속 같은 (다 쓴) 파일만 처리한다.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import instrument
+from draw_db import DrawDatabase, get_db_filename
+from freq_store import FrequencyStore, get_store_filename
+
+# inotify를 쓸 수 없을 때 폴더를 훑는 간격 (초)
+POLL_INTERVAL = 0.2
+# 이벤트를 받은 뒤 같이 들어온 파일을 모으려고 더 기다리는 시간 (초)
+SETTLE_DELAY = 0.05
+# 열려 있어 읽지 못한 파일을 다시 시도하는 간격 (초)
+RETRY_INTERVAL = 1.0
+# 가져오는 파일 확장자
+EXTENSIONS = (".xlsx",)
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (뒤에 len바이트 이름)
+
+
+def is_workbook(name):
+    """가져올 파일 이름인지 (Excel 잠금 파일 ~$*, 숨김/임시 파일 제외)"""
+    return name.lower().endswith(EXTENSIONS) and not name.startswith(("~$", "."))
+
+
+class Inotify:
+    """ctypes로 부르는 리눅스 inotify (디렉터리 하나). 쓸 수 없으면 OSError."""
+
+    def __init__(self, directory):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify는 리눅스에서만 쓸 수 있습니다.")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        try:
+            init1, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("libc에 inotify가 없습니다.") from None
+        add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        if add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch 실패: {directory}")
+
+    def read(self, timeout):
+        """timeout초 안에 다 쓰였거나 옮겨 온 파일 이름 목록. 이벤트가 넘쳤으면 None (전체를 다시 훑을 것)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & (IN_Q_OVERFLOW | IN_IGNORED):
+                return None
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _scan(directory):
+    """폴더 안 Excel 파일의 {경로: (크기, 수정 시각)}"""
+    found = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if is_workbook(entry.name):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if entry.is_file():
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+class FolderWatcher:
+    """폴더에 들어온 Excel 파일을 회차 DB와 빈도수 저장소에 더하는 감시기
+
+    on_ingest(결과 dict)는 파일 묶음을 처리할 때마다 감시 스레드에서 불린다.
+    결과 dict: files(처리한 파일), added(새 회차 수), errors([(파일, 오류)]),
+    serial(저장소 일련번호), seconds(파일 변경을 알아챈 뒤 저장까지 걸린 시간).
+    DB 연결은 감시 스레드에서 따로 연다 (SQLite 연결은 스레드끼리 나눠 쓸 수 없다).
+    """
+
+    def __init__(self, directory, on_ingest=None, poll_interval=POLL_INTERVAL, use_inotify=True):
+        if not os.path.isdir(directory):
+            raise ValueError(f"감시할 폴더가 없습니다: {directory}")
+        self.directory = directory
+        self.on_ingest = on_ingest
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        self.ingested = 0
+        self._done = {}      # 처리한 파일 → (크기, 수정 시각)
+        self._seen = {}      # 폴링: 지난번에 본 (크기, 수정 시각)
+        self._retry = set()  # 열려 있어 다시 읽어야 하는 파일
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """stop()이 불릴 때까지 감시. 시작할 때 폴더에 이미 있는 파일도 한 번 처리한다."""
+        db = DrawDatabase(get_db_filename(), store=FrequencyStore(get_store_filename()))
+        notify = None
+        if self.use_inotify:
+            try:
+                notify = Inotify(self.directory)
+            except OSError:
+                notify = None
+        self.mode = "inotify" if notify is not None else "polling"
+        try:
+            self._process(db, self._changed(_scan(self.directory)), time.perf_counter())
+            last_retry = time.monotonic()
+            while not self._stop.is_set():
+                if notify is not None:
+                    names = notify.read(self.poll_interval)
+                    started = time.perf_counter()
+                    if names is None:
+                        candidates = _scan(self.directory)
+                    else:
+                        if names:
+                            # 같이 복사된 파일을 한 묶음으로
+                            time.sleep(SETTLE_DELAY)
+                            names += notify.read(0) or []
+                        candidates = {}
+                        for name in set(names):
+                            path = os.path.join(self.directory, name)
+                            if is_workbook(name):
+                                try:
+                                    st = os.stat(path)
+                                except OSError:
+                                    continue
+                                candidates[path] = (st.st_size, st.st_mtime_ns)
+                else:
+                    self._stop.wait(self.poll_interval)
+                    started = time.perf_counter()
+                    candidates = self._stable(_scan(self.directory))
+                if self._retry and time.monotonic() - last_retry >= RETRY_INTERVAL:
+                    last_retry = time.monotonic()
+                    for path in self._retry:
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        candidates.setdefault(path, (st.st_size, st.st_mtime_ns))
+                    self._retry.clear()
+                self._process(db, self._changed(candidates), started)
+        finally:
+            if notify is not None:
+                notify.close()
+            db.close()
+
+    def _stable(self, found):
+        """폴링: 크기와 수정 시각이 지난번과 같은 (다 쓴) 파일만"""
+        stable = {path: key for path, key in found.items() if self._seen.get(path) == key}
+        self._seen = found
+        return stable
+
+    def _changed(self, candidates):
+        return {path: key for path, key in candidates.items() if self._done.get(path) != key}
+
+    @instrument.span("watch.ingest")
+    def _process(self, db, files, started):
+        if not files:
+            return
+        from ingest import extract_round_records
+
+        first_import = db.count() == 0
+        added = 0
+        errors = []
+        processed = []
+        for path in sorted(files):
+            try:
+                # 읽기 전용 스트리밍이 pandas보다 빠르고 메모리도 일정하다
+                records = extract_round_records(path, streaming=True)
+            except PermissionError:
+                # (Windows) 아직 다른 프로그램이 쓰고 있다
+                self._retry.add(path)
+                continue
+            except Exception as e:
+                # 내용이 바뀌기 전까지는 다시 읽지 않는다
+                errors.append((path, e))
+                records = None
+            self._done[path] = files[path]
+            processed.append(path)
+            if records is None:
+                continue
+            # 이미 있는 회차는 건너뛰고 새 회차만큼 빈도수를 더해 저장 (일련번호가 올라간다)
+            added += db.add_draws(*records, source=os.path.basename(path))
+        if first_import and added:
+            # 처음 가져올 때는 이전 JSON 누적값 대신 가져온 회차로 빈도수를 다시 맞춘다
+            db.rebuild_store()
+        self.ingested += added
+        header = db.store.header()
+        if instrument.enabled:
+            instrument.count("watch.files", len(processed))
+            instrument.count("watch.rounds", added)
+        if processed and self.on_ingest is not None:
+            self.on_ingest({
+                "files": processed, "added": added, "errors": errors,
+                "serial": header[1] if header else None,
+                "seconds": time.perf_counter() - started,
+            })
+
+
+def format_result(result):
+    """on_ingest 결과를 한 줄로"""
+    names = ", ".join(os.path.basename(path) for path in result["files"])
+    text = f"{names}: 새 회차 {result['added']}개 (저장 #{result['serial']}, {result['seconds'] * 1e3:.0f}ms)"
+    for path, error in result["errors"]:
+        text += f"\n  {os.path.basename(path)}: 실패 - {error}"
+    return text
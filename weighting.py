@@ -0,0 +1,143 @@
+import numpy as np
+
+# 가중치 방식
+MODE_ALL = "all"
+MODE_WINDOW = "window"
+MODE_DECAY = "decay"
+
+
+def _one_hot(numbers, width):
+    """(회차, k) 번호 배열 → (회차, 45) 출현 횟수 행렬"""
+    numbers = np.asarray(numbers, dtype=np.intp).reshape(len(numbers), width)
+    rows = np.repeat(np.arange(len(numbers)), width)
+    counts = np.bincount(rows * 45 + numbers.ravel() - 1, minlength=len(numbers) * 45)
+    return counts.reshape(len(numbers), 45).astype(np.int32)
+
+
+class RoundWeights:
+    """회차별 누적 빈도 행렬로 구간/감쇠 가중치를 계산
+
+    cumulative[i]는 처음 i개 회차의 번호별 누적 횟수((회차 + 1) × 45)이므로
+    어떤 구간이든 두 행의 차이로 O(45)에 구할 수 있다. 감쇠 가중치는 반감기별로
+    한 번 계산해 두고 새 회차가 들어오면 w = λ·w + (새 회차) 로만 갱신한다.
+    """
+
+    def __init__(self, rounds=(), numbers=(), bonus=()):
+        rounds = np.asarray(rounds, dtype=np.int64)
+        n = len(rounds)
+        normal = _one_hot(numbers, 6) if n else np.zeros((0, 45), np.int32)
+        extra = _one_hot(np.asarray(bonus).reshape(-1, 1), 1) if n else np.zeros((0, 45), np.int32)
+
+        # 새 회차를 덧붙일 때 매번 복사하지 않도록 여유 공간을 두고 할당
+        capacity = max(2 * n, 64)
+        self._n = n
+        self._rounds = np.zeros(capacity, np.int64)
+        self._normal_rows = np.zeros((capacity, 45), np.int32)
+        self._bonus_rows = np.zeros((capacity, 45), np.int32)
+        self._normal_cum = np.zeros((capacity + 1, 45), np.int64)
+        self._bonus_cum = np.zeros((capacity + 1, 45), np.int64)
+        self._rounds[:n] = rounds
+        self._normal_rows[:n] = normal
+        self._bonus_rows[:n] = extra
+        np.cumsum(normal, axis=0, out=self._normal_cum[1:n + 1])
+        np.cumsum(extra, axis=0, out=self._bonus_cum[1:n + 1])
+        self._decayed = {}
+        self.deletions = 0
+
+    @classmethod
+    def from_database(cls, db):
+        weights = cls(*db.all_draws())
+        weights.deletions = db.deletions()
+        return weights
+
+    @property
+    def count(self):
+        return self._n
+
+    @property
+    def rounds(self):
+        return self._rounds[:self._n]
+
+    @property
+    def normal_cum(self):
+        return self._normal_cum[:self._n + 1]
+
+    @property
+    def bonus_cum(self):
+        return self._bonus_cum[:self._n + 1]
+
+    @property
+    def last_round(self):
+        return int(self._rounds[self._n - 1]) if self._n else 0
+
+    def _grow(self):
+        capacity = 2 * len(self._rounds)
+        for name in ("_rounds", "_normal_rows", "_bonus_rows", "_normal_cum", "_bonus_cum"):
+            old = getattr(self, name)
+            new = np.zeros((capacity + (len(old) - len(self._rounds)),) + old.shape[1:], old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def append(self, round_num, numbers, bonus):
+        """마지막 회차 뒤에 한 회차 추가 (누적 행 1개와 감쇠 가중치만 갱신)"""
+        if round_num <= self.last_round:
+            raise ValueError("회차는 마지막 회차보다 커야 합니다.")
+        if self._n == len(self._rounds):
+            self._grow()
+        normal = _one_hot([numbers], 6)[0]
+        extra = _one_hot([[bonus]], 1)[0]
+        i = self._n
+        self._rounds[i] = round_num
+        self._normal_rows[i] = normal
+        self._bonus_rows[i] = extra
+        self._normal_cum[i + 1] = self._normal_cum[i] + normal
+        self._bonus_cum[i + 1] = self._bonus_cum[i] + extra
+        self._n += 1
+        for half_life, (normal_w, bonus_w) in self._decayed.items():
+            factor = 0.5 ** (1.0 / half_life)
+            self._decayed[half_life] = (normal_w * factor + normal, bonus_w * factor + extra)
+
+    def sync(self, db):
+        """DB에 새로 추가된 회차만 반영. 삭제나 중간 회차 추가가 있으면 새로 만든다."""
+        if db.deletions() != self.deletions:
+            return RoundWeights.from_database(db)
+        rounds, numbers, bonus = db.draws_after(self.last_round)
+        for round_num, nums, b in zip(rounds, numbers, bonus):
+            self.append(int(round_num), nums, int(b))
+        if db.count() != self.count:
+            return RoundWeights.from_database(db)
+        return self
+
+    def window(self, first_round, last_round):
+        """first_round~last_round 회차(양 끝 포함)의 (일반 빈도, 보너스 빈도)"""
+        a = np.searchsorted(self.rounds, first_round, side="left")
+        b = np.searchsorted(self.rounds, last_round, side="right")
+        return self.normal_cum[b] - self.normal_cum[a], self.bonus_cum[b] - self.bonus_cum[a]
+
+    def recent(self, n):
+        """최근 n개 회차의 (일반 빈도, 보너스 빈도)"""
+        b = self.count
+        a = max(b - int(n), 0)
+        return self.normal_cum[b] - self.normal_cum[a], self.bonus_cum[b] - self.bonus_cum[a]
+
+    def decayed(self, half_life):
+        """최근 회차일수록 큰 지수 감쇠 가중치 (half_life 회차 전 회차는 절반 반영)"""
+        if half_life <= 0:
+            raise ValueError("반감기는 0보다 커야 합니다.")
+        if half_life not in self._decayed:
+            factor = 0.5 ** (1.0 / half_life)
+            scale = factor ** np.arange(self.count - 1, -1, -1, dtype=np.float64)
+            self._decayed[half_life] = (scale @ self._normal_rows[:self._n], scale @ self._bonus_rows[:self._n])
+        return self._decayed[half_life]
+
+    def weights(self, mode, n=None, include_bonus=True):
+        """추첨에 쓸 45개 가중치. mode는 MODE_ALL / MODE_WINDOW(최근 n회) / MODE_DECAY(반감기 n회)"""
+        if mode == MODE_ALL:
+            normal_w, bonus_w = self.normal_cum[-1], self.bonus_cum[-1]
+        elif mode == MODE_WINDOW:
+            normal_w, bonus_w = self.recent(n)
+        elif mode == MODE_DECAY:
+            normal_w, bonus_w = self.decayed(n)
+        else:
+            raise ValueError(f"알 수 없는 가중치 방식: {mode}")
+        return normal_w + bonus_w if include_bonus else normal_w
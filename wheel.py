@@ -0,0 +1,237 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import numpy as np
+import instrument
+from rng import spawn_seeds
+from tickets import number_masks
+
+# 한 번의 탐색(재시작 하나)에서 시도하는 번호 교체 횟수
+WHEEL_ITERATIONS = 20000
+# 기본 재시작 횟수 (시드마다 같은 결과가 나오도록 CPU 수와 관계없이 고정)
+WHEEL_RESTARTS = 4
+# 처음 만든 티켓을 다듬을 때 자리마다 시험해 보는 교체 번호 수
+GREEDY_CANDIDATES = 8
+# 담금질 온도 (항목 가중치 평균이 1이 되도록 맞춘 점수 기준, 처음 → 끝)
+START_TEMPERATURE = 1.0
+END_TEMPERATURE = 0.02
+# 덮어야 할 항목(풀에서 고른 t개 조합) 수 상한 (항목표가 메모리에 들어가도록)
+MAX_ITEMS = 1 << 18
+
+
+def parse_pool(text):
+    """'1-20' / '3,7,11' / '1-5,9' → 번호 튜플 (형식이 틀리면 ValueError)"""
+    numbers = []
+    for part in text.split(","):
+        low, dash, high = part.strip().partition("-")
+        if low:
+            numbers.extend(range(int(low), int(high) + 1) if dash else [int(low)])
+    return tuple(numbers)
+
+
+def _check(pool, n_tickets, t, m):
+    pool = sorted({int(x) for x in pool})
+    if len(pool) < 6 or pool[0] < 1 or pool[-1] > 45:
+        raise ValueError("번호 풀은 1~45 사이의 서로 다른 번호 6개 이상이어야 합니다.")
+    if n_tickets < 1:
+        raise ValueError("티켓 수는 1 이상이어야 합니다.")
+    m = t if m is None else m
+    if not 1 <= m <= t <= len(pool) or m > 6:
+        raise ValueError("보장 조건은 1 <= 맞출 개수 <= 6, 맞출 개수 <= 풀에서 나올 개수 <= 풀 크기여야 합니다.")
+    if math.comb(len(pool), t) > MAX_ITEMS:
+        raise ValueError(f"덮어야 할 조합이 너무 많습니다 (C({len(pool)}, {t}) > {MAX_ITEMS:,}).")
+    return pool, m
+
+
+def _item_weights(pool, t, weights):
+    """풀 안의 t개 조합마다 가중치 (번호 가중치의 곱, 평균 1). weights가 없으면 모두 1."""
+    count = math.comb(len(pool), t)
+    if weights is None:
+        return np.ones(count)
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (45,) or np.any(weights < 0) or not np.all(np.isfinite(weights)):
+        raise ValueError("가중치는 0 이상의 유한한 값 45개여야 합니다.")
+    columns = np.array(list(combinations(weights[np.array(pool) - 1], t)))
+    item = columns.prod(axis=1)
+    if item.sum() <= 0:
+        return np.ones(count)
+    return item * (count / item.sum())
+
+
+def _search(pool_size, n_tickets, t, m, item_weights, iterations, seed):
+    """풀 인덱스 비트마스크 티켓 n_tickets개를 탐욕 생성 + 담금질로 다듬는다. (가장 좋은 점수, 티켓 목록)
+
+    항목(풀의 t개 조합)은 어떤 티켓과 m개 이상 겹치면 덮인 것으로 본다 (m == t면
+    번호 쌍/세 개 조합을 그대로 포함하는 경우). 티켓 하나에서 번호 a를 b로 바꿀 때
+    덮임 여부가 바뀌는 항목은 a(또는 b) + 티켓의 나머지 5개 중 m - 1개 + 티켓 밖의
+    t - m개로 이루어진 것뿐이므로, 그 항목들의 덮은 티켓 수만 보고 점수 변화를 계산한다.
+    """
+    rng = random.Random(seed)
+    bits = [1 << i for i in range(pool_size)]
+    index = {sum(c): i for i, c in enumerate(combinations(bits, t))}
+    weight = item_weights.tolist()
+    covered = [0] * len(weight)
+
+    def affected(ticket, a, b):
+        """(a를 포함한 항목 id, b를 포함한 항목 id) 쌍 목록 (a는 티켓 안, b는 티켓 밖)"""
+        others = [x for x in bits if ticket & x and x != a]
+        outside = [x for x in bits if not ticket & x and x != b]
+        pairs = []
+        for inner in combinations(others, m - 1):
+            base = sum(inner)
+            for outer in combinations(outside, t - m):
+                rest = base + sum(outer)
+                pairs.append((index[rest | a], index[rest | b]))
+        return pairs
+
+    def delta(pairs):
+        gain = 0.0
+        for lost, won in pairs:
+            if covered[lost] == 1:
+                gain -= weight[lost]
+            if covered[won] == 0:
+                gain += weight[won]
+        return gain
+
+    def apply(pairs):
+        for lost, won in pairs:
+            covered[lost] -= 1
+            covered[won] += 1
+
+    def add(ticket):
+        """티켓이 덮는 항목(티켓 번호 k >= m개 + 티켓 밖 t - k개)의 덮은 수를 올리고 점수 증가분을 돌려준다."""
+        gain = 0.0
+        members = [x for x in bits if ticket & x]
+        outside = [x for x in bits if not ticket & x]
+        for k in range(m, min(t, 6) + 1):
+            for inner in combinations(members, k):
+                base = sum(inner)
+                for outer in combinations(outside, t - k):
+                    i = index[base + sum(outer)]
+                    if covered[i] == 0:
+                        gain += weight[i]
+                    covered[i] += 1
+        return gain
+
+    # 탐욕 생성: 티켓을 하나씩 넣고 자리마다 몇 가지 교체를 시험해 가장 좋은 것으로 바꾼다
+    tickets = []
+    score = 0.0
+    for _ in range(n_tickets):
+        ticket = sum(rng.sample(bits, 6))
+        score += add(ticket)
+        for a in [x for x in bits if ticket & x]:
+            candidates = [x for x in bits if not ticket & x]
+            best, best_pairs, best_gain = None, None, 0.0
+            for b in rng.sample(candidates, min(GREEDY_CANDIDATES, len(candidates))):
+                pairs = affected(ticket, a, b)
+                gain = delta(pairs)
+                if gain > best_gain:
+                    best, best_pairs, best_gain = b, pairs, gain
+            if best is not None:
+                apply(best_pairs)
+                ticket = ticket ^ a | best
+                score += best_gain
+        tickets.append(ticket)
+
+    # 담금질: 임의의 티켓에서 번호 하나를 바꾸고, 나빠지는 교체도 온도에 따라 받아들인다
+    best_score, best_tickets = score, list(tickets)
+    # 모든 항목을 덮었으면 (보장 성립) 더 찾을 필요가 없다
+    complete = sum(weight) - 1e-9
+    if pool_size > 6 and score < complete:
+        cooling = (END_TEMPERATURE / START_TEMPERATURE) ** (1 / max(iterations, 1))
+        temperature = START_TEMPERATURE
+        for _ in range(iterations):
+            j = rng.randrange(n_tickets)
+            ticket = tickets[j]
+            a = rng.choice([x for x in bits if ticket & x])
+            b = rng.choice([x for x in bits if not ticket & x])
+            pairs = affected(ticket, a, b)
+            gain = delta(pairs)
+            if gain >= 0 or rng.random() < math.exp(gain / temperature):
+                apply(pairs)
+                tickets[j] = ticket ^ a | b
+                score += gain
+                if score > best_score + 1e-9:
+                    best_score, best_tickets = score, list(tickets)
+                    if score >= complete:
+                        break
+            temperature *= cooling
+    return best_score, best_tickets
+
+
+def _popcount(values):
+    """uint64 배열의 비트 수"""
+    bytes_ = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8).reshape(*np.shape(values), 8)
+    return np.unpackbits(bytes_, axis=-1).sum(axis=-1)
+
+
+def coverage_stats(masks, pool, t=2, m=None, weights=None):
+    """티켓 비트마스크(번호 i는 (i - 1)번째 비트)가 풀의 t개 조합을 얼마나 덮는지
+
+    반환 dict: items(전체 항목 수), covered(덮인 항목 수), coverage(비율),
+    weighted_coverage(가중치 기준 비율), guaranteed(모두 덮였는지), depth_mean/depth_max
+    (항목 하나를 덮는 티켓 수), numbers(풀 번호별 사용 횟수).
+    """
+    pool, m = _check(pool, 1, t, m)
+    masks = np.asarray(masks, dtype=np.uint64).ravel()
+    items = number_masks(np.array(list(combinations(pool, t)), dtype=np.uint8).reshape(-1, t))
+    item_weights = _item_weights(pool, t, weights)
+    depth = (_popcount(items[:, None] & masks[None, :]) >= m).sum(axis=1)
+    hit = depth > 0
+    usage = (masks[:, None] >> (np.array(pool, dtype=np.uint64) - np.uint64(1))[None, :]) & np.uint64(1)
+    return {
+        "items": int(items.size),
+        "covered": int(hit.sum()),
+        "coverage": float(hit.mean()),
+        "weighted_coverage": float(item_weights[hit].sum() / item_weights.sum()),
+        "guaranteed": bool(hit.all()),
+        "depth_mean": float(depth.mean()),
+        "depth_max": int(depth.max()) if depth.size else 0,
+        "numbers": dict(zip(pool, usage.sum(axis=0).astype(int).tolist())),
+    }
+
+
+def format_stats(stats, t, m=None):
+    """coverage_stats 결과를 한 줄 요약으로"""
+    m = t if m is None else m
+    target = f"{t}개 조합" if m == t else f"{t}개 중 {m}개 맞춤"
+    used = stats["numbers"].values()
+    return (f"{target} {stats['covered']:,}/{stats['items']:,} ({stats['coverage']:.1%}, "
+            f"가중 {stats['weighted_coverage']:.1%}) 덮음, 항목당 평균 {stats['depth_mean']:.2f}장, "
+            f"번호 사용 {min(used)}~{max(used)}회" + (", 보장 성립" if stats["guaranteed"] else ""))
+
+
+@instrument.span("wheel.build")
+def build_wheel(pool, n_tickets, t=2, m=None, weights=None, iterations=WHEEL_ITERATIONS,
+                restarts=WHEEL_RESTARTS, seed=None, max_workers=None):
+    """풀의 번호로 티켓 n_tickets장을 골라 t개 조합을 최대한 (가중치 기준) 덮는다.
+
+    m을 주면 "풀에서 t개가 나오면 어느 한 장은 m개 이상 맞는다"를 목표로 한다
+    (모든 항목을 덮으면 보장 성립). weights(45개)는 번호 쌍/조합의 가중치 (번호 가중치의 곱).
+    재시작 restarts번을 서로 다른 시드로 돌려 가장 좋은 결과를 쓰고, max_workers가
+    1이 아니면 재시작을 프로세스 풀에서 나눠 돌린다 (max_workers는 병렬 정도만 바꾼다).
+    같은 seed와 restarts면 같은 결과.
+    반환값은 (티켓 (n, 6) uint8 번호 배열, coverage_stats 결과).
+    """
+    pool, m = _check(pool, n_tickets, t, m)
+    item_weights = _item_weights(pool, t, weights if m == t else None)
+    workers = max_workers or os.cpu_count() or 1
+    restarts = restarts or WHEEL_RESTARTS
+    seeds = [int(child.generate_state(1)[0]) for child in spawn_seeds(seed, restarts)]
+    jobs = [(len(pool), n_tickets, t, m, item_weights, iterations, s) for s in seeds]
+
+    if workers == 1 or restarts == 1:
+        results = [_search(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, restarts)) as executor:
+            results = list(executor.map(_search, *zip(*jobs)))
+    # 점수가 같으면 앞 재시작 (작업자 수와 관계없이 같은 결과)
+    _, best = max(results, key=lambda r: r[0])
+
+    numbers = np.array(pool, dtype=np.uint8)
+    tickets = np.array([[numbers[i] for i in range(len(pool)) if ticket >> i & 1] for ticket in best],
+                       dtype=np.uint8)
+    tickets = tickets[np.lexsort(tickets.T[::-1])]
+    return tickets, coverage_stats(number_masks(tickets), pool, t, m, weights if m == t else None)